@@ -21,19 +21,20 @@ def create_app(config_class=DevelopmentConfig):
     socketio.init_app(app)
     migrate.init_app(app, db)
     
+    # Per-request query counts, DB time and N+1 detection
+    from services.sql_instrumentation import init_sql_instrumentation
+    init_sql_instrumentation(app)
+    
     # Register context processor
     @app.context_processor
     def inject_datetime():
         from datetime import datetime, timedelta
         from flask import session
-        from models import Notification
+        from services.notification_counts import unread_notification_count
         
         unread_count = 0
         if 'user_id' in session:
-            unread_count = Notification.query.filter_by(
-                user_id=session['user_id'],
-                is_read=False
-            ).count()
+            unread_count = unread_notification_count(session['user_id'])
         
         return {
             'datetime': datetime,
@@ -42,6 +43,9 @@ def create_app(config_class=DevelopmentConfig):
             'unread_notification_count': unread_count
         }
     
+    from services.pagination import cursor_url
+    app.add_template_global(cursor_url)
+    
     # Register blueprints
     from routes.main import main_bp
     from routes.auth import auth_bp
@@ -69,6 +73,10 @@ def create_app(config_class=DevelopmentConfig):
     app.register_blueprint(common_bp)
     app.register_blueprint(expert_application_bp)
     
+    # Register CLI commands
+    from commands import register_commands
+    register_commands(app)
+    
     # Create database tables
     with app.app_context():
         db.create_all()
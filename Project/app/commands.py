@@ -0,0 +1,97 @@
+import click
+from sqlalchemy import update
+from extensions import db
+from models import CandidateJobScore
+
+
+def register_commands(app):
+    """Register maintenance commands on the ``flask`` CLI"""
+
+    @app.cli.command('backfill-locations')
+    def backfill_locations():
+        """Resolve free-text locations of existing rows into location_id."""
+        from services.location_service import LOCATED_MODELS, resolve_location_id
+
+        for model in LOCATED_MODELS:
+            resolved = {}
+            updates = []
+            for row_id, text in db.session.query(model.id, model.location).filter(
+                model.location != None, model.location_id == None
+            ):
+                if text not in resolved:
+                    resolved[text] = resolve_location_id(text)
+                if resolved[text]:
+                    updates.append({'id': row_id, 'location_id': resolved[text]})
+            if updates:
+                db.session.execute(update(model), updates)
+            click.echo(f'{model.__tablename__}: {len(updates)} rows linked to {len(set(resolved.values()) - {None})} locations')
+
+        # Stored scores were computed from the old text comparison
+        db.session.query(CandidateJobScore).delete()
+        db.session.commit()
+
+    @app.cli.command('build-skill-similarity')
+    @click.option('--full', is_flag=True, help='Recount all co-occurrences instead of applying logged changes.')
+    def build_skill_similarity_command(full):
+        """Update the skill similarity matrix used for partial-credit matching."""
+        from services.skill_similarity import build_skill_similarity
+
+        refreshed = build_skill_similarity(full=full)
+        click.echo(f'{refreshed} skills refreshed')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rewrite the full-text search documents of every job posting."""
+        from services.job_search_service import rebuild_search_index
+
+        rebuild_search_index()
+        click.echo('Search index rebuilt')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Fail when a hot query's SQLite plan scans a whole table or sorts without an index."""
+        from services.query_plans import check_query_plans
+
+        failed = 0
+        for name, (plan, problems) in check_query_plans().items():
+            if problems:
+                failed += 1
+                click.echo(f'FAIL {name}: {"; ".join(plan)}')
+            else:
+                click.echo(f'ok   {name}')
+        if failed:
+            raise click.ClickException(f'{failed} queries not served by an index')
+
+    @app.cli.command('rebuild-platform-stats')
+    def rebuild_platform_stats_command():
+        """Recount the admin dashboard totals kept in platform_stats."""
+        from services.platform_stats import rebuild_platform_stats, platform_stats
+
+        rebuild_platform_stats()
+        stats = platform_stats()
+        click.echo(f'{stats.users} users, {stats.jobs} jobs, {stats.applications} applications counted')
+
+    @app.cli.command('rebuild-employer-rollups')
+    def rebuild_employer_rollups_command():
+        """Recount the per-company and per-job application rollups."""
+        from services.employer_rollups import rebuild_employer_rollups
+
+        rebuild_employer_rollups()
+        click.echo('Employer rollups rebuilt')
+
+    @app.cli.command('backfill-time-series')
+    @click.option('--chunk-size', default=5000, show_default=True, help='Rows read and committed per round trip.')
+    def backfill_time_series_command(chunk_size):
+        """Rebuild the daily and hourly report rollups from history."""
+        from services.time_series import backfill_time_series
+
+        backfill_time_series(chunk_size, progress=lambda metric, counted: click.echo(f'{metric}: {counted} rows'))
+        click.echo('Time-series rollups rebuilt')
+
+    @app.cli.command('rebuild-notification-counts')
+    def rebuild_notification_counts_command():
+        """Recount every user's unread notifications."""
+        from services.notification_counts import rebuild_notification_counts
+
+        rebuild_notification_counts()
+        click.echo('Unread notification counters rebuilt')
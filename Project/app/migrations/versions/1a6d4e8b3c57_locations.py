@@ -0,0 +1,105 @@
+"""Normalized locations
+
+Revision ID: 1a6d4e8b3c57
+Revises: 3f9c2a7d41b0
+Create Date: 2026-10-18 10:00:00.000000
+
+Creates the locations table unless ``db.create_all()`` already did, adds the
+indexed location_id foreign key to candidate_profiles, job_postings and
+companies, and links every row whose free-text location parses to a place.
+Rows saved later are linked by the location_service flush hook.
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+from services.location_service import parse_location, place_slug
+
+
+# revision identifiers, used by Alembic.
+revision = '1a6d4e8b3c57'
+down_revision = '3f9c2a7d41b0'
+branch_labels = None
+depends_on = None
+
+
+LOCATED_TABLES = ('candidate_profiles', 'job_postings', 'companies')
+
+locations = sa.table(
+    'locations',
+    sa.column('id', sa.Integer), sa.column('slug', sa.String), sa.column('city', sa.String),
+    sa.column('region', sa.String), sa.column('country', sa.String), sa.column('is_remote', sa.Boolean),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def _location_ids(connection, texts):
+    """{free text: location id} for every text that parses, creating missing locations"""
+    places = {text: parse_location(text) for text in texts}
+    slugs = {place_slug(place): place for place in places.values() if place is not None}
+    known = dict(connection.execute(sa.select(locations.c.slug, locations.c.id)).all())
+    missing = [slug for slug in slugs if slug not in known]
+    if missing:
+        now = datetime.utcnow()
+        connection.execute(locations.insert(), [
+            {'slug': slug, 'city': slugs[slug].city, 'region': slugs[slug].region,
+             'country': slugs[slug].country, 'is_remote': slugs[slug].is_remote, 'created_at': now}
+            for slug in missing
+        ])
+        known = dict(connection.execute(sa.select(locations.c.slug, locations.c.id)).all())
+    return {text: known[place_slug(place)] for text, place in places.items() if place is not None}
+
+
+def upgrade():
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    if not inspector.has_table('locations'):
+        op.create_table(
+            'locations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('slug', sa.String(length=255), nullable=False),
+            sa.Column('city', sa.String(length=100), nullable=True),
+            sa.Column('region', sa.String(length=100), nullable=True),
+            sa.Column('country', sa.String(length=100), nullable=True),
+            sa.Column('is_remote', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('slug'),
+            sqlite_autoincrement=True
+        )
+        op.create_index('ix_locations_country_region', 'locations', ['country', 'region'])
+        op.create_index('ix_locations_region', 'locations', ['region'])
+        op.create_index('ix_locations_city', 'locations', ['city'])
+        op.create_index('ix_locations_is_remote', 'locations', ['is_remote'])
+
+    for table in LOCATED_TABLES:
+        if 'location_id' not in {column['name'] for column in inspector.get_columns(table)}:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('location_id', sa.Integer(), nullable=True))
+                batch_op.create_index(f'ix_{table}_location_id', ['location_id'])
+                batch_op.create_foreign_key(f'fk_{table}_location_id', 'locations', ['location_id'], ['id'])
+
+    for table in LOCATED_TABLES:
+        rows = sa.table(table, sa.column('location', sa.String), sa.column('location_id', sa.Integer))
+        texts = [text for text, in connection.execute(
+            sa.select(rows.c.location).where(rows.c.location != None, rows.c.location_id == None).distinct()
+        )]
+        for text, location_id in _location_ids(connection, texts).items():
+            connection.execute(rows.update().where(
+                rows.c.location == text, rows.c.location_id == None
+            ).values(location_id=location_id))
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in LOCATED_TABLES:
+        # The key is unnamed when db.create_all() added the column
+        foreign_keys = [key['name'] for key in inspector.get_foreign_keys(table)
+                        if key['referred_table'] == 'locations' and key['name']]
+        with op.batch_alter_table(table) as batch_op:
+            for name in foreign_keys:
+                batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.drop_index(f'ix_{table}_location_id')
+            batch_op.drop_column('location_id')
+    op.drop_table('locations')
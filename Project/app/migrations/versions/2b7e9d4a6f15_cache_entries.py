@@ -0,0 +1,38 @@
+"""Shared cache entries
+
+Revision ID: 2b7e9d4a6f15
+Revises: 9d3b5f7a1c60
+Create Date: 2026-10-18 23:00:00.000000
+
+Creates cache_entries unless ``db.create_all()`` already did. Entries are
+recomputed on demand, so nothing is backfilled.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7e9d4a6f15'
+down_revision = '9d3b5f7a1c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('cache_entries'):
+        op.create_table(
+            'cache_entries',
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('value', sa.Text(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+        op.create_index('ix_cache_entries_expires_at', 'cache_entries', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_cache_entries_expires_at', table_name='cache_entries')
+    op.drop_table('cache_entries')
@@ -0,0 +1,66 @@
+"""Index pack for the hot listing and lookup queries
+
+Revision ID: 3f9c2a7d41b0
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Tables are still created by ``db.create_all()``, which also creates these
+indexes on a fresh database (stamp it with ``flask db stamp head``). On an
+existing database this adds whichever of them are missing. Every index is
+checked by ``flask check-query-plans``.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b0'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at']),
+    ('ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at']),
+    ('ix_job_postings_active_created', 'job_postings', ['is_active', 'created_at']),
+    ('ix_job_postings_company_id', 'job_postings', ['company_id']),
+    ('ix_job_applications_job_applied', 'job_applications', ['job_id', 'applied_at']),
+    ('ix_job_applications_candidate_applied', 'job_applications', ['candidate_id', 'applied_at']),
+    ('ix_job_required_skills_job_id', 'job_required_skills', ['job_id']),
+    ('ix_job_required_skills_skill_job', 'job_required_skills', ['skill_id', 'job_id']),
+    ('ix_candidate_skills_candidate_id', 'candidate_skills', ['candidate_id']),
+    ('ix_candidate_skills_skill_candidate', 'candidate_skills', ['skill_id', 'candidate_id']),
+    ('ix_candidate_profiles_user_id', 'candidate_profiles', ['user_id']),
+    ('ix_companies_user_id', 'companies', ['user_id']),
+    ('ix_interview_participants_room_user', 'interview_participants', ['room_id', 'user_id']),
+    ('ix_interview_participants_user_id', 'interview_participants', ['user_id']),
+    ('ix_activity_logs_timestamp', 'activity_logs', ['timestamp', 'id']),
+    ('ix_application_status_history_application_changed', 'application_status_history', ['application_id', 'changed_at']),
+    ('ix_interviewer_earnings_interviewer_created', 'interviewer_earnings', ['interviewer_id', 'created_at']),
+    ('ix_interviewer_profiles_created_at', 'interviewer_profiles', ['created_at']),
+    ('ix_users_created_at', 'users', ['created_at']),
+]
+
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    existing = set()
+    for table in {table for _, table, _ in INDEXES}:
+        existing.update(index['name'] for index in inspector.get_indexes(table))
+    return existing
+
+
+def upgrade():
+    existing = _existing_indexes()
+    for name, table, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name, table, columns in reversed(INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name=table)
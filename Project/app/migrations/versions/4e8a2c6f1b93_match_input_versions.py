@@ -0,0 +1,35 @@
+"""Match input versions
+
+Revision ID: 4e8a2c6f1b93
+Revises: 7c1f3b9e2d48
+Create Date: 2026-10-18 21:00:00.000000
+
+Creates match_input_versions unless ``db.create_all()`` already did. A
+missing row reads as version 0, so nothing is backfilled.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a2c6f1b93'
+down_revision = '7c1f3b9e2d48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('match_input_versions'):
+        op.create_table(
+            'match_input_versions',
+            sa.Column('kind', sa.String(length=10), nullable=False),
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('kind', 'entity_id')
+        )
+
+
+def downgrade():
+    op.drop_table('match_input_versions')
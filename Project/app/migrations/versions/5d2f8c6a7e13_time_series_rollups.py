@@ -0,0 +1,46 @@
+"""Daily and hourly time-series rollups for admin reports
+
+Revision ID: 5d2f8c6a7e13
+Revises: c47a9e3f1d25
+Create Date: 2026-10-18 16:00:00.000000
+
+Creates the tables unless ``db.create_all()`` already did; fill them from
+history afterwards with ``flask backfill-time-series``.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8c6a7e13'
+down_revision = 'c47a9e3f1d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('daily_rollups'):
+        op.create_table(
+            'daily_rollups',
+            sa.Column('metric', sa.String(length=50), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('dimension', sa.String(length=50), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('metric', 'day', 'dimension')
+        )
+    if not inspector.has_table('hourly_rollups'):
+        op.create_table(
+            'hourly_rollups',
+            sa.Column('metric', sa.String(length=50), nullable=False),
+            sa.Column('hour', sa.DateTime(), nullable=False),
+            sa.Column('dimension', sa.String(length=50), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('metric', 'hour', 'dimension')
+        )
+
+
+def downgrade():
+    op.drop_table('hourly_rollups')
+    op.drop_table('daily_rollups')
@@ -0,0 +1,35 @@
+"""Cache leases
+
+Revision ID: 7c1f3b9e2d48
+Revises: e9a3b7c2f604
+Create Date: 2026-10-18 20:00:00.000000
+
+Creates cache_leases unless ``db.create_all()`` already did. Rows only live
+while a worker recomputes a shared cache entry, so nothing is backfilled.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f3b9e2d48'
+down_revision = 'e9a3b7c2f604'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('cache_leases'):
+        op.create_table(
+            'cache_leases',
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('holder', sa.String(length=32), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade():
+    op.drop_table('cache_leases')
@@ -0,0 +1,47 @@
+"""platform_stats counters for the admin dashboard
+
+Revision ID: 8b1e5d0c92a4
+Revises: 1a6d4e8b3c57
+Create Date: 2026-10-18 11:00:00.000000
+
+The counters row is filled in from the source tables the first time the
+dashboard reads it, or with ``flask rebuild-platform-stats``. The app's
+``db.create_all()`` may already have made the table and index, so each is
+only created when missing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e5d0c92a4'
+down_revision = '1a6d4e8b3c57'
+branch_labels = None
+depends_on = None
+
+
+COUNTERS = (
+    'users', 'candidates', 'employers', 'interviewers', 'jobs', 'active_jobs', 'applications',
+    'skills', 'companies', 'pending_interviewer_apps',
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('platform_stats'):
+        op.create_table(
+            'platform_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            *(sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in COUNTERS),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    # New-applications-today counts on the dashboard are a range on applied_at
+    if 'ix_job_applications_applied_at' not in {index['name'] for index in inspector.get_indexes('job_applications')}:
+        op.create_index('ix_job_applications_applied_at', 'job_applications', ['applied_at'])
+
+
+def downgrade():
+    op.drop_index('ix_job_applications_applied_at', table_name='job_applications')
+    op.drop_table('platform_stats')
@@ -0,0 +1,41 @@
+"""Full-text job search documents
+
+Revision ID: 9d3b5f7a1c60
+Revises: 4e8a2c6f1b93
+Create Date: 2026-10-18 22:00:00.000000
+
+Creates the backend's full-text table unless ``db.create_all()`` already
+did, and rewrites every document from job_postings. An empty table would
+otherwise make every keyword search return no jobs until
+``flask rebuild-search-index`` ran, and one created by ``db.create_all()``
+only holds jobs written since.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from models.search import JOB_SEARCH_TABLES, JOB_SEARCH_DDL
+from services.job_search_service import _reindex
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b5f7a1c60'
+down_revision = '4e8a2c6f1b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    connection = op.get_bind()
+    ddl = JOB_SEARCH_DDL.get(connection.dialect.name)
+    if ddl is None:
+        return
+    connection.execute(sa.text(ddl))
+    _reindex(connection)
+
+
+def downgrade():
+    connection = op.get_bind()
+    search_table = JOB_SEARCH_TABLES.get(connection.dialect.name)
+    if search_table is not None:
+        connection.execute(sa.text(f'DROP TABLE IF EXISTS {search_table}'))
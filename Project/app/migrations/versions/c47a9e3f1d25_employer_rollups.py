@@ -0,0 +1,89 @@
+"""Employer application rollups
+
+Revision ID: c47a9e3f1d25
+Revises: 8b1e5d0c92a4
+Create Date: 2026-10-18 14:00:00.000000
+
+Creates the per-company status and daily counts and the per-job counts,
+unless ``db.create_all()`` already did, and fills any that are empty from
+job_applications. ``flask rebuild-employer-rollups`` recounts them later.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47a9e3f1d25'
+down_revision = '8b1e5d0c92a4'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL = {
+    'job_application_counts': """
+        INSERT INTO job_application_counts (job_id, company_id, applications)
+        SELECT a.job_id, j.company_id, COUNT(*)
+        FROM job_applications a JOIN job_postings j ON j.id = a.job_id
+        GROUP BY a.job_id, j.company_id
+    """,
+    'company_application_status_counts': """
+        INSERT INTO company_application_status_counts (company_id, status, applications)
+        SELECT j.company_id, COALESCE(a.application_status, 'applied'), COUNT(*)
+        FROM job_applications a JOIN job_postings j ON j.id = a.job_id
+        GROUP BY j.company_id, COALESCE(a.application_status, 'applied')
+    """,
+    'company_application_daily_counts': """
+        INSERT INTO company_application_daily_counts (company_id, day, applications)
+        SELECT j.company_id, DATE(a.applied_at), COUNT(*)
+        FROM job_applications a JOIN job_postings j ON j.id = a.job_id
+        WHERE a.applied_at IS NOT NULL
+        GROUP BY j.company_id, DATE(a.applied_at)
+    """,
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('company_application_status_counts'):
+        op.create_table(
+            'company_application_status_counts',
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('applications', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('company_id', 'status')
+        )
+    if not inspector.has_table('company_application_daily_counts'):
+        op.create_table(
+            'company_application_daily_counts',
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('applications', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('company_id', 'day')
+        )
+    if not inspector.has_table('job_application_counts'):
+        op.create_table(
+            'job_application_counts',
+            sa.Column('job_id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('applications', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['job_id'], ['job_postings.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('job_id')
+        )
+        op.create_index('ix_job_application_counts_company_applications', 'job_application_counts',
+                        ['company_id', 'applications'])
+
+    connection = op.get_bind()
+    for table, backfill in BACKFILL.items():
+        if not connection.execute(sa.text(f'SELECT 1 FROM {table} LIMIT 1')).first():
+            connection.execute(sa.text(backfill))
+
+
+def downgrade():
+    op.drop_index('ix_job_application_counts_company_applications', table_name='job_application_counts')
+    op.drop_table('job_application_counts')
+    op.drop_table('company_application_daily_counts')
+    op.drop_table('company_application_status_counts')
@@ -0,0 +1,43 @@
+"""Unread notification counters
+
+Revision ID: e9a3b7c2f604
+Revises: 5d2f8c6a7e13
+Create Date: 2026-10-18 18:00:00.000000
+
+Creates notification_counters unless ``db.create_all()`` already did, and
+fills it from the unread notifications when empty, since counters are only
+ever adjusted from there on. ``flask rebuild-notification-counts`` recounts.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a3b7c2f604'
+down_revision = '5d2f8c6a7e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('notification_counters'):
+        op.create_table(
+            'notification_counters',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('unread', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+    connection = op.get_bind()
+    if not connection.execute(sa.text('SELECT 1 FROM notification_counters LIMIT 1')).first():
+        connection.execute(sa.text("""
+            INSERT INTO notification_counters (user_id, unread)
+            SELECT user_id, COUNT(*) FROM notifications WHERE is_read = 0 GROUP BY user_id
+        """))
+
+
+def downgrade():
+    op.drop_table('notification_counters')
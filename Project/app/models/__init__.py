@@ -3,9 +3,17 @@ from .company import Company
 from .candidate import CandidateProfile
 from .job import JobPosting, JobApplication, JobRequiredSkill
 from .exam import MCQExam, MCQQuestion, ExamAttempt, CandidateAnswer
-from .skill import Skill, CandidateSkill
-from .notification import Notification
+from .skill import Skill, CandidateSkill, SkillCooccurrence, SkillCooccurrenceDelta, SkillSimilarity
+from .notification import Notification, NotificationCounter
 from .activity import ActivityLog, ApplicationStatusHistory
+from .match import CandidateJobScore, MatchInputVersion
+from .location import Location
+from .cache import CacheVersion, CacheLease, CacheEntry
+from .stats import PlatformStats
+from .rollup import (
+    CompanyApplicationStatusCount, CompanyApplicationDailyCount, JobApplicationCount, DailyRollup, HourlyRollup
+)
+from . import search
 from .interview import InterviewRoom, InterviewParticipant, InterviewFeedback, CodeSession, InterviewerRecommendation
 from .interviewer import (
     InterviewerProfile, InterviewerSkill, InterviewerIndustry, InterviewerCertification,
@@ -26,9 +34,25 @@ __all__ = [
     'CandidateAnswer',
     'Skill',
     'CandidateSkill',
+    'SkillCooccurrence',
+    'SkillCooccurrenceDelta',
+    'SkillSimilarity',
     'Notification',
+    'NotificationCounter',
     'ActivityLog',
     'ApplicationStatusHistory',
+    'CandidateJobScore',
+    'MatchInputVersion',
+    'Location',
+    'CacheVersion',
+    'CacheLease',
+    'CacheEntry',
+    'PlatformStats',
+    'CompanyApplicationStatusCount',
+    'CompanyApplicationDailyCount',
+    'JobApplicationCount',
+    'DailyRollup',
+    'HourlyRollup',
     'InterviewRoom',
     'InterviewParticipant',
     'InterviewFeedback',
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class ActivityLog(db.Model):
     __tablename__ = 'activity_logs'
+    __table_args__ = (
+        db.Index('ix_activity_logs_timestamp', 'timestamp', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     table_name = db.Column(db.String(50), nullable=False)
@@ -16,6 +19,9 @@ class ActivityLog(db.Model):
 
 class ApplicationStatusHistory(db.Model):
     __tablename__ = 'application_status_history'
+    __table_args__ = (
+        db.Index('ix_application_status_history_application_changed', 'application_id', 'changed_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('job_applications.id'), nullable=False)
     old_status = db.Column(db.String(50))
@@ -0,0 +1,37 @@
+from extensions import db
+from datetime import datetime
+
+class CacheVersion(db.Model):
+    """Version counter of a shared reference-data cache, bumped whenever its source rows change.
+
+    Workers compare their cached copy against it instead of reloading the
+    data on every request.
+    """
+    __tablename__ = 'cache_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CacheLease(db.Model):
+    """Claim by one worker to recompute a shared cache entry, so the others keep serving their old copy.
+
+    A lease past ``expires_at`` is left by a worker that died and may be taken over.
+    """
+    __tablename__ = 'cache_leases'
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(32), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class CacheEntry(db.Model):
+    """Value of a cache entry shared by all workers, tagged with the cache version it was computed at.
+
+    Lets a worker that missed in its own cache reuse what another worker
+    computed instead of computing it again.
+    """
+    __tablename__ = 'cache_entries'
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    value = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
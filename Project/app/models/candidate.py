@@ -4,11 +4,12 @@ from datetime import datetime
 class CandidateProfile(db.Model):
     __tablename__ = 'candidate_profiles'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     experience_years = db.Column(db.Integer, default=0)
     education_level = db.Column(db.Enum('High School', 'Bachelor', 'Master', 'PhD', 'Other'))
     current_position = db.Column(db.String(255))
     location = db.Column(db.String(255))
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), index=True)
     salary_expectation = db.Column(db.Numeric(10, 2))
     cv_file_path = db.Column(db.String(500))
     cv_content = db.Column(db.LargeBinary)
@@ -22,9 +22,12 @@ class InterviewRoom(db.Model):
 
 class InterviewParticipant(db.Model):
     __tablename__ = 'interview_participants'
+    __table_args__ = (
+        db.Index('ix_interview_participants_room_user', 'room_id', 'user_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     room_id = db.Column(db.Integer, db.ForeignKey('interview_rooms.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     role = db.Column(db.Enum('candidate', 'interviewer', 'observer'), nullable=False)
     joined_at = db.Column(db.DateTime)
     left_at = db.Column(db.DateTime)
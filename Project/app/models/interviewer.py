@@ -48,7 +48,7 @@ class InterviewerProfile(db.Model):
     average_rating = db.Column(db.Numeric(3, 2), default=0)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     approved_at = db.Column(db.DateTime)
     
@@ -156,6 +156,9 @@ class InterviewerAvailability(db.Model):
 class InterviewerEarning(db.Model):
     """Track earnings for each completed interview"""
     __tablename__ = 'interviewer_earnings'
+    __table_args__ = (
+        db.Index('ix_interviewer_earnings_interviewer_created', 'interviewer_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     interviewer_id = db.Column(db.Integer, db.ForeignKey('interviewer_profiles.id'), nullable=False)
@@ -3,12 +3,16 @@ from datetime import datetime
 
 class JobPosting(db.Model):
     __tablename__ = 'job_postings'
+    __table_args__ = (
+        db.Index('ix_job_postings_active_created', 'is_active', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False, index=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=False)
     requirements = db.Column(db.Text)
     location = db.Column(db.String(255))
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), index=True)
     job_type = db.Column(db.Enum('Full-time', 'Part-time', 'Contract', 'Internship'))
     experience_required = db.Column(db.Integer, default=0)
     salary_min = db.Column(db.Numeric(10, 2))
@@ -22,19 +26,26 @@ class JobPosting(db.Model):
 
 class JobApplication(db.Model):
     __tablename__ = 'job_applications'
+    __table_args__ = (
+        db.Index('ix_job_applications_job_applied', 'job_id', 'applied_at'),
+        db.Index('ix_job_applications_candidate_applied', 'candidate_id', 'applied_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_profiles.id'), nullable=False)
     cover_letter = db.Column(db.Text)
     application_status = db.Column(db.Enum('applied', 'under_review', 'shortlisted', 'interview_scheduled', 'rejected', 'hired'), default='applied')
     exam_score = db.Column(db.Numeric(5, 2))
-    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class JobRequiredSkill(db.Model):
     __tablename__ = 'job_required_skills'
+    __table_args__ = (
+        db.Index('ix_job_required_skills_skill_job', 'skill_id', 'job_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False, index=True)
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
     importance = db.Column(db.Enum('Required', 'Preferred', 'Nice to have'), default='Required')
     min_years_experience = db.Column(db.Integer, default=0)
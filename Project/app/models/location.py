@@ -0,0 +1,23 @@
+from extensions import db
+from datetime import datetime
+
+class Location(db.Model):
+    """Canonical place that free-text locations on profiles, jobs and companies resolve to.
+
+    Parts are stored lowercased; ``slug`` joins them so each place exists
+    once. Rows are never updated, only added.
+    """
+    __tablename__ = 'locations'
+    __table_args__ = (
+        db.Index('ix_locations_country_region', 'country', 'region'),
+        db.Index('ix_locations_region', 'region'),
+        db.Index('ix_locations_city', 'city'),
+        {'sqlite_autoincrement': True},
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(255), unique=True, nullable=False)
+    city = db.Column(db.String(100))
+    region = db.Column(db.String(100))
+    country = db.Column(db.String(100))
+    is_remote = db.Column(db.Boolean, default=False, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,35 @@
+from extensions import db
+from datetime import datetime
+
+class CandidateJobScore(db.Model):
+    """Materialized match score for one candidate/job pair.
+
+    Rows are deleted whenever an input to the score changes and are
+    recomputed lazily the next time the pair is read.
+    """
+    __tablename__ = 'candidate_job_scores'
+    __table_args__ = (
+        db.UniqueConstraint('candidate_id', 'job_id', name='uq_candidate_job_scores_pair'),
+        db.Index('ix_candidate_job_scores_job_total', 'job_id', 'total_score'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_profiles.id', ondelete='CASCADE'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='CASCADE'), nullable=False)
+    experience_score = db.Column(db.Integer, nullable=False, default=0)
+    skills_score = db.Column(db.Integer, nullable=False, default=0)
+    location_score = db.Column(db.Integer, nullable=False, default=0)
+    salary_score = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class MatchInputVersion(db.Model):
+    """Change counter of one candidate's or job's match score inputs.
+
+    Bumped in the transaction that changes the inputs, so a score computed
+    from the old inputs is recognised and never stored after the change.
+    """
+    __tablename__ = 'match_input_versions'
+    kind = db.Column(db.String(10), primary_key=True)  # 'candidate' or 'job'
+    entity_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,45 @@
+from extensions import db
+
+class CompanyApplicationStatusCount(db.Model):
+    """How many of a company's applications are in each status"""
+    __tablename__ = 'company_application_status_counts'
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+
+class CompanyApplicationDailyCount(db.Model):
+    """How many applications a company received on each day (by applied_at)"""
+    __tablename__ = 'company_application_daily_counts'
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+
+class JobApplicationCount(db.Model):
+    """How many applications a job posting has received"""
+    __tablename__ = 'job_application_counts'
+    __table_args__ = (
+        db.Index('ix_job_application_counts_company_applications', 'company_id', 'applications'),
+    )
+    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='CASCADE'), primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id', ondelete='CASCADE'), nullable=False)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyRollup(db.Model):
+    """Events of a metric per day, split by a dimension ('' when the metric has none).
+
+    E.g. metric 'signups' with the user type as dimension. Primary key
+    order serves a date range scan of one metric.
+    """
+    __tablename__ = 'daily_rollups'
+    metric = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    dimension = db.Column(db.String(50), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class HourlyRollup(db.Model):
+    """Events of a metric per hour (bucket start), split like DailyRollup"""
+    __tablename__ = 'hourly_rollups'
+    metric = db.Column(db.String(50), primary_key=True)
+    hour = db.Column(db.DateTime, primary_key=True)
+    dimension = db.Column(db.String(50), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
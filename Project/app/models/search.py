@@ -0,0 +1,31 @@
+from sqlalchemy import DDL, event
+from extensions import db
+
+# Full-text search documents for active job postings (title, description +
+# requirements, company name), keyed by job id. There is no ORM model: each
+# backend gets its native full-text table, created alongside the others by
+# db.create_all() and kept in sync by services/job_search_service.py.
+
+JOB_SEARCH_TABLES = {
+    'mysql': 'job_search_documents',
+    'sqlite': 'job_search_fts',
+}
+
+# CREATE statement of each backend's table, also run by the migration that
+# adds it to existing databases
+JOB_SEARCH_DDL = {
+    'mysql': '''
+CREATE TABLE IF NOT EXISTS job_search_documents (
+    job_id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    body MEDIUMTEXT,
+    company_name VARCHAR(255),
+    FULLTEXT KEY ft_job_search_documents (title, body, company_name),
+    CONSTRAINT fk_job_search_documents_job FOREIGN KEY (job_id) REFERENCES job_postings (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+''',
+    'sqlite': "CREATE VIRTUAL TABLE IF NOT EXISTS job_search_fts USING fts5(title, body, company_name, tokenize='porter unicode61')",
+}
+
+for _dialect, _ddl in JOB_SEARCH_DDL.items():
+    event.listen(db.Model.metadata, 'after_create', DDL(_ddl).execute_if(dialect=_dialect))
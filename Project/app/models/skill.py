@@ -11,8 +11,36 @@ class Skill(db.Model):
 
 class CandidateSkill(db.Model):
     __tablename__ = 'candidate_skills'
+    __table_args__ = (
+        db.Index('ix_candidate_skills_skill_candidate', 'skill_id', 'candidate_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_profiles.id'), nullable=False)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_profiles.id'), nullable=False, index=True)
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
     proficiency_level = db.Column(db.Enum('Beginner', 'Intermediate', 'Advanced', 'Expert'), default='Intermediate')
     years_experience = db.Column(db.Integer, default=0)
+
+class SkillCooccurrence(db.Model):
+    """How many candidates and jobs list both skills (skill_id <= other_skill_id).
+
+    The diagonal (skill_id == other_skill_id) holds how many list the skill at all.
+    """
+    __tablename__ = 'skill_cooccurrences'
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+    other_skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True, index=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class SkillCooccurrenceDelta(db.Model):
+    """Pending change to a SkillCooccurrence count, folded in by the next similarity build"""
+    __tablename__ = 'skill_cooccurrence_deltas'
+    id = db.Column(db.Integer, primary_key=True)
+    skill_id = db.Column(db.Integer, nullable=False)
+    other_skill_id = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+
+class SkillSimilarity(db.Model):
+    """Nearest neighbours of a skill by co-occurrence, used for partial-credit matching"""
+    __tablename__ = 'skill_similarities'
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+    similar_skill_id = db.Column(db.Integer, db.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True)
+    similarity = db.Column(db.Float, nullable=False)
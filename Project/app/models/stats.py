@@ -0,0 +1,22 @@
+from extensions import db
+from datetime import datetime
+
+class PlatformStats(db.Model):
+    """Running totals shown on the admin dashboard, kept in a single row.
+
+    Adjusted in the same transaction as every insert, delete or relevant
+    update of the counted rows, and recounted by 'flask rebuild-platform-stats'.
+    """
+    __tablename__ = 'platform_stats'
+    id = db.Column(db.Integer, primary_key=True)
+    users = db.Column(db.Integer, nullable=False, default=0)
+    candidates = db.Column(db.Integer, nullable=False, default=0)
+    employers = db.Column(db.Integer, nullable=False, default=0)
+    interviewers = db.Column(db.Integer, nullable=False, default=0)
+    jobs = db.Column(db.Integer, nullable=False, default=0)
+    active_jobs = db.Column(db.Integer, nullable=False, default=0)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    skills = db.Column(db.Integer, nullable=False, default=0)
+    companies = db.Column(db.Integer, nullable=False, default=0)
+    pending_interviewer_apps = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
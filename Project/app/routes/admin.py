@@ -5,8 +5,12 @@ from models import (
     Company, Skill, CandidateSkill, JobRequiredSkill, CandidateProfile,
     InterviewRoom, InterviewParticipant, InterviewFeedback, InterviewerRecommendation,
     InterviewerApplication, InterviewerProfile, InterviewerSkill, InterviewerIndustry,
-    InterviewerCertification, InterviewerJobRole
+    InterviewerCertification, InterviewerJobRole, CompanyApplicationStatusCount
 )
+from services.cache import cache_stats
+from services.pagination import keyset_paginate
+from services.platform_stats import platform_stats
+from services.time_series import daily_series, hourly_series, total_between
 from datetime import datetime, timedelta
 from io import BytesIO
 from sqlalchemy import func, text, and_, or_
@@ -22,23 +26,27 @@ def admin_dashboard():
     if 'user_id' not in session or session['user_type'] != 'admin':
         return redirect(url_for('auth.login'))
     
-    # System statistics
+    # System statistics: running totals from the platform_stats row, today's
+    # counts from the time-series rollups
+    counters = platform_stats()
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
     stats = {
-        'total_users': User.query.count(),
-        'total_candidates': User.query.filter_by(user_type='candidate').count(),
-        'candidates': User.query.filter_by(user_type='candidate').count(),
-        'total_employers': User.query.filter_by(user_type='employer').count(),
-        'employers': User.query.filter_by(user_type='employer').count(),
-        'total_interviewers': User.query.filter_by(user_type='interviewer').count(),
-        'interviewers': User.query.filter_by(user_type='interviewer').count(),
-        'pending_interviewer_apps': InterviewerApplication.query.filter_by(status='pending').count(),
-        'total_jobs': JobPosting.query.count(),
-        'active_jobs': JobPosting.query.filter_by(is_active=True).count(),
-        'total_applications': JobApplication.query.count(),
-        'total_skills': Skill.query.count(),
-        'total_companies': Company.query.count(),
-        'new_users_today': User.query.filter(func.date(User.created_at) == func.date(datetime.now())).count(),
-        'new_applications_today': JobApplication.query.filter(func.date(JobApplication.applied_at) == func.date(datetime.now())).count()
+        'total_users': counters.users,
+        'total_candidates': counters.candidates,
+        'candidates': counters.candidates,
+        'total_employers': counters.employers,
+        'employers': counters.employers,
+        'total_interviewers': counters.interviewers,
+        'interviewers': counters.interviewers,
+        'pending_interviewer_apps': counters.pending_interviewer_apps,
+        'total_jobs': counters.jobs,
+        'active_jobs': counters.active_jobs,
+        'total_applications': counters.applications,
+        'total_skills': counters.skills,
+        'total_companies': counters.companies,
+        'new_users_today': total_between('signups', today, tomorrow),
+        'new_applications_today': total_between('applications', today, tomorrow)
     }
     
     # Recent activity
@@ -47,13 +55,8 @@ def admin_dashboard():
     ).limit(20).all()
     
     # User registration trends (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    daily_registrations = db.session.query(
-        func.date(User.created_at).label('date'),
-        func.count(User.id).label('count')
-    ).filter(
-        User.created_at >= thirty_days_ago
-    ).group_by(func.date(User.created_at)).all()
+    thirty_days_ago = datetime.utcnow().date() - timedelta(days=30)
+    daily_registrations = daily_series('signups', thirty_days_ago, datetime.utcnow().date())
     
     return render_template('admin/admin_dashboard.html',
                          stats=stats,
@@ -67,7 +70,7 @@ def admin_users():
     if 'user_id' not in session or session['user_type'] != 'admin':
         return redirect(url_for('auth.login'))
     
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     search = request.args.get('search', '')
     user_type = request.args.get('user_type', '')
     
@@ -85,9 +88,7 @@ def admin_users():
     if user_type:
         query = query.filter(User.user_type == user_type)
     
-    users = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    users = keyset_paginate(query, [(User.created_at, True), (User.id, True)], cursor, per_page=20)
     
     return render_template('admin/admin_users.html',
                          users=users,
@@ -188,7 +189,7 @@ def admin_activity_logs():
     
     from datetime import datetime
     
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     table_filter = request.args.get('table', '')
     operation_filter = request.args.get('operation', '')
     date_from = request.args.get('date_from', '')
@@ -218,9 +219,7 @@ def admin_activity_logs():
         except ValueError:
             pass
     
-    logs = query.order_by(ActivityLog.timestamp.desc()).paginate(
-        page=page, per_page=50, error_out=False
-    )
+    logs = keyset_paginate(query, [(ActivityLog.timestamp, True), (ActivityLog.id, True)], cursor, per_page=50)
     
     # Get unique table names and operations
     tables = db.session.query(ActivityLog.table_name).distinct().all()
@@ -243,33 +242,44 @@ def admin_reports():
     if 'user_id' not in session or session['user_type'] != 'admin':
         return redirect(url_for('auth.login'))
     
+    # Reporting period, whole days inclusive (last 30 days by default)
+    end_day = _parse_day(request.args.get('end')) or datetime.utcnow().date()
+    start_day = _parse_day(request.args.get('start')) or end_day - timedelta(days=30)
+    if start_day > end_day:
+        start_day, end_day = end_day, start_day
+    granularity = 'hour' if request.args.get('granularity') == 'hour' else 'day'
+    
     # Generate various reports
     reports = {
-        'user_growth': get_user_growth_report(),
+        'user_growth': get_user_growth_report(start_day, end_day, granularity),
         'job_statistics': get_job_statistics_report(),
-        'application_trends': get_application_trends_report(),
-        'skill_demand': get_skill_demand_report()
+        'application_trends': get_application_trends_report(start_day, end_day, granularity),
+        'skill_demand': get_skill_demand_report(),
+        'start': start_day,
+        'end': end_day,
+        'granularity': granularity
     }
     
     return render_template('admin/admin_reports.html', reports=reports)
 
 # --- REPORT GENERATION FUNCTIONS ---
 
-def get_user_growth_report():
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+def _series(metric, start_day, end_day, granularity, by_dimension=False):
+    """Rollup rows of a metric over whole days start_day to end_day"""
+    if granularity == 'hour':
+        start = datetime.combine(start_day, datetime.min.time())
+        return hourly_series(metric, start, start + timedelta(days=(end_day - start_day).days + 1), by_dimension)
+    return daily_series(metric, start_day, end_day, by_dimension)
+
+def get_user_growth_report(start_day, end_day, granularity='day'):
     """Generate user growth report"""
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    
-    growth_data = db.session.query(
-        func.date(User.created_at).label('date'),
-        User.user_type,
-        func.count(User.id).label('count')
-    ).filter(
-        User.created_at >= thirty_days_ago
-    ).group_by(
-        func.date(User.created_at), User.user_type
-    ).order_by(func.date(User.created_at)).all()
-    
-    return growth_data
+    return _series('signups', start_day, end_day, granularity, by_dimension=True)
 
 def get_job_statistics_report():
     """Generate job statistics report"""
@@ -296,22 +306,15 @@ def get_job_statistics_report():
     
     return stats
 
-def get_application_trends_report():
+def get_application_trends_report(start_day, end_day, granularity='day'):
     """Generate application trends report"""
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    
     trends = {
-        'daily_applications': db.session.query(
-            func.date(JobApplication.applied_at).label('date'),
-            func.count(JobApplication.id).label('count')
-        ).filter(
-            JobApplication.applied_at >= thirty_days_ago
-        ).group_by(func.date(JobApplication.applied_at)).all(),
+        'daily_applications': _series('applications', start_day, end_day, granularity),
         
         'status_distribution': db.session.query(
-            JobApplication.application_status,
-            func.count(JobApplication.id)
-        ).group_by(JobApplication.application_status).all()
+            CompanyApplicationStatusCount.status,
+            func.sum(CompanyApplicationStatusCount.applications)
+        ).group_by(CompanyApplicationStatusCount.status).all()
     }
     
     return trends
@@ -328,6 +331,15 @@ def get_skill_demand_report():
     
     return skill_demand
 
+
+@bp.route('/cache-stats')
+def admin_cache_stats():
+    """Hit, miss and eviction counters of this worker's in-process caches"""
+    if 'user_id' not in session or session['user_type'] != 'admin':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    
+    return jsonify(cache_stats())
+
 # --- EXPORT ROUTES ---
 
 @bp.route('/export/<data_type>')
@@ -831,7 +843,7 @@ def manage_interviewers():
     if 'user_id' not in session or session['user_type'] != 'admin':
         return redirect(url_for('auth.login'))
     
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     type_filter = request.args.get('type', '')
     status_filter = request.args.get('status', '')
     search = request.args.get('search', '')
@@ -855,8 +867,8 @@ def manage_interviewers():
             )
         )
     
-    interviewers = query.order_by(InterviewerProfile.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
+    interviewers = keyset_paginate(
+        query, [(InterviewerProfile.created_at, True), (InterviewerProfile.id, True)], cursor, per_page=20
     )
     
     return render_template('admin/manage_interviewers.html',
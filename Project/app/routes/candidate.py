@@ -6,47 +6,17 @@ import os
 from extensions import db
 from models import (
     User, CandidateProfile, JobPosting, JobApplication, Company, 
-    MCQExam, ExamAttempt, Skill, CandidateSkill, JobRequiredSkill, 
-    Notification, InterviewRoom
+    Skill, CandidateSkill, JobRequiredSkill, InterviewRoom, ApplicationStatusHistory
 )
-from services import create_notification, log_activity, calculate_job_match_score
+from services import create_notification, log_activity
+from services.recommendation_service import job_recommendations
+from services.candidate_dashboard import candidate_dashboard_snapshot
+from services.skill_catalogue import get_skill_catalogue
+from services.batch_loading import load_children
 from utils import allowed_file
 
 candidate_bp = Blueprint('candidate', __name__)
 
-def get_job_recommendations(candidate_id):
-    """Get personalized job recommendations for a candidate"""
-    candidate = CandidateProfile.query.get(candidate_id)
-    if not candidate:
-        return []
-    
-    # Get jobs the candidate hasn't applied to
-    applied_job_ids = db.session.query(JobApplication.job_id).filter_by(
-        candidate_id=candidate_id
-    ).subquery()
-    
-    available_jobs = db.session.query(JobPosting, Company).join(
-        Company, JobPosting.company_id == Company.id
-    ).filter(
-        JobPosting.is_active == True,
-        ~JobPosting.id.in_(applied_job_ids)
-    ).all()
-    
-    # Calculate match scores and sort
-    job_matches = []
-    for job, company in available_jobs:
-        match_score = calculate_job_match_score(candidate_id, job.id)
-        if match_score > 30:  # Only show jobs with decent match
-            job_matches.append({
-                'job': job,
-                'company': company,
-                'match_score': match_score
-            })
-    
-    # Sort by match score
-    job_matches.sort(key=lambda x: x['match_score'], reverse=True)
-    
-    return job_matches[:10]  # Return top 10 matches
 @candidate_bp.route('/candidate/dashboard')
 def candidate_dashboard():
     if 'user_id' not in session or session['user_type'] != 'candidate':
@@ -55,54 +25,8 @@ def candidate_dashboard():
     user = User.query.get(session['user_id'])
     profile = user.candidate_profile
 
-    # Get recent applications
-    applications = db.session.query(JobApplication, JobPosting, Company).join(
-        JobPosting, JobApplication.job_id == JobPosting.id
-    ).join(
-        Company, JobPosting.company_id == Company.id
-    ).filter(
-        JobApplication.candidate_id == profile.id
-    ).order_by(JobApplication.applied_at.desc()).limit(5).all()
-
-    # Get smart recommendations based on skills and experience
-    recommendations = get_job_recommendations(profile.id)
-
-    # Get notifications
-    notifications = Notification.query.filter_by(
-        user_id=session['user_id'], is_read=False
-    ).order_by(Notification.created_at.desc()).limit(5).all()
-
-    # Get exam invitations
-    exam_invitations = db.session.query(MCQExam, JobPosting, Company).join(
-        JobPosting, MCQExam.job_id == JobPosting.id
-    ).join(
-        Company, JobPosting.company_id == Company.id
-    ).join(
-        JobApplication, JobApplication.job_id == JobPosting.id
-    ).filter(
-        JobApplication.candidate_id == profile.id,
-        MCQExam.is_active == True,
-        ~MCQExam.id.in_(
-            db.session.query(ExamAttempt.exam_id).filter_by(
-                candidate_id=profile.id, status='completed'
-            )
-        )
-    ).all()
-
-    # Get total applications count
-    applications_count = JobApplication.query.filter_by(candidate_id=profile.id).count()
-    
-    # Get upcoming interviews count
-    interviews_count = db.session.query(InterviewRoom).join(
-        JobApplication, InterviewRoom.job_application_id == JobApplication.id
-    ).filter(
-        JobApplication.candidate_id == profile.id,
-        InterviewRoom.status.in_(['scheduled', 'active']),
-        InterviewRoom.scheduled_time >= datetime.utcnow()
-    ).count()
-    
-    # Get exams count
-    exams_count = db.session.query(ExamAttempt).filter_by(candidate_id=profile.id).count()
+    # Applications, recommendations, notifications, exams and interviews
+    snapshot = candidate_dashboard_snapshot(user.id, profile.id)
     
     # Calculate profile strength (simplified calculation)
     profile_strength = 0
@@ -112,30 +36,17 @@ def candidate_dashboard():
         filled_fields = sum(1 for field in fields if field)
         profile_strength = int((filled_fields / len(fields)) * 100)
     
-    # Get upcoming interviews for candidate
-    upcoming_interviews = db.session.query(InterviewRoom, JobApplication, JobPosting, Company).join(
-        JobApplication, InterviewRoom.job_application_id == JobApplication.id
-    ).join(
-        JobPosting, JobApplication.job_id == JobPosting.id
-    ).join(
-        Company, JobPosting.company_id == Company.id
-    ).filter(
-        JobApplication.candidate_id == profile.id,
-        InterviewRoom.status.in_(['scheduled', 'active']),
-        InterviewRoom.scheduled_time >= datetime.utcnow()
-    ).order_by(InterviewRoom.scheduled_time.asc()).all()
-
     return render_template('candidate/candidate_dashboard.html',
                           user=user,
                           profile=profile,
-                          applications=applications,
-                          recommendations=recommendations,
-                          notifications=notifications,
-                          exam_invitations=exam_invitations,
-                          upcoming_interviews=upcoming_interviews,
-                          applications_count=applications_count,
-                          interviews_count=interviews_count,
-                          exams_count=exams_count,
+                          applications=snapshot.applications,
+                          recommendations=snapshot.recommendations,
+                          notifications=snapshot.notifications,
+                          exam_invitations=snapshot.exam_invitations,
+                          upcoming_interviews=snapshot.upcoming_interviews,
+                          applications_count=snapshot.applications_count,
+                          interviews_count=snapshot.interviews_count,
+                          exams_count=snapshot.exams_count,
                           profile_strength=profile_strength)
 
 
@@ -148,7 +59,7 @@ def candidate_profile():
     profile = user.candidate_profile
     
     # Get available skills and candidate's current skills
-    available_skills = Skill.query.order_by(Skill.category, Skill.skill_name).all()
+    available_skills = get_skill_catalogue().by_category
     candidate_skills = db.session.query(CandidateSkill, Skill).join(Skill).filter(
         CandidateSkill.candidate_id == profile.id
     ).all()
@@ -197,8 +108,9 @@ def candidate_profile():
             # Handle skills
             selected_skills = request.form.getlist('skills[]')
             
-            # Remove old skills
-            CandidateSkill.query.filter_by(candidate_id=profile.id).delete()
+            # Remove old skills (through the session so stored match scores are invalidated)
+            for old_skill in CandidateSkill.query.filter_by(candidate_id=profile.id).all():
+                db.session.delete(old_skill)
             
             # Add new skills
             for skill_id in selected_skills:
@@ -265,14 +177,12 @@ def candidate_applications():
         JobApplication.candidate_id == profile.id
     ).order_by(JobApplication.applied_at.desc()).all()
     
-    # Get status history for each application
-    from models import ApplicationStatusHistory
-    application_histories = {}
-    for app, job, company in applications:
-        history = ApplicationStatusHistory.query.filter_by(
-            application_id=app.id
-        ).order_by(ApplicationStatusHistory.changed_at.desc()).all()
-        application_histories[app.id] = history
+    # Status history of every application in one query
+    application_histories = load_children(
+        ApplicationStatusHistory.query.order_by(ApplicationStatusHistory.changed_at.desc()),
+        ApplicationStatusHistory.application_id,
+        [app.id for app, job, company in applications]
+    )
     
     return render_template('candidate/candidate_applications.html',
                          applications=applications,
@@ -288,7 +198,7 @@ def candidate_recommendations():
     user = User.query.get(session['user_id'])
     profile = user.candidate_profile
     
-    recommendations = get_job_recommendations(profile.id)
+    recommendations = job_recommendations(profile.id)
     
     return render_template('candidate/candidate_recommendations.html',
                          recommendations=recommendations,
@@ -309,17 +219,23 @@ def candidate_skill_analysis():
     ).all()
     
     # Get detailed job analysis
-    recommendations = get_job_recommendations(profile.id)
+    recommendations = job_recommendations(profile.id)
     
-    # Analyze skill gaps
+    # Analyze skill gaps of the top 5 recommendations, loading their
+    # required skills in one query
+    top_recommendations = recommendations[:5]
+    required_skills_by_job = load_children(
+        db.session.query(JobRequiredSkill, Skill).join(Skill),
+        JobRequiredSkill.job_id,
+        [rec['job'].id for rec in top_recommendations]
+    )
+    candidate_skill_ids = {cs.skill_id for cs, _ in candidate_skills}
+
     skill_gap_analysis = []
-    for rec in recommendations[:5]:  # Top 5 recommendations
+    for rec in top_recommendations:
         job = rec['job']
-        required_skills = db.session.query(JobRequiredSkill, Skill).join(Skill).filter(
-            JobRequiredSkill.job_id == job.id
-        ).all()
+        required_skills = required_skills_by_job[job.id]
         
-        candidate_skill_ids = [cs.skill_id for cs, _ in candidate_skills]
         missing_skills = []
         matching_skills = []
         
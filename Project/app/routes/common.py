@@ -3,6 +3,7 @@ from extensions import db
 from models import User, Notification
 from datetime import datetime, timedelta
 from sqlalchemy import func, or_
+from services.pagination import keyset_paginate
 
 bp = Blueprint('common', __name__)
 
@@ -14,15 +15,17 @@ def notifications():
         return redirect(url_for('auth.login'))
 
     # --- filtering & pagination -------------------------------
-    page        = request.args.get('page', 1, type=int)
+    cursor      = request.args.get('cursor')
     base_q      = Notification.query.filter_by(user_id=session['user_id'])
     if request.args.get('filter') == 'unread':
         base_q = base_q.filter_by(is_read=False)
     if request.args.get('type'):
         base_q = base_q.filter_by(notification_type=request.args['type'])
 
-    notifications_data = base_q.order_by(Notification.created_at.desc()) \
-                          .paginate(page=page, per_page=20, error_out=False)
+    notifications_data = keyset_paginate(
+        base_q, [(Notification.created_at, True), (Notification.id, True)],
+        cursor, per_page=20, count_limit=1000
+    )
 
     # --- date cut-offs that the template will use --------------
     now            = datetime.utcnow()
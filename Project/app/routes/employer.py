@@ -11,10 +11,16 @@ from models import (
     CandidateProfile, CandidateSkill, Skill, MCQExam, MCQQuestion,
     InterviewerRecommendation, ActivityLog, Notification, ApplicationStatusHistory, InterviewRoom,
     InterviewerProfile, InterviewerSkill, InterviewerIndustry, InterviewerAvailability,
-    InterviewerReview, InterviewerJobRole
+    InterviewerReview, InterviewerJobRole, CandidateJobScore
 )
 from services import log_activity, create_notification
-from services.job_matching_service import calculate_job_match_score
+from services.match_score_store import get_match_score, ensure_scores_stored
+from services.candidate_ranking_service import rank_candidates_for_job
+from services.job_alert_service import queue_job_match_notifications
+from services.skill_catalogue import get_skill_catalogue
+from services.employer_rollups import (
+    applications_by_status, applications_since, jobs_with_application_counts, top_jobs_by_applications
+)
 from utils.file_utils import allowed_file
 from flask import send_file
 import json
@@ -118,32 +124,12 @@ def get_company_logo(company_id):
 def get_employer_analytics(company_id):
     """Get analytics data for employer dashboard"""
     # Total applications this month
-    current_month = datetime.now().replace(day=1)
-    total_applications = db.session.query(JobApplication).join(JobPosting).filter(
-        JobPosting.company_id == company_id,
-        JobApplication.applied_at >= current_month
-    ).count()
-    
-    # Applications by status
-    status_counts = db.session.query(
-        JobApplication.application_status,
-        func.count(JobApplication.id)
-    ).join(JobPosting).filter(
-        JobPosting.company_id == company_id
-    ).group_by(JobApplication.application_status).all()
-    
-    # Top performing jobs (by application count)
-    top_jobs = db.session.query(
-        JobPosting.title,
-        func.count(JobApplication.id).label('app_count')
-    ).outerjoin(JobApplication).filter(
-        JobPosting.company_id == company_id
-    ).group_by(JobPosting.id).order_by(func.count(JobApplication.id).desc()).limit(5).all()
+    current_month = datetime.now().date().replace(day=1)
     
     return {
-        'total_applications': total_applications,
-        'status_counts': dict(status_counts),
-        'top_jobs': top_jobs
+        'total_applications': applications_since(company_id, current_month),
+        'status_counts': applications_by_status(company_id),
+        'top_jobs': top_jobs_by_applications(company_id)
     }
 
 
@@ -156,12 +142,7 @@ def employer_dashboard():
     company = user.company
     
     # Get job postings with application counts
-    job_postings = db.session.query(
-        JobPosting,
-        func.count(JobApplication.id).label('application_count')
-    ).outerjoin(JobApplication).filter(
-        JobPosting.company_id == company.id
-    ).group_by(JobPosting.id).order_by(JobPosting.created_at.desc()).all()
+    job_postings = jobs_with_application_counts(company.id)
     
     # Get recent applications
     applications = db.session.query(JobApplication, JobPosting, CandidateProfile, User).join(
@@ -188,12 +169,9 @@ def employer_dashboard():
         JobPosting.is_active == True
     ).count()
     
-    # Get new applications (this week)
-    one_week_ago = datetime.now() - timedelta(days=7)
-    new_applications = db.session.query(JobApplication).join(JobPosting).filter(
-        JobPosting.company_id == company.id,
-        JobApplication.applied_at >= one_week_ago
-    ).count()
+    # Get new applications (this week: the last 7 days, today included)
+    week_start = datetime.now().date() - timedelta(days=6)
+    new_applications = applications_since(company.id, week_start)
     
     # Get scheduled interviews
     scheduled_interviews = db.session.query(InterviewRoom).join(
@@ -233,12 +211,7 @@ def employer_jobs():
     user = User.query.get(session['user_id'])
     company = user.company
     
-    job_postings = db.session.query(
-        JobPosting,
-        func.count(JobApplication.id).label('application_count')
-    ).outerjoin(JobApplication).filter(
-        JobPosting.company_id == company.id
-    ).group_by(JobPosting.id).order_by(JobPosting.created_at.desc()).all()
+    job_postings = jobs_with_application_counts(company.id)
     
     return render_template('employer/employer_jobs.html',
                          job_postings=job_postings,
@@ -287,6 +260,9 @@ def create_job():
             
             db.session.commit()
             
+            # Tell matching candidates about the new posting without holding up the response
+            queue_job_match_notifications(job.id)
+            
             flash('Job posting created successfully!', 'success')
             return redirect(url_for('employer.employer_jobs'))
             
@@ -295,11 +271,39 @@ def create_job():
             flash(f'Error creating job posting: {str(e)}', 'error')
     
     # Get all skills for the form
-    skills = Skill.query.order_by(Skill.skill_name).all()
+    skills = get_skill_catalogue().by_name
     
     return render_template('employer/create_job.html', user=user, company=company, skills=skills)
 
 
+@bp.route('/job/<int:job_id>/candidates')
+def job_candidates(job_id):
+    """Rank all candidates on the platform for one of the employer's jobs"""
+    if 'user_id' not in session or session['user_type'] != 'employer':
+        return redirect(url_for('auth.login'))
+    
+    user = User.query.get(session['user_id'])
+    company = user.company
+    
+    # Verify job belongs to this employer
+    job = JobPosting.query.filter_by(id=job_id, company_id=company.id).first()
+    if not job:
+        flash('Job not found.', 'error')
+        return redirect(url_for('employer.employer_dashboard'))
+    
+    page = request.args.get('page', 1, type=int)
+    min_score = request.args.get('min_score', 30, type=int)
+    
+    candidates = rank_candidates_for_job(job.id, page=page, per_page=20, min_score=min_score)
+    
+    return render_template('employer/job_candidates.html',
+                         user=user,
+                         company=company,
+                         job=job,
+                         candidates=candidates,
+                         min_score=min_score)
+
+
 @bp.route('/job/<int:job_id>/exam', methods=['GET', 'POST'])
 def manage_job_exam(job_id):
     if 'user_id' not in session or session['user_type'] != 'employer':
@@ -403,8 +407,11 @@ def employer_applications():
         return redirect(url_for('employer.employer_dashboard'))
     
     # Get applications with filters
+    page = request.args.get('page', 1, type=int)
     status_filter = request.args.get('status', '')
     job_filter = request.args.get('job_id', '')
+    sort = request.args.get('sort', 'newest')
+    min_score = request.args.get('min_score', 0, type=int)
     
     query = db.session.query(JobApplication, JobPosting, CandidateProfile, User).join(
         JobPosting, JobApplication.job_id == JobPosting.id
@@ -422,13 +429,26 @@ def employer_applications():
     if job_filter:
         query = query.filter(JobPosting.id == int(job_filter))
     
-    applications_raw = query.order_by(JobApplication.applied_at.desc()).all()
+    # Score any new applications once so sorting and filtering by match happen in SQL
+    ensure_scores_stored(query, JobApplication.candidate_id, JobApplication.job_id)
+    match_score = func.coalesce(CandidateJobScore.total_score, 0)
+    query = query.outerjoin(
+        CandidateJobScore,
+        and_(CandidateJobScore.candidate_id == JobApplication.candidate_id, CandidateJobScore.job_id == JobApplication.job_id)
+    ).add_columns(match_score)
+
+    if min_score:
+        query = query.filter(match_score >= min_score)
+    
+    if sort == 'match':
+        query = query.order_by(match_score.desc(), JobApplication.applied_at.desc())
+    elif sort == 'oldest':
+        query = query.order_by(JobApplication.applied_at.asc())
+    else:
+        query = query.order_by(JobApplication.applied_at.desc())
     
-    # Calculate match scores for each application
-    applications = []
-    for app, job, candidate, candidate_user in applications_raw:
-        match_score = calculate_job_match_score(candidate.id, job.id)
-        applications.append((app, job, candidate, candidate_user, match_score))
+    pagination = query.paginate(page=page, per_page=20, error_out=False)
+    applications = pagination.items
     
     # Get company jobs for filter
     company_jobs = JobPosting.query.filter_by(company_id=company.id).all()
@@ -439,7 +459,10 @@ def employer_applications():
         company=company,
         user=user,
         status_filter=status_filter,
-        job_filter=job_filter)
+        job_filter=job_filter,
+        sort=sort,
+        min_score=min_score,
+        pagination=pagination)
 
 
 @bp.route('/application/<int:application_id>')
@@ -486,8 +509,8 @@ def employer_view_application(application_id):
         application_id=application_id
     ).order_by(ApplicationStatusHistory.changed_at.desc()).all()
     
-    # Calculate match score
-    match_score = calculate_job_match_score(candidate.id, job.id)
+    # Stored match score
+    match_score = get_match_score(candidate.id, job.id)
     
     # Get available interviewers for recommendation
     available_interviewers = User.query.filter_by(
@@ -1,10 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from extensions import db
-from models import User, Skill, InterviewerApplication, InterviewerProfile
+from models import User, InterviewerApplication, InterviewerProfile
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 import json
 import traceback
+from services.skill_catalogue import get_skill_catalogue
 
 bp = Blueprint('expert_application', __name__)
 
@@ -15,7 +16,7 @@ bp = Blueprint('expert_application', __name__)
 @bp.route('/become-expert-interviewer')
 def become_expert():
     """Landing page for expert interviewer application"""
-    skills = Skill.query.order_by(Skill.skill_name).all()
+    skills = get_skill_catalogue().by_name
     
     # Common industries list
     industries = [
@@ -96,7 +97,7 @@ def apply_as_expert():
             skills_data = []
             for skill_id in skill_ids:
                 try:
-                    skill = Skill.query.get(int(skill_id))
+                    skill = get_skill_catalogue().get(skill_id)
                     if skill:
                         skills_data.append({
                             'id': skill.id,
@@ -179,7 +180,7 @@ def apply_as_expert():
             return redirect(url_for('expert_application.apply_as_expert'))
     
     # GET request - show form
-    skills = Skill.query.order_by(Skill.skill_name).all()
+    skills = get_skill_catalogue().by_name
     industries = [
         'Technology', 'Finance & Banking', 'Healthcare', 'E-commerce',
         'Education', 'Manufacturing', 'Telecommunications', 'Media & Entertainment',
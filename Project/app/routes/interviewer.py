@@ -1,12 +1,14 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, send_file
 from extensions import db
 from models import (
-    User, InterviewRoom, InterviewParticipant, Skill,
+    User, InterviewRoom, InterviewParticipant,
     InterviewerProfile, InterviewerSkill, InterviewerIndustry, InterviewerCertification,
     InterviewerAvailability, InterviewerEarning, InterviewerReview, InterviewerJobRole,
     InterviewerApplication
 )
 from datetime import datetime, time
+from services.pagination import keyset_paginate
+from services.skill_catalogue import get_skill_catalogue
 import io
 
 bp = Blueprint('interviewer', __name__, url_prefix='/interviewer')
@@ -134,7 +136,7 @@ def apply_expert():
         flash('You already have a pending application. Please wait for admin review.', 'info')
         return redirect(url_for('interviewer.interviewer_dashboard'))
     
-    skills = Skill.query.order_by(Skill.skill_name).all()
+    skills = get_skill_catalogue().by_name
     industries = [
         'Technology', 'Finance & Banking', 'Healthcare', 'E-commerce',
         'Education', 'Manufacturing', 'Telecommunications', 'Media & Entertainment',
@@ -166,7 +168,7 @@ def apply_expert():
             skills_data = []
             for skill_id in selected_skills:
                 try:
-                    skill = Skill.query.get(int(skill_id))
+                    skill = get_skill_catalogue().get(skill_id)
                     if skill:
                         proficiency = request.form.get(f'skill_proficiency_{skill_id}', 'Expert')
                         skills_data.append({
@@ -283,7 +285,7 @@ def profile():
         db.session.add(profile)
         db.session.commit()
     
-    all_skills = Skill.query.order_by(Skill.skill_name).all()
+    all_skills = get_skill_catalogue().by_name
     reviews = InterviewerReview.query.filter_by(interviewer_id=profile.id, is_public=True).order_by(
         InterviewerReview.created_at.desc()
     ).limit(10).all()
@@ -378,7 +380,7 @@ def edit_profile():
             db.session.rollback()
             flash(f'Error updating profile: {str(e)}', 'error')
     
-    all_skills = Skill.query.order_by(Skill.skill_name).all()
+    all_skills = get_skill_catalogue().by_name
     
     return render_template('interviewer/edit_profile.html',
                          user=user,
@@ -487,7 +489,7 @@ def earnings():
         return redirect(url_for('interviewer.edit_profile'))
     
     # Get earnings with pagination
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     status_filter = request.args.get('status', '')
     
     earnings_query = InterviewerEarning.query.filter_by(interviewer_id=profile.id)
@@ -495,9 +497,9 @@ def earnings():
     if status_filter:
         earnings_query = earnings_query.filter_by(status=status_filter)
     
-    earnings_paginated = earnings_query.order_by(
-        InterviewerEarning.created_at.desc()
-    ).paginate(page=page, per_page=20, error_out=False)
+    earnings_paginated = keyset_paginate(
+        earnings_query, [(InterviewerEarning.created_at, True), (InterviewerEarning.id, True)], cursor, per_page=20
+    )
     
     # Calculate totals
     total_earned = db.session.query(db.func.sum(InterviewerEarning.amount_earned)).filter(
@@ -1,31 +1,39 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_file
-from sqlalchemy import and_, or_, func
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, send_file, current_app, jsonify
+from sqlalchemy import and_, or_, func, case
 from datetime import datetime
 from extensions import db
 from models import (
     User, JobPosting, Company, CandidateProfile, JobApplication, 
     JobRequiredSkill, Skill, ApplicationStatusHistory, InterviewRoom, CandidateSkill
 )
-from services import create_notification, log_activity, calculate_job_match_score
+from services import create_notification, log_activity, get_match_score
+from services.location_service import location_ids_matching
+from services.job_search_service import search_matches
+from services.job_search_engine import job_search_engine, jobs_with_companies
+from services.pagination import KeysetPage, keyset_paginate, paginate_ids
+from services.job_facets import job_facet_index, EXPERIENCE_BANDS
+from services.skill_catalogue import get_skill_catalogue
+from services.job_search_cache import JobSearchPage, search_cache_key, cached_search_page
+from services.autocomplete import autocomplete
 
 job_bp = Blueprint('job', __name__)
 
-@job_bp.route('/jobs')
-def browse_jobs():
-    page = request.args.get('page', 1, type=int)
-    search = request.args.get('q', '') or request.args.get('search', '')
-    location = request.args.get('location', '')
-    job_types = request.args.getlist('job_type')  # Support multiple job types
-    experience_level = request.args.get('experience', '') or request.args.get('experience_level', '')
-    salary_min = request.args.get('min_salary', type=int) or request.args.get('salary_min', type=int)
-    skill_id = request.args.get('skill', type=int)
-    sort = request.args.get('sort', 'newest')
+def _search_job_page(search, location, job_types, experience_level, salary_min, skill_id, sort, cursor):
+    """Compute one page of /jobs: ids, cursors, total and facet counts"""
+    # Keyword-only searches are answered by the in-memory engine; only the page is loaded
+    ranked_job_ids = None
+    if search and not (location or job_types or experience_level or salary_min or skill_id) \
+            and current_app.config.get('JOB_SEARCH_IN_MEMORY', True):
+        ranked_job_ids = job_search_engine.search(search, sort)
     
-    query = db.session.query(JobPosting, Company).join(Company).filter(
+    query = db.session.query(JobPosting.id).join(Company, JobPosting.company_id == Company.id).filter(
         JobPosting.is_active == True
     )
     
-    if search:
+    search_results = search_matches(search) if search and ranked_job_ids is None else None
+    if search_results is not None:
+        query = query.join(search_results, search_results.c.job_id == JobPosting.id)
+    elif search:
         query = query.filter(
             or_(
                 JobPosting.title.ilike(f'%{search}%'),
@@ -35,27 +43,30 @@ def browse_jobs():
         )
     
     if location:
-        query = query.filter(JobPosting.location.ilike(f'%{location}%'))
+        location_ids = location_ids_matching(location)
+        if location_ids is not None:
+            query = query.filter(JobPosting.location_id.in_(location_ids.subquery()))
+    
+    # Jobs left by the keyword and location filters, for the facet counts
+    if ranked_job_ids is not None:
+        facet_base = ranked_job_ids
+    elif search or location:
+        facet_base = [job_id for job_id, in query]
+    else:
+        facet_base = None
     
     if job_types:
         # Filter by multiple job types
         query = query.filter(JobPosting.job_type.in_(job_types))
     
-    if experience_level:
-        exp_ranges = {
-            'entry': (0, 2),
-            'mid': (2, 5),
-            'senior': (5, 50),
-            'executive': (10, 50)
-        }
-        if experience_level in exp_ranges:
-            min_exp, max_exp = exp_ranges[experience_level]
-            query = query.filter(
-                or_(
-                    JobPosting.experience_required.between(min_exp, max_exp),
-                    JobPosting.experience_required == None
-                )
+    if experience_level in EXPERIENCE_BANDS:
+        min_exp, max_exp = EXPERIENCE_BANDS[experience_level]
+        query = query.filter(
+            or_(
+                JobPosting.experience_required.between(min_exp, max_exp),
+                JobPosting.experience_required == None
             )
+        )
     
     if salary_min:
         query = query.filter(
@@ -72,26 +83,58 @@ def browse_jobs():
         ).subquery()
         query = query.filter(JobPosting.id.in_(job_ids_with_skill))
     
-    # Sorting
-    if sort == 'salary_high':
-        query = query.order_by(JobPosting.salary_max.desc().nullslast(), JobPosting.created_at.desc())
+    # Sorting; every order ends on the id so pages can resume after any row
+    if sort == 'relevance' and search_results is not None:
+        order_by = [(search_results.c.relevance, True)]
+    elif sort == 'salary_high':
+        order_by = [(func.coalesce(JobPosting.salary_max, -1), True)]
     elif sort == 'salary_low':
-        query = query.order_by(JobPosting.salary_min.asc().nullslast(), JobPosting.created_at.desc())
+        order_by = [(case((JobPosting.salary_min == None, 1), else_=0), False), (func.coalesce(JobPosting.salary_min, 0), False)]
     else:  # newest
-        query = query.order_by(JobPosting.created_at.desc())
+        order_by = []
+    order_by += [(JobPosting.created_at, True), (JobPosting.id, True)]
     
-    jobs = query.paginate(page=page, per_page=12, error_out=False)
+    if ranked_job_ids is not None:
+        page = paginate_ids(ranked_job_ids, cursor, per_page=12)
+    else:
+        page = keyset_paginate(query, order_by, cursor, per_page=12)
+    
+    facets = job_facet_index.facet_counts(facet_base, job_types, experience_level, salary_min, skill_id)
+    return JobSearchPage(list(page.items), page.next_cursor, page.prev_cursor, facets['total'], facets)
+
+@job_bp.route('/jobs')
+def browse_jobs():
+    cursor = request.args.get('cursor')
+    search = request.args.get('q', '') or request.args.get('search', '')
+    location = request.args.get('location', '')
+    job_types = request.args.getlist('job_type')  # Support multiple job types
+    experience_level = request.args.get('experience', '') or request.args.get('experience_level', '')
+    salary_min = request.args.get('min_salary', type=int) or request.args.get('salary_min', type=int)
+    skill_id = request.args.get('skill', type=int)
+    sort = request.args.get('sort', 'newest')
+    
+    # Popular filter combinations are served from the result cache; only the page's jobs are loaded
+    filters = (search, location, job_types, experience_level, salary_min, skill_id, sort, cursor)
+    result = cached_search_page(search_cache_key(*filters), lambda: _search_job_page(*filters))
+    jobs = KeysetPage(jobs_with_companies(result.job_ids), 12, result.next_cursor, result.prev_cursor, result.total)
     
     # Get total jobs count
-    total_jobs = db.session.query(JobPosting).filter(JobPosting.is_active == True).count()
+    total_jobs = job_facet_index.active_count()
     
     # Get all skills for filter
-    skills = Skill.query.order_by(Skill.skill_name).all()
+    catalogue = get_skill_catalogue()
+    skills = catalogue.by_name
+    facets = dict(result.facets)
+    facets['skills'] = [
+        (facet_skill_id, catalogue.by_id[facet_skill_id].skill_name, count)
+        for facet_skill_id, count in result.facets['skills'] if facet_skill_id in catalogue.by_id
+    ]
     
     return render_template('job/browse_jobs.html',
                          jobs=jobs,
                          total_jobs=total_jobs,
                          skills=skills,
+                         facets=facets,
                          search=search,
                          location=location,
                          job_types=job_types,
@@ -100,6 +143,14 @@ def browse_jobs():
                          skill_id=skill_id,
                          sort=sort)
 
+@job_bp.route('/jobs/autocomplete/<kind>')
+def autocomplete_filter(kind):
+    """Popular skills, job locations or companies starting with ?q= (JSON)"""
+    suggestions = autocomplete(kind, request.args.get('q', ''), request.args.get('limit', 10, type=int))
+    if suggestions is None:
+        return jsonify({'success': False, 'message': 'Unknown suggestion type'}), 404
+    return jsonify({'success': True, 'suggestions': suggestions})
+
 @job_bp.route('/job/<int:job_id>')
 def job_details(job_id):
     job_data = db.session.query(JobPosting, Company).join(Company).filter(
@@ -127,7 +178,7 @@ def job_details(job_id):
                 job_id=job_id, candidate_id=user.candidate_profile.id
             ).first()
             has_applied = application is not None
-            match_score = calculate_job_match_score(user.candidate_profile.id, job_id)
+            match_score = get_match_score(user.candidate_profile.id, job_id)
     
     # Get related jobs from same company
     related_jobs = JobPosting.query.filter(
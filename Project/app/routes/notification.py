@@ -3,6 +3,8 @@ from datetime import datetime, timedelta
 
 from extensions import db
 from models import Notification
+from services.pagination import keyset_paginate
+from services.notification_counts import mark_all_read
 
 bp = Blueprint('notification', __name__)
 
@@ -13,15 +15,17 @@ def notifications():
         return redirect(url_for('auth.login'))
 
     # --- filtering & pagination -------------------------------
-    page        = request.args.get('page', 1, type=int)
+    cursor      = request.args.get('cursor')
     base_q      = Notification.query.filter_by(user_id=session['user_id'])
     if request.args.get('filter') == 'unread':
         base_q = base_q.filter_by(is_read=False)
     if request.args.get('type'):
         base_q = base_q.filter_by(notification_type=request.args['type'])
 
-    notifications = base_q.order_by(Notification.created_at.desc()) \
-                          .paginate(page=page, per_page=20, error_out=False)
+    notifications = keyset_paginate(
+        base_q, [(Notification.created_at, True), (Notification.id, True)],
+        cursor, per_page=20, count_limit=1000
+    )
 
     # --- date cut-offs that the template will use --------------
     now            = datetime.utcnow()
@@ -63,9 +67,7 @@ def mark_all_notifications_read():
         return redirect(url_for('auth.login'))
     
     # Mark all unread notifications as read
-    Notification.query.filter_by(
-        user_id=session['user_id'], is_read=False
-    ).update({'is_read': True})
+    mark_all_read(session['user_id'])
     
     db.session.commit()
     
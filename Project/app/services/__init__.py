@@ -1,4 +1,13 @@
 from .notification_service import create_notification, log_activity
-from .job_matching_service import calculate_job_match_score
+from .job_matching_service import (
+    calculate_job_match_score, calculate_job_match_scores, calculate_candidate_match_scores
+)
+from .match_score_store import (
+    get_match_score, get_match_scores, get_candidate_match_scores, get_pair_match_scores
+)
 
-__all__ = ['create_notification', 'log_activity', 'calculate_job_match_score']
+__all__ = [
+    'create_notification', 'log_activity', 'calculate_job_match_score',
+    'calculate_job_match_scores', 'calculate_candidate_match_scores',
+    'get_match_score', 'get_match_scores', 'get_candidate_match_scores', 'get_pair_match_scores'
+]
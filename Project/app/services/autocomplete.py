@@ -0,0 +1,130 @@
+import heapq
+from bisect import bisect_left
+from sqlalchemy import func
+from extensions import db
+from models import Skill, SkillCooccurrence, JobPosting, Company
+from services.cache_versions import VersionedCache
+from services.location_service import get_place, prefetch_places
+
+# Most suggestions one request can ask for
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this long get their top suggestions precomputed, since
+# they cover the largest ranges of the vocabulary
+SHORT_PREFIX_LENGTH = 2
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over labels ranked by popularity.
+
+    Every label is indexed under its full lowercased text and under each
+    later word, so 'new york' is found by 'york' too. A prefix maps to a
+    contiguous range of the sorted keys found with bisect; the most popular
+    entries of the range are returned. Memory is a few arrays the size of
+    the vocabulary plus the precomputed short-prefix lists.
+    """
+
+    def __init__(self, entries):
+        # entries: (label, popularity, payload) tuples
+        indexed = []
+        for entry_id, (label, popularity, payload) in enumerate(entries):
+            words = label.lower().split()
+            for start in range(len(words)):
+                indexed.append((' '.join(words[start:]), entry_id))
+        indexed.sort()
+        self._keys = [key for key, _ in indexed]
+        self._entry_ids = [entry_id for _, entry_id in indexed]
+        self._entries = entries
+
+        short = {}
+        for key, entry_id in indexed:
+            for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1):
+                short.setdefault(key[:length], set()).add(entry_id)
+        self._short = {
+            prefix: self._ranked(entry_ids, MAX_SUGGESTIONS) for prefix, entry_ids in short.items()
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _ranked(self, entry_ids, limit):
+        entries = self._entries
+        return heapq.nsmallest(limit, entry_ids, key=lambda entry_id: (-entries[entry_id][1], entries[entry_id][0].lower()))
+
+    def complete(self, prefix, limit=10):
+        """(label, popularity, payload) of the most popular labels starting with prefix"""
+        prefix = ' '.join(prefix.lower().split())
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            entry_ids = self._short.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + '\uffff', start)
+            entry_ids = self._ranked(set(self._entry_ids[start:end]), limit)
+        return [self._entries[entry_id] for entry_id in entry_ids]
+
+
+def _load_skill_index():
+    # The co-occurrence diagonal counts the candidates and jobs listing each skill
+    usage = dict(db.session.query(SkillCooccurrence.skill_id, SkillCooccurrence.count).filter(
+        SkillCooccurrence.skill_id == SkillCooccurrence.other_skill_id
+    ))
+    return PrefixIndex([
+        (skill_name, usage.get(skill_id, 0), skill_id)
+        for skill_id, skill_name in db.session.query(Skill.id, Skill.skill_name)
+    ])
+
+
+def _location_label(location_id, fallback):
+    place = get_place(location_id)
+    if place is None:
+        return fallback
+    parts = [part.title() for part in place[:3] if part]
+    if place.is_remote:
+        parts.insert(0, 'Remote')
+    return ', '.join(parts) or fallback
+
+
+def _load_location_index():
+    counts = db.session.query(
+        JobPosting.location_id, func.min(JobPosting.location), func.count(JobPosting.id)
+    ).filter(JobPosting.is_active == True, JobPosting.location_id != None).group_by(JobPosting.location_id).all()
+    prefetch_places(location_id for location_id, _, _ in counts)
+    return PrefixIndex([
+        (_location_label(location_id, text), count, location_id) for location_id, text, count in counts
+    ])
+
+
+def _load_company_index():
+    active_jobs = func.count(JobPosting.id)
+    return PrefixIndex([
+        (company_name, count, company_id)
+        for company_id, company_name, count in db.session.query(Company.id, Company.company_name, active_jobs).outerjoin(
+            JobPosting, (JobPosting.company_id == Company.id) & (JobPosting.is_active == True)
+        ).group_by(Company.id, Company.company_name)
+        if company_name
+    ])
+
+
+# Skills follow the skill catalogue version; locations and companies the jobs version.
+# Popularity also drifts without either changing, so indexes are rebuilt at least this often.
+POPULARITY_REFRESH_SECONDS = 600
+
+_indexes = {
+    'skills': VersionedCache('skills', _load_skill_index, ttl=POPULARITY_REFRESH_SECONDS),
+    'locations': VersionedCache('jobs', _load_location_index, ttl=POPULARITY_REFRESH_SECONDS),
+    'companies': VersionedCache('jobs', _load_company_index, ttl=POPULARITY_REFRESH_SECONDS),
+}
+
+
+def autocomplete(kind, prefix, limit=10):
+    """Suggestions for a prefix as dicts of label, popularity and id (None for an unknown kind)"""
+    cache = _indexes.get(kind)
+    if cache is None:
+        return None
+    return [
+        {'label': label, 'count': popularity, 'id': payload}
+        for label, popularity, payload in cache.get().complete(prefix, limit)
+    ]
@@ -0,0 +1,20 @@
+# Largest IN (...) list sent in one statement
+BATCH_CHUNK_SIZE = 1000
+
+
+def load_children(query, parent_key, parent_ids, chunk_size=BATCH_CHUNK_SIZE):
+    """{parent id: [rows of query whose parent_key is that id]} for many parents at once.
+
+    Runs query once per chunk of ids with ``parent_key IN (...)`` added and
+    groups the rows in Python, keeping the query's order within each parent.
+    Rows are entities for a single-entity query and tuples otherwise;
+    parents without rows map to an empty list.
+    """
+    children = {parent_id: [] for parent_id in parent_ids if parent_id is not None}
+    ids = list(children)
+    single = len(query.column_descriptions) == 1
+    keyed = query.add_columns(parent_key)
+    for start in range(0, len(ids), chunk_size):
+        for row in keyed.filter(parent_key.in_(ids[start:start + chunk_size])):
+            children[row[-1]].append(row[0] if single else tuple(row[:-1]))
+    return children
@@ -0,0 +1,168 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import CacheVersion, CacheLease, CacheEntry
+from services.model_hooks import on_commit, queue_after_commit
+
+# Name -> (version, monotonic time it was read) of this worker
+_known_versions = {}
+# Name -> versions this worker's own commits produced, newest LOCAL_VERSIONS_KEPT
+_local_versions = defaultdict(set)
+_versions_lock = threading.Lock()
+
+LOCAL_VERSIONS_KEPT = 1000
+
+
+def bump_cache_version(session, name):
+    """Increment a cache's version in the session's transaction; other workers reload after it commits"""
+    table = CacheVersion.__table__
+    connection = session.connection()
+    bump = table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    if not connection.execute(bump).rowcount:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(name=name, version=1))
+        except IntegrityError:
+            # Created concurrently by another request
+            connection.execute(bump)
+    # The row stays locked until commit, so no other transaction produces this version
+    version = connection.execute(table.select().with_only_columns(table.c.version).where(table.c.name == name)).scalar()
+    queue_after_commit(session, 'cache_versions', {(name, version)})
+
+
+def read_cache_version(name):
+    return db.session.query(CacheVersion.version).filter(CacheVersion.name == name).scalar() or 0
+
+
+def current_cache_version(name):
+    """Shared version of a cache as last seen by this worker.
+
+    The row is re-read at most every ``CACHE_VERSION_CHECK_INTERVAL``
+    seconds; a bump committed by this worker is seen at once.
+    """
+    interval = current_app.config.get('CACHE_VERSION_CHECK_INTERVAL', 5)
+    with _versions_lock:
+        known = _known_versions.get(name)
+    if known is not None and time.monotonic() - known[1] <= interval:
+        return known[0]
+    version = read_cache_version(name)
+    with _versions_lock:
+        _known_versions[name] = (version, time.monotonic())
+    return version
+
+
+class VersionedCache:
+    """Per-worker copy of reference data, reloaded when its shared version changes.
+
+    ``loader()`` builds the copy; staleness is bounded as for
+    ``current_cache_version``. With ``ttl`` the copy is also reloaded once
+    that many seconds old, for data that drifts without a version bump.
+    """
+
+    def __init__(self, name, loader, ttl=None):
+        self.name = name
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._loaded_at = None
+
+    def get(self):
+        # The version is read before the data, so the data is never older than the version kept
+        current = current_cache_version(self.name)
+        with self._lock:
+            fresh = self.ttl is None or (self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.ttl)
+            if self._version == current and fresh:
+                return self._value
+        value = self._loader()
+        with self._lock:
+            self._value, self._version, self._loaded_at = value, current, time.monotonic()
+        return value
+
+
+def changed_only_here(name, since, until):
+    """True when every version of a cache after since up to until came from this worker's commits.
+
+    A per-worker copy built at since can then be brought up to until by
+    patching what this worker changed, instead of reloading everything.
+    """
+    if since is None:
+        return False
+    with _versions_lock:
+        local = _local_versions.get(name, ())
+        return all(version in local for version in range(since + 1, until + 1))
+
+
+def acquire_cache_lease(name, seconds):
+    """Holder token if this worker now holds the named lease, else None.
+
+    Runs in its own transaction on a separate connection, so the caller's
+    session is left alone. A lease held past its expiry is taken over.
+    """
+    table = CacheLease.__table__
+    now = datetime.utcnow()
+    values = {'holder': uuid.uuid4().hex, 'expires_at': now + timedelta(seconds=seconds)}
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(table.insert().values(name=name, **values))
+        return values['holder']
+    except IntegrityError:
+        pass
+    with db.engine.begin() as connection:
+        taken = connection.execute(
+            table.update().where(table.c.name == name, table.c.expires_at < now).values(**values)
+        ).rowcount
+    return values['holder'] if taken else None
+
+
+def release_cache_lease(name, holder):
+    table = CacheLease.__table__
+    with db.engine.begin() as connection:
+        connection.execute(table.delete().where(table.c.name == name, table.c.holder == holder))
+
+
+def read_shared_cache_entry(name, version):
+    """Value another worker stored for name at version, or None when there is no such live entry"""
+    table = CacheEntry.__table__
+    with db.engine.connect() as connection:
+        return connection.execute(table.select().with_only_columns(table.c.value).where(
+            table.c.name == name, table.c.version == version, table.c.expires_at >= datetime.utcnow()
+        )).scalar()
+
+
+def write_shared_cache_entry(name, version, value, seconds):
+    """Store a value for every worker to read for the next seconds, in its own transaction.
+
+    Expired entries of any name are dropped at the same time.
+    """
+    table = CacheEntry.__table__
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(or_(table.c.name == name, table.c.expires_at < now)))
+            connection.execute(table.insert().values(
+                name=name, version=version, value=value, expires_at=now + timedelta(seconds=seconds)
+            ))
+    except IntegrityError:
+        # Stored concurrently by a worker that gave up waiting for the lease
+        pass
+
+
+# Last, so by the time a new version is visible here the caches it covers
+# have already been told what this commit changed
+@on_commit('cache_versions', last=True)
+def _forget_local_versions(keys):
+    with _versions_lock:
+        for name, version in keys:
+            _known_versions.pop(name, None)
+            local = _local_versions[name]
+            local.add(version)
+            if len(local) > LOCAL_VERSIONS_KEPT:
+                local.difference_update(sorted(local)[:len(local) - LOCAL_VERSIONS_KEPT])
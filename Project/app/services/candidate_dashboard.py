@@ -0,0 +1,219 @@
+import threading
+from collections import namedtuple, defaultdict
+from datetime import datetime
+from flask import current_app
+from extensions import db
+from models import JobApplication, JobPosting, Company, MCQExam, ExamAttempt, InterviewRoom, Notification
+from services.cache import LRUCache
+from services.model_hooks import on_flush, on_commit, queue_after_commit, changed_instances, previous_value
+from services.recommendation_service import job_recommendations
+
+# Plain copies of the rows the dashboard shows, so a snapshot outlives the
+# session that loaded it. Field names match the models the template reads.
+JobSummary = namedtuple('JobSummary', 'id title location job_type')
+CompanySummary = namedtuple('CompanySummary', 'id company_name')
+ApplicationSummary = namedtuple('ApplicationSummary', 'id job_id application_status applied_at')
+InterviewSummary = namedtuple('InterviewSummary', 'id room_code scheduled_time status')
+ExamSummary = namedtuple('ExamSummary', 'id exam_title duration_minutes total_questions')
+NotificationSummary = namedtuple('NotificationSummary', 'id title message created_at')
+
+DashboardSnapshot = namedtuple('DashboardSnapshot', (
+    'applications recommendations notifications exam_invitations upcoming_interviews '
+    'applications_count interviews_count exams_count'
+))
+
+RECENT_APPLICATIONS = 5
+RECENT_NOTIFICATIONS = 5
+
+_snapshot_cache = None
+
+# Per-worker version of every record a snapshot depends on: ('user', id),
+# ('candidate', profile id), ('application', id) and ('job', id). A snapshot
+# keeps the versions it was built at and is rebuilt once any of them moves.
+_versions_lock = threading.Lock()
+_versions = defaultdict(int)
+
+
+def _get_snapshot_cache():
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        _snapshot_cache = LRUCache(
+            'candidate_dashboards',
+            maxsize=current_app.config.get('CANDIDATE_DASHBOARD_CACHE_SIZE', 5000),
+            ttl=current_app.config.get('CANDIDATE_DASHBOARD_CACHE_TTL', 60)
+        )
+    return _snapshot_cache
+
+
+def _bump_versions(keys):
+    with _versions_lock:
+        for key in keys:
+            _versions[key] += 1
+
+
+def _job_summary(job):
+    return JobSummary(job.id, job.title, job.location, job.job_type)
+
+
+def _company_summary(company):
+    return CompanySummary(company.id, company.company_name)
+
+
+def _build_snapshot(user_id, candidate_id):
+    """DashboardSnapshot and the dependency keys it was built from"""
+    now = datetime.utcnow()
+
+    # Every application at once: the recent ones, the count and the jobs
+    # to leave out of recommendations and look for exams in
+    applications = db.session.query(
+        JobApplication.id, JobApplication.job_id, JobApplication.application_status, JobApplication.applied_at,
+        JobPosting.title, JobPosting.location, JobPosting.job_type, Company.id, Company.company_name
+    ).join(
+        JobPosting, JobApplication.job_id == JobPosting.id
+    ).join(
+        Company, JobPosting.company_id == Company.id
+    ).filter(
+        JobApplication.candidate_id == candidate_id
+    ).order_by(JobApplication.applied_at.desc(), JobApplication.id.desc()).all()
+    application_ids = [row[0] for row in applications]
+    applied_job_ids = {row[1] for row in applications}
+
+    attempts = db.session.query(ExamAttempt.exam_id, ExamAttempt.status).filter(
+        ExamAttempt.candidate_id == candidate_id
+    ).all()
+    completed_exam_ids = {exam_id for exam_id, status in attempts if status == 'completed'}
+
+    exam_invitations = []
+    if applied_job_ids:
+        exam_invitations = [
+            (ExamSummary(exam.id, exam.exam_title, exam.duration_minutes, exam.total_questions),
+             _job_summary(job), _company_summary(company))
+            for exam, job, company in db.session.query(MCQExam, JobPosting, Company).join(
+                JobPosting, MCQExam.job_id == JobPosting.id
+            ).join(
+                Company, JobPosting.company_id == Company.id
+            ).filter(
+                MCQExam.job_id.in_(applied_job_ids),
+                MCQExam.is_active == True
+            )
+            if exam.id not in completed_exam_ids
+        ]
+
+    upcoming_interviews = []
+    if application_ids:
+        upcoming_interviews = [
+            (InterviewSummary(room.id, room.room_code, room.scheduled_time, room.status),
+             ApplicationSummary(application.id, application.job_id, application.application_status, application.applied_at),
+             _job_summary(job), _company_summary(company))
+            for room, application, job, company in db.session.query(InterviewRoom, JobApplication, JobPosting, Company).join(
+                JobApplication, InterviewRoom.job_application_id == JobApplication.id
+            ).join(
+                JobPosting, JobApplication.job_id == JobPosting.id
+            ).join(
+                Company, JobPosting.company_id == Company.id
+            ).filter(
+                JobApplication.candidate_id == candidate_id,
+                InterviewRoom.status.in_(['scheduled', 'active']),
+                InterviewRoom.scheduled_time >= now
+            ).order_by(InterviewRoom.scheduled_time.asc())
+        ]
+
+    notifications = [
+        NotificationSummary(*row) for row in db.session.query(
+            Notification.id, Notification.title, Notification.message, Notification.created_at
+        ).filter(
+            Notification.user_id == user_id, Notification.is_read == False
+        ).order_by(Notification.created_at.desc(), Notification.id.desc()).limit(RECENT_NOTIFICATIONS)
+    ]
+
+    recommendations = [
+        {'job': _job_summary(match['job']), 'company': _company_summary(match['company']), 'match_score': match['match_score']}
+        for match in job_recommendations(candidate_id, applied_job_ids)
+    ]
+
+    snapshot = DashboardSnapshot(
+        applications=[
+            (ApplicationSummary(application_id, job_id, status, applied_at),
+             JobSummary(job_id, title, location, job_type), CompanySummary(company_id, company_name))
+            for application_id, job_id, status, applied_at, title, location, job_type, company_id, company_name
+            in applications[:RECENT_APPLICATIONS]
+        ],
+        recommendations=recommendations,
+        notifications=notifications,
+        exam_invitations=exam_invitations,
+        upcoming_interviews=upcoming_interviews,
+        applications_count=len(applications),
+        interviews_count=len(upcoming_interviews),
+        exams_count=len(attempts),
+    )
+    keys = [('user', user_id), ('candidate', candidate_id)]
+    keys.extend(('application', application_id) for application_id in application_ids)
+    keys.extend(('job', job_id) for job_id in applied_job_ids)
+    return snapshot, keys
+
+
+def _is_current(entry):
+    _, snapshot, versions = entry
+    with _versions_lock:
+        if any(_versions[key] != version for key, version in versions):
+            return False
+    # Interviews drop off the dashboard once their time has passed
+    now = datetime.utcnow()
+    return all(interview.scheduled_time >= now for interview, _, _, _ in snapshot.upcoming_interviews)
+
+
+def candidate_dashboard_snapshot(user_id, candidate_id):
+    """DashboardSnapshot of a candidate, cached per worker.
+
+    Built with one query per panel (applications, exam attempts, exam
+    invitations, interviews, notifications) plus the recommendation lookup,
+    and kept for ``CANDIDATE_DASHBOARD_CACHE_TTL`` seconds. Writes this
+    worker makes to the candidate's applications, interviews, exams or
+    notifications drop it straight away; other workers' writes show up once
+    it expires.
+    """
+    cache = _get_snapshot_cache()
+    entry = cache.get(user_id)
+    if entry is not None and entry[0] == candidate_id and _is_current(entry):
+        return entry[1]
+
+    # Taken before building, so a write to the candidate that lands
+    # meanwhile leaves the new snapshot already out of date
+    with _versions_lock:
+        versions = {key: _versions[key] for key in (('user', user_id), ('candidate', candidate_id))}
+    snapshot, keys = _build_snapshot(user_id, candidate_id)
+    with _versions_lock:
+        versions = [(key, versions[key] if key in versions else _versions[key]) for key in keys]
+    cache.set(user_id, (candidate_id, snapshot, versions))
+    return snapshot
+
+
+def _changed_dashboard_keys(session):
+    keys = set()
+    for application, state in changed_instances(session, JobApplication):
+        keys.update((('candidate', application.candidate_id), ('candidate', previous_value(application, 'candidate_id')),
+                     ('application', application.id)))
+    for room, state in changed_instances(session, InterviewRoom):
+        keys.update((('application', room.job_application_id), ('application', previous_value(room, 'job_application_id'))))
+    for attempt, state in changed_instances(session, ExamAttempt):
+        keys.add(('candidate', attempt.candidate_id))
+    for exam, state in changed_instances(session, MCQExam):
+        keys.update((('job', exam.job_id), ('job', previous_value(exam, 'job_id'))))
+    for notification, state in changed_instances(session, Notification):
+        keys.add(('user', notification.user_id))
+    return {key for key in keys if key[1] is not None}
+
+
+@on_flush
+def _invalidate_changed_dashboards(session):
+    keys = _changed_dashboard_keys(session)
+    if keys:
+        # Now, so this transaction never reads a stale snapshot, and again
+        # after commit in case another thread rebuilt one meanwhile
+        _bump_versions(keys)
+        queue_after_commit(session, 'candidate_dashboard', keys)
+
+
+@on_commit('candidate_dashboard')
+def _invalidate_committed_dashboards(keys):
+    _bump_versions(keys)
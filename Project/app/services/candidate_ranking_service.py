@@ -0,0 +1,177 @@
+import heapq
+from collections import Counter
+from sqlalchemy import func
+from extensions import db
+from models import CandidateProfile, User
+from services.job_matching_service import (
+    BATCH_CHUNK_SIZE, SKILL_IMPORTANCE_WEIGHTS, EXPERIENCE_TIER_FACTORS, experience_tier_needed,
+    experience_points, location_points, salary_points, load_job_rows, load_required_skills, load_candidate_rows
+)
+from services.skill_index import skill_index
+from services.skill_similarity import skill_similarity
+
+# Rows fetched per round trip when streaming candidates that share no skill
+STREAM_BATCH_SIZE = 5000
+
+
+class RankedCandidatePage:
+    """One page of ranked candidates, shaped like Flask-SQLAlchemy's Pagination"""
+
+    def __init__(self, items, page, per_page, has_next):
+        self.items = items  # (CandidateProfile, User, score) tuples, best first
+        self.page = page
+        self.per_page = per_page
+        self.has_prev = page > 1
+        self.has_next = has_next
+        self.prev_num = page - 1 if self.has_prev else None
+        self.next_num = page + 1 if has_next else None
+
+
+def _column_points(candidate, job):
+    """Experience, location and salary points of a pair"""
+    return (
+        experience_points(candidate.experience_years, job.experience_required)
+        + location_points(candidate.location_id, job.location_id)
+        + salary_points(candidate.salary_expectation, job.salary_min, job.salary_max)
+    )
+
+
+def _column_bound(job):
+    """Most experience, location and salary points any candidate can earn for a job"""
+    return 30 + (10 if job.location_id else 0) + (10 if job.salary_min and job.salary_max else 0)
+
+
+def _skill_scored_candidates(job_id):
+    """Skill points of every candidate earning any for a job, plus the fixed points of everyone else"""
+    skill_weights = Counter()
+    for skill_id, importance in load_required_skills([job_id])[job_id]:
+        skill_weights[skill_id] += SKILL_IMPORTANCE_WEIGHTS.get(importance, 1)
+    total_weight = sum(skill_weights.values())
+    if not total_weight:
+        return {}, 25  # No specific skills required
+
+    neighbor_credits = skill_similarity.neighbor_credits(skill_weights)
+    skill_scored = {
+        candidate_id: int((credit / (total_weight * 100)) * 50)
+        for candidate_id, credit in skill_index.weighted_candidate_credit(skill_weights, neighbor_credits).items()
+    }
+    return skill_scored, 0
+
+
+def _other_candidates_query(job, fixed_points, min_score):
+    """Query streaming candidates without skill points who may still beat min_score (None if none can)"""
+    tier = experience_tier_needed(min_score + 1 - fixed_points - (_column_bound(job) - 30))
+    if tier is None:
+        return None
+
+    query = db.session.query(
+        CandidateProfile.id,
+        CandidateProfile.experience_years,
+        CandidateProfile.location_id,
+        CandidateProfile.salary_expectation
+    )
+    if tier:
+        query = query.filter(
+            func.coalesce(CandidateProfile.experience_years, 0)
+            >= (job.experience_required or 0) * EXPERIENCE_TIER_FACTORS[tier]
+        )
+    return query.yield_per(STREAM_BATCH_SIZE)
+
+
+def rank_candidates_for_job(job_id, page=1, per_page=20, min_score=30):
+    """Rank the whole candidate pool for a job, returning one page by score.
+
+    Uses the calculate_job_match_score weighting. Candidates having a
+    required or similar skill get exact skill points from the skill index
+    and are scored in order of their best possible total, in batches, until
+    the page can no longer change. Everyone else earns fixed skill points, so
+    they are streamed only when experience, location and salary can still
+    lift them above min_score, with the experience requirement checked in
+    SQL. Ties go to the lower candidate id.
+    """
+    page = max(page, 1)
+    job = load_job_rows([job_id]).get(job_id)
+    if not job:
+        return RankedCandidatePage([], page, per_page, False)
+
+    wanted = page * per_page + 1  # one extra row tells whether a next page exists
+    best = []  # min-heap of (score, -candidate_id): the worst kept match sits on top
+
+    def offer(candidate_id, score):
+        if score <= min_score:
+            return
+        entry = (score, -candidate_id)
+        if len(best) < wanted:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+
+    def cannot_place(bound):
+        return bound <= min_score or (len(best) == wanted and bound < best[0][0])
+
+    column_bound = _column_bound(job)
+    skill_scored, fixed_points = _skill_scored_candidates(job_id)
+
+    # Candidates with a required or similar skill, best skill points first
+    ordered = sorted(skill_scored, key=lambda candidate_id: (-skill_scored[candidate_id], candidate_id))
+    for start in range(0, len(ordered), BATCH_CHUNK_SIZE):
+        batch = ordered[start:start + BATCH_CHUNK_SIZE]
+        if cannot_place(skill_scored[batch[0]] + column_bound):
+            break
+        for candidate_id, candidate in load_candidate_rows(batch).items():
+            offer(candidate_id, min(skill_scored[candidate_id] + _column_points(candidate, job), 100))
+
+    # Everyone else: 25 skill points when the job requires none, otherwise 0
+    query = _other_candidates_query(job, fixed_points, min_score)
+    if query is not None and not cannot_place(fixed_points + column_bound):
+        for candidate in query:
+            if candidate.id in skill_scored:
+                continue
+            offer(candidate.id, min(fixed_points + _column_points(candidate, job), 100))
+            if cannot_place(fixed_points + column_bound):
+                break
+
+    ranked = sorted(best, reverse=True)
+    page_entries = ranked[(page - 1) * per_page:page * per_page]
+    scores = {-negative_candidate_id: score for score, negative_candidate_id in page_entries}
+
+    rows = {}
+    if scores:
+        for profile, user in db.session.query(CandidateProfile, User).join(
+            User, CandidateProfile.user_id == User.id
+        ).filter(CandidateProfile.id.in_(scores)):
+            rows[profile.id] = (profile, user)
+
+    items = [rows[candidate_id] + (score,) for candidate_id, score in scores.items() if candidate_id in rows]
+    return RankedCandidatePage(items, page, per_page, len(ranked) > page * per_page)
+
+
+def iter_candidates_above(job_id, min_score):
+    """Yield (candidate_id, score) for every candidate scoring above min_score, unordered.
+
+    Same candidate generation as rank_candidates_for_job without keeping a
+    page: skill-scored candidates are checked in batches and the rest are
+    streamed from SQL only if they can reach min_score at all.
+    """
+    job = load_job_rows([job_id]).get(job_id)
+    if not job:
+        return
+
+    column_bound = _column_bound(job)
+    skill_scored, fixed_points = _skill_scored_candidates(job_id)
+
+    hopeful = sorted(candidate_id for candidate_id, points in skill_scored.items() if points + column_bound > min_score)
+    for start in range(0, len(hopeful), BATCH_CHUNK_SIZE):
+        for candidate_id, candidate in load_candidate_rows(hopeful[start:start + BATCH_CHUNK_SIZE]).items():
+            score = min(skill_scored[candidate_id] + _column_points(candidate, job), 100)
+            if score > min_score:
+                yield candidate_id, score
+
+    query = _other_candidates_query(job, fixed_points, min_score)
+    if query is not None and fixed_points + column_bound > min_score:
+        for candidate in query:
+            if candidate.id in skill_scored:
+                continue
+            score = min(fixed_points + _column_points(candidate, job), 100)
+            if score > min_score:
+                yield candidate.id, score
@@ -0,0 +1,20 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+
+def increment_counter(connection, table, key, column, delta, extra=None):
+    """Add delta to a counter column of the row with key, inserting the row if missing.
+
+    ``key`` maps the primary key columns to their values and ``extra``
+    holds other columns to set on a new row. Runs on the caller's
+    connection, so the change commits with the caller's transaction.
+    """
+    condition = [table.c[name] == value for name, value in key.items()]
+    bump = update(table).where(*condition).values({column: table.c[column] + delta})
+    if not connection.execute(bump).rowcount:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(**key, **(extra or {}), **{column: delta}))
+        except IntegrityError:
+            # Created concurrently by another request
+            connection.execute(bump)
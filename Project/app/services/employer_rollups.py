@@ -0,0 +1,130 @@
+from collections import defaultdict
+from sqlalchemy import select, func
+from extensions import db
+from models import (
+    JobApplication, JobPosting, CompanyApplicationStatusCount, CompanyApplicationDailyCount, JobApplicationCount
+)
+from services.counters import increment_counter
+from services.model_hooks import on_flush, changed_instances, attributes_changed, previous_value, track_previous_values
+
+status_table = CompanyApplicationStatusCount.__table__
+daily_table = CompanyApplicationDailyCount.__table__
+job_table = JobApplicationCount.__table__
+
+# Application columns a rollup row is keyed on
+ROLLUP_FIELDS = ('job_id', 'application_status', 'applied_at')
+
+track_previous_values(*(getattr(JobApplication, name) for name in ROLLUP_FIELDS))
+
+
+def _application_changes(session):
+    """(job_id, status, applied_at, +1/-1) for every rollup row the current flush moves an application in or out of"""
+    changes = []
+    for application, state in changed_instances(session, JobApplication):
+        current = tuple(getattr(application, name) for name in ROLLUP_FIELDS)
+        previous = tuple(previous_value(application, name) for name in ROLLUP_FIELDS)
+        if state == 'new':
+            changes.append(current + (1,))
+        elif state == 'deleted':
+            changes.append(previous + (-1,))
+        elif attributes_changed(application, *ROLLUP_FIELDS):
+            changes.append(previous + (-1,))
+            changes.append(current + (1,))
+    return changes
+
+
+@on_flush
+def _update_application_rollups(session):
+    changes = _application_changes(session)
+    if not changes:
+        return
+
+    connection = session.connection()
+    companies = dict(connection.execute(
+        select(JobPosting.id, JobPosting.company_id).where(JobPosting.id.in_({job_id for job_id, _, _, _ in changes}))
+    ).all())
+
+    by_status, by_day, by_job = defaultdict(int), defaultdict(int), defaultdict(int)
+    for job_id, status, applied_at, delta in changes:
+        company_id = companies.get(job_id)
+        if company_id is None:
+            continue
+        by_job[(job_id, company_id)] += delta
+        by_status[(company_id, status or 'applied')] += delta
+        if applied_at is not None:
+            by_day[(company_id, applied_at.date())] += delta
+
+    # Sorted, so concurrent transactions lock shared rows in the same order
+    for (job_id, company_id), delta in sorted(by_job.items()):
+        if delta:
+            increment_counter(connection, job_table, {'job_id': job_id}, 'applications', delta, {'company_id': company_id})
+    for (company_id, status), delta in sorted(by_status.items()):
+        if delta:
+            increment_counter(connection, status_table, {'company_id': company_id, 'status': status}, 'applications', delta)
+    for (company_id, day), delta in sorted(by_day.items()):
+        if delta:
+            increment_counter(connection, daily_table, {'company_id': company_id, 'day': day}, 'applications', delta)
+
+
+def rebuild_employer_rollups():
+    """Recount every rollup row from job_applications and commit"""
+    for table in (status_table, daily_table, job_table):
+        db.session.execute(table.delete())
+
+    applications = select(JobPosting.company_id, JobApplication.job_id, JobApplication.application_status,
+                          JobApplication.applied_at).join(JobPosting, JobApplication.job_id == JobPosting.id).subquery()
+    count = func.count()
+    db.session.execute(job_table.insert().from_select(
+        ['job_id', 'company_id', 'applications'],
+        select(applications.c.job_id, applications.c.company_id, count).group_by(
+            applications.c.job_id, applications.c.company_id)
+    ))
+    status = func.coalesce(applications.c.application_status, 'applied')
+    db.session.execute(status_table.insert().from_select(
+        ['company_id', 'status', 'applications'],
+        select(applications.c.company_id, status, count).group_by(applications.c.company_id, status)
+    ))
+    day = func.date(applications.c.applied_at)
+    db.session.execute(daily_table.insert().from_select(
+        ['company_id', 'day', 'applications'],
+        select(applications.c.company_id, day, count).where(applications.c.applied_at != None).group_by(
+            applications.c.company_id, day)
+    ))
+    db.session.commit()
+
+
+def applications_by_status(company_id):
+    """{status: applications} of a company"""
+    return dict(db.session.query(
+        CompanyApplicationStatusCount.status, CompanyApplicationStatusCount.applications
+    ).filter(
+        CompanyApplicationStatusCount.company_id == company_id, CompanyApplicationStatusCount.applications > 0
+    ))
+
+
+def applications_since(company_id, day):
+    """Applications a company received on or after day"""
+    return db.session.query(func.coalesce(func.sum(CompanyApplicationDailyCount.applications), 0)).filter(
+        CompanyApplicationDailyCount.company_id == company_id, CompanyApplicationDailyCount.day >= day
+    ).scalar()
+
+
+def jobs_with_application_counts(company_id):
+    """(JobPosting, application count) of a company's jobs, newest first"""
+    return db.session.query(
+        JobPosting, func.coalesce(JobApplicationCount.applications, 0).label('application_count')
+    ).outerjoin(
+        JobApplicationCount, JobApplicationCount.job_id == JobPosting.id
+    ).filter(
+        JobPosting.company_id == company_id
+    ).order_by(JobPosting.created_at.desc()).all()
+
+
+def top_jobs_by_applications(company_id, limit=5):
+    """(title, app_count) of a company's most applied-to jobs"""
+    app_count = func.coalesce(JobApplicationCount.applications, 0)
+    return db.session.query(JobPosting.title, app_count.label('app_count')).outerjoin(
+        JobApplicationCount, JobApplicationCount.job_id == JobPosting.id
+    ).filter(
+        JobPosting.company_id == company_id
+    ).order_by(app_count.desc(), JobPosting.id).limit(limit).all()
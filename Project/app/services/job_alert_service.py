@@ -0,0 +1,72 @@
+from collections import Counter
+from flask import current_app, url_for
+from extensions import db, socketio
+from models import JobPosting, Company, CandidateProfile, User, Notification
+from services.candidate_ranking_service import iter_candidates_above
+from services.notification_counts import adjust_unread_counts
+
+# Notification rows written per multi-row INSERT and commit
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def _insert_notifications(matches, job, company_name, action_url):
+    """Insert one job_match notification per active candidate user; returns rows written"""
+    user_ids = dict(db.session.query(CandidateProfile.id, CandidateProfile.user_id).join(
+        User, CandidateProfile.user_id == User.id
+    ).filter(CandidateProfile.id.in_([candidate_id for candidate_id, _ in matches]), User.is_active == True))
+
+    rows = [{
+        'user_id': user_ids[candidate_id],
+        'title': 'New job match',
+        'message': f'{job.title} at {company_name} matches your profile ({score}% match).',
+        'notification_type': 'job_match',
+        'action_url': action_url,
+    } for candidate_id, score in matches if candidate_id in user_ids]
+    if rows:
+        db.session.execute(Notification.__table__.insert(), rows)
+        adjust_unread_counts(db.session, Counter(row['user_id'] for row in rows))
+    db.session.commit()
+    return len(rows)
+
+
+def notify_matching_candidates(job_id, action_url, min_score=None):
+    """Send a job_match notification to every candidate scoring above min_score for a job.
+
+    Matches come from the batch candidate generation of the ranking
+    service and are written with one multi-row INSERT and commit per
+    NOTIFICATION_BATCH_SIZE candidates. Returns the number sent.
+    """
+    if min_score is None:
+        min_score = current_app.config.get('JOB_MATCH_NOTIFY_MIN_SCORE', 70)
+
+    job = db.session.query(JobPosting.title, JobPosting.is_active, Company.company_name).join(
+        Company, JobPosting.company_id == Company.id
+    ).filter(JobPosting.id == job_id).first()
+    if not job or not job.is_active:
+        return 0
+
+    # Collected up front: committing while the candidate stream is open would cut it short
+    matches = list(iter_candidates_above(job_id, min_score))
+    sent = 0
+    for start in range(0, len(matches), NOTIFICATION_BATCH_SIZE):
+        sent += _insert_notifications(matches[start:start + NOTIFICATION_BATCH_SIZE], job, job.company_name, action_url)
+    return sent
+
+
+def _run_job_match_fan_out(app, job_id, action_url):
+    with app.app_context():
+        try:
+            notify_matching_candidates(job_id, action_url)
+        except Exception:
+            db.session.rollback()
+            app.logger.exception(f'Job match notifications failed for job {job_id}')
+
+
+def queue_job_match_notifications(job_id):
+    """Notify matching candidates of a new job in a background task; returns immediately"""
+    socketio.start_background_task(
+        _run_job_match_fan_out,
+        current_app._get_current_object(),
+        job_id,
+        url_for('job.job_details', job_id=job_id)
+    )
@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from extensions import db
+from models import JobPosting, JobRequiredSkill
+from services.cache_versions import current_cache_version, changed_only_here
+from services.model_hooks import on_flush, on_commit, queue_after_commit, changed_instances, attributes_changed, previous_value
+
+JOB_TYPES = ('Full-time', 'Part-time', 'Contract', 'Internship')
+
+# Experience filter bands of the job browser: (min, max) years required, inclusive.
+# Jobs without a requirement fall in every band.
+EXPERIENCE_BANDS = {
+    'entry': (0, 2),
+    'mid': (2, 5),
+    'senior': (5, 50),
+    'executive': (10, 50),
+}
+
+# Minimum salary choices counted; a job qualifies when its min or max reaches one
+SALARY_BUCKETS = (25000, 50000, 75000, 100000, 150000)
+
+# JobPosting columns the facets read
+FACET_FIELDS = ('job_type', 'experience_required', 'salary_min', 'salary_max', 'is_active')
+
+
+def _popcount(bitmap):
+    return bin(bitmap).count('1')
+
+
+def _top_salary(salary_min, salary_max):
+    salaries = [salary for salary in (salary_min, salary_max) if salary is not None]
+    return max(salaries) if salaries else None
+
+
+def _facet_keys(job_type, experience_required, top_salary, skill_ids):
+    """(facet, value) pairs of every bitmap a job belongs to"""
+    keys = [('skill', skill_id) for skill_id in skill_ids]
+    if job_type:
+        keys.append(('job_type', job_type))
+    for band, (low, high) in EXPERIENCE_BANDS.items():
+        if experience_required is None or low <= experience_required <= high:
+            keys.append(('experience', band))
+    if top_salary is not None:
+        keys.extend(('salary', bucket) for bucket in SALARY_BUCKETS if top_salary >= bucket)
+    return keys
+
+
+class JobFacetIndex:
+    """Per-worker bitmaps of active jobs by job type, experience band, salary bucket and skill.
+
+    Each active job gets a bit position; a bitmap is a Python int with the
+    bits of the jobs having that facet value, so filters are ANDs and
+    counts are popcounts. Jobs changed by this worker are patched on the
+    next lookup; everything is reloaded once another worker bumps the
+    shared 'jobs' cache version, and every ``JOB_FACET_TTL`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._version = None
+        self._stale_jobs = set()
+        self._reset()
+
+    def _reset(self):
+        self._positions = {}  # job id -> bit
+        self._keys = {}  # job id -> facet keys it is set in
+        self._top_salaries = {}  # job id -> highest of min and max salary
+        self._bitmaps = defaultdict(int)  # (facet, value) -> bitmap
+        self._all = 0
+
+    def _load(self, job_ids=None):
+        """Rows and skill ids of active jobs (only job_ids if given)"""
+        jobs = db.session.query(
+            JobPosting.id, JobPosting.job_type, JobPosting.experience_required,
+            JobPosting.salary_min, JobPosting.salary_max
+        ).filter(JobPosting.is_active == True)
+        skills = db.session.query(JobRequiredSkill.job_id, JobRequiredSkill.skill_id).join(
+            JobPosting, JobRequiredSkill.job_id == JobPosting.id
+        ).filter(JobPosting.is_active == True)
+        if job_ids is not None:
+            jobs = jobs.filter(JobPosting.id.in_(job_ids))
+            skills = skills.filter(JobRequiredSkill.job_id.in_(job_ids))
+
+        skill_ids = defaultdict(set)
+        for job_id, skill_id in skills:
+            skill_ids[job_id].add(skill_id)
+        return jobs.all(), skill_ids
+
+    def _add(self, job, skill_ids):
+        position = self._positions.get(job.id)
+        if position is None:
+            position = self._positions[job.id] = len(self._positions)
+        bit = 1 << position
+        top_salary = _top_salary(job.salary_min, job.salary_max)
+        keys = _facet_keys(job.job_type, job.experience_required, top_salary, skill_ids)
+        for key in keys:
+            self._bitmaps[key] |= bit
+        self._keys[job.id] = keys
+        self._top_salaries[job.id] = top_salary
+        self._all |= bit
+
+    def _remove(self, job_id):
+        position = self._positions.get(job_id)
+        if position is None:
+            return
+        mask = ~(1 << position)
+        for key in self._keys.pop(job_id, ()):
+            self._bitmaps[key] &= mask
+        self._top_salaries.pop(job_id, None)
+        self._all &= mask
+
+    def rebuild(self, version=None):
+        """Reload every bitmap from the database"""
+        # Read before loading, and jobs queued meanwhile stay queued, so
+        # the bitmaps are never older than the version kept
+        if version is None:
+            version = current_cache_version('jobs')
+        with self._lock:
+            self._stale_jobs.clear()
+        jobs, skill_ids = self._load()
+        with self._lock:
+            self._reset()
+            for job in jobs:
+                self._add(job, skill_ids[job.id])
+            self._built_at = time.monotonic()
+            self._version = version
+
+    def mark_stale(self, job_ids):
+        """Queue jobs to be re-read from the database before the next lookup"""
+        with self._lock:
+            self._stale_jobs.update(job_ids)
+
+    def _ensure_current(self):
+        ttl = current_app.config.get('JOB_FACET_TTL', 300)
+        version = current_cache_version('jobs')
+        if (self._built_at is None or time.monotonic() - self._built_at > ttl
+                or not changed_only_here('jobs', self._version, version)):
+            self.rebuild(version)
+            return
+
+        # Every change since the last build came from this worker and is queued as a stale job
+        with self._lock:
+            stale_jobs, self._stale_jobs = self._stale_jobs, set()
+            self._version = version
+        if stale_jobs:
+            jobs, skill_ids = self._load(stale_jobs)
+            with self._lock:
+                for job_id in stale_jobs:
+                    self._remove(job_id)
+                for job in jobs:
+                    self._add(job, skill_ids[job.id])
+
+    def active_count(self):
+        """Number of active jobs"""
+        self._ensure_current()
+        with self._lock:
+            return len(self._keys)
+
+    def _bitmap_of(self, job_ids):
+        buffer = bytearray((len(self._positions) + 8) // 8)
+        for job_id in job_ids:
+            position = self._positions.get(job_id)
+            if position is not None:
+                buffer[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def _salary_bitmap(self, salary_min):
+        if salary_min in SALARY_BUCKETS:
+            return self._bitmaps.get(('salary', salary_min), 0)
+        return self._bitmap_of(
+            job_id for job_id, top_salary in self._top_salaries.items()
+            if top_salary is not None and top_salary >= salary_min
+        )
+
+    def facet_counts(self, base_job_ids=None, job_types=(), experience_level=None, salary_min=None,
+                     skill_id=None, top_skills=10):
+        """Counts of active jobs per facet value under the browser's filters.
+
+        ``base_job_ids`` are the jobs left by filters that are not facets
+        (keywords, location); None means every active job. Each facet is
+        counted with the other facets' filters applied but not its own, so
+        the counts show what picking another value would give. Returns a
+        dict with the filtered ``total``, ``job_type``, ``experience`` and
+        ``salary`` counts and the ``skills`` most required by the matching
+        jobs, as (skill_id, count) pairs.
+        """
+        self._ensure_current()
+        with self._lock:
+            base = self._all if base_job_ids is None else self._bitmap_of(base_job_ids) & self._all
+            filters = {}
+            if job_types:
+                filters['job_type'] = 0
+                for job_type in job_types:
+                    filters['job_type'] |= self._bitmaps.get(('job_type', job_type), 0)
+            if experience_level in EXPERIENCE_BANDS:
+                filters['experience'] = self._bitmaps.get(('experience', experience_level), 0)
+            if salary_min:
+                filters['salary'] = self._salary_bitmap(salary_min)
+            if skill_id:
+                filters['skill'] = self._bitmaps.get(('skill', skill_id), 0)
+
+            def matching(excluded=None):
+                bitmap = base
+                for facet, facet_bitmap in filters.items():
+                    if facet != excluded:
+                        bitmap &= facet_bitmap
+                return bitmap
+
+            counts = {'total': _popcount(matching())}
+            for facet, values in (('job_type', JOB_TYPES), ('experience', EXPERIENCE_BANDS), ('salary', SALARY_BUCKETS)):
+                within = matching(facet)
+                counts[facet] = {value: _popcount(within & self._bitmaps.get((facet, value), 0)) for value in values}
+
+            within = matching('skill')
+            skill_counts = [
+                (value, _popcount(within & bitmap))
+                for (facet, value), bitmap in self._bitmaps.items() if facet == 'skill' and bitmap
+            ]
+        skill_counts = [entry for entry in skill_counts if entry[1]]
+        skill_counts.sort(key=lambda entry: (-entry[1], entry[0]))
+        counts['skills'] = skill_counts[:top_skills]
+        return counts
+
+
+job_facet_index = JobFacetIndex()
+
+
+@on_flush
+def _queue_facet_changes(session):
+    job_ids = set()
+    for job, state in changed_instances(session, JobPosting):
+        if state != 'dirty' or attributes_changed(job, *FACET_FIELDS):
+            job_ids.add(job.id)
+    for skill, state in changed_instances(session, JobRequiredSkill):
+        job_ids.update((skill.job_id, previous_value(skill, 'job_id')))
+    job_ids.discard(None)
+    queue_after_commit(session, 'job_facets', job_ids)
+
+
+@on_commit('job_facets')
+def _mark_facets_stale(job_ids):
+    job_facet_index.mark_stale(job_ids)
@@ -1,58 +1,284 @@
 from decimal import Decimal
 from extensions import db
 from models import CandidateProfile, JobPosting, JobRequiredSkill, CandidateSkill
+from services.model_hooks import changed_instances, attributes_changed, previous_value
+from services.location_service import get_place, prefetch_places, places_match
+from services.skill_similarity import skill_similarity
+
+# Largest IN (...) list sent in one statement when loading batch inputs
+BATCH_CHUNK_SIZE = 1000
+
+SKILL_IMPORTANCE_WEIGHTS = {'Required': 3, 'Preferred': 2}
+
+# Columns that feed the match score; changes to anything else are ignored
+CANDIDATE_MATCH_FIELDS = ('experience_years', 'location_id', 'salary_expectation')
+JOB_MATCH_FIELDS = ('experience_required', 'location_id', 'salary_min', 'salary_max')
+
+
+def _chunks(ids, size=BATCH_CHUNK_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+# Experience points -> fraction of the required years a candidate needs
+EXPERIENCE_TIER_FACTORS = {30: 1, 20: 0.7, 10: 0.5}
+
+
+def experience_tier_needed(points):
+    """Smallest experience tier (0/10/20/30) worth at least ``points`` (None if none is)"""
+    for tier in (0, 10, 20, 30):
+        if tier >= points:
+            return tier
+    return None
+
+
+def experience_points(experience_years, experience_required):
+    """Experience match (30 points)"""
+    experience_years = experience_years or 0
+    experience_required = experience_required or 0
+    if experience_years >= experience_required:
+        return 30
+    elif experience_years >= experience_required * 0.7:
+        return 20
+    elif experience_years >= experience_required * 0.5:
+        return 10
+    return 0
+
+
+def skill_points(required_skills, candidate_skill_ids):
+    """Skills match (50 points) from (skill_id, importance) pairs.
+
+    A skill the candidate has earns its full weight; otherwise the most
+    similar skill the candidate has earns partial credit.
+    """
+    if not required_skills:
+        return 25  # No specific skills required
+
+    matched_credit = 0  # percent of a weight, so sums stay exact integers
+    total_weight = 0
+    for skill_id, importance in required_skills:
+        weight = SKILL_IMPORTANCE_WEIGHTS.get(importance, 1)
+        total_weight += weight
+        matched_credit += weight * skill_similarity.credit(skill_id, candidate_skill_ids)
+
+    if total_weight > 0:
+        return int((matched_credit / (total_weight * 100)) * 50)
+    return 0
+
+
+def location_points(candidate_location_id, job_location_id):
+    """Location match (10 points) between normalized location ids"""
+    if candidate_location_id and job_location_id:
+        if candidate_location_id == job_location_id:
+            return 10
+        candidate_place, job_place = get_place(candidate_location_id), get_place(job_location_id)
+        if candidate_place and job_place and places_match(candidate_place, job_place):
+            return 10
+        return 5  # Partial match
+    return 0
+
+
+def salary_points(salary_expectation, salary_min, salary_max):
+    """Salary expectation match (10 points)"""
+    if salary_expectation and salary_min and salary_max:
+        multiplier = Decimal('1.2')
+        if salary_min <= salary_expectation <= salary_max:
+            return 10
+        elif salary_expectation <= salary_max * multiplier:
+            return 5
+    return 0
+
+
+def score_breakdown(candidate, job, required_skills, candidate_skill_ids):
+    """Score one candidate/job pair from already-loaded rows.
+
+    ``candidate`` and ``job`` only need the columns used for matching, so
+    both model instances and column tuples from the batch loaders work.
+    """
+    components = {
+        'experience': experience_points(candidate.experience_years, job.experience_required),
+        'skills': skill_points(required_skills, candidate_skill_ids),
+        'location': location_points(candidate.location_id, job.location_id),
+        'salary': salary_points(candidate.salary_expectation, job.salary_min, job.salary_max),
+    }
+    components['total'] = min(sum(components.values()), 100)
+    return components
+
+
+def skill_points_upper_bound(overlap_count, required_count):
+    """Best possible skill points knowing only how many skills overlap.
+
+    Assumes every overlapping skill is 'Required' and fully matched and
+    every other one is 'Nice to have', which maximises matched/total
+    weight. Skills earning partial credit must be counted as overlapping.
+    ``required_count`` of None means the job's skills are unknown, so
+    nothing is ruled out.
+    """
+    if required_count is None:
+        return 50
+    if required_count == 0:
+        return 25
+    best_matched = 3 * overlap_count
+    return int((best_matched / (best_matched + required_count - overlap_count)) * 50)
+
+
+def match_score_upper_bound(candidate, job, overlap_count, required_count):
+    """Cheap upper bound on a pair's score from columns and skill counts"""
+    bound = (
+        experience_points(candidate.experience_years, job.experience_required)
+        + skill_points_upper_bound(overlap_count, required_count)
+        + location_points(candidate.location_id, job.location_id)
+        + salary_points(candidate.salary_expectation, job.salary_min, job.salary_max)
+    )
+    return min(bound, 100)
+
 
 def calculate_job_match_score(candidate_id, job_id):
     """Calculate match score between candidate and job"""
     candidate = CandidateProfile.query.get(candidate_id)
     job = JobPosting.query.get(job_id)
-    
+
     if not candidate or not job:
         return 0
 
-    score = 0
-    max_score = 100
-
-    # Experience match (30 points)
-    if candidate.experience_years >= job.experience_required:
-        score += 30
-    elif candidate.experience_years >= job.experience_required * 0.7:
-        score += 20
-    elif candidate.experience_years >= job.experience_required * 0.5:
-        score += 10
-
-    # Skills match (50 points)
-    required_skills = JobRequiredSkill.query.filter_by(job_id=job_id).all()
-    candidate_skills = CandidateSkill.query.filter_by(candidate_id=candidate_id).all()
-    candidate_skill_ids = [cs.skill_id for cs in candidate_skills]
-
-    if required_skills:
-        matched_skills = 0
-        total_weight = 0
-        for req_skill in required_skills:
-            weight = 3 if req_skill.importance == 'Required' else 2 if req_skill.importance == 'Preferred' else 1
-            total_weight += weight
-            if req_skill.skill_id in candidate_skill_ids:
-                matched_skills += weight
-
-        if total_weight > 0:
-            score += int((matched_skills / total_weight) * 50)
-    else:
-        score += 25  # No specific skills required
-
-    # Location match (10 points)
-    if candidate.location and job.location:
-        if candidate.location.lower() in job.location.lower() or job.location.lower() in candidate.location.lower():
-            score += 10
-        else:
-            score += 5  # Partial match
-
-    # Salary expectation match (10 points)
-    if candidate.salary_expectation and job.salary_min and job.salary_max:
-        multiplier = Decimal('1.2')
-        if job.salary_min <= candidate.salary_expectation <= job.salary_max:
-            score += 10
-        elif candidate.salary_expectation <= job.salary_max * multiplier:
-            score += 5
+    required_skills = db.session.query(
+        JobRequiredSkill.skill_id, JobRequiredSkill.importance
+    ).filter(JobRequiredSkill.job_id == job_id).all()
+    candidate_skill_ids = {skill_id for skill_id, in db.session.query(
+        CandidateSkill.skill_id
+    ).filter(CandidateSkill.candidate_id == candidate_id)}
+
+    return score_breakdown(candidate, job, required_skills, candidate_skill_ids)['total']
+
+
+# --- BATCH LOADERS ---
+
+def load_candidate_rows(candidate_ids):
+    """Load matching columns for many candidates, keyed by candidate id"""
+    rows = {}
+    for chunk in _chunks(candidate_ids):
+        for row in db.session.query(
+            CandidateProfile.id,
+            CandidateProfile.experience_years,
+            CandidateProfile.location_id,
+            CandidateProfile.salary_expectation
+        ).filter(CandidateProfile.id.in_(chunk)):
+            rows[row.id] = row
+    prefetch_places(row.location_id for row in rows.values())
+    return rows
+
+
+def load_job_rows(job_ids):
+    """Load matching columns for many jobs, keyed by job id"""
+    rows = {}
+    for chunk in _chunks(job_ids):
+        for row in db.session.query(
+            JobPosting.id,
+            JobPosting.experience_required,
+            JobPosting.location_id,
+            JobPosting.salary_min,
+            JobPosting.salary_max
+        ).filter(JobPosting.id.in_(chunk)):
+            rows[row.id] = row
+    prefetch_places(row.location_id for row in rows.values())
+    return rows
+
+
+def load_required_skills(job_ids):
+    """Map job id -> list of (skill_id, importance) for many jobs"""
+    required = {job_id: [] for job_id in job_ids}
+    for chunk in _chunks(job_ids):
+        for job_id, skill_id, importance in db.session.query(
+            JobRequiredSkill.job_id, JobRequiredSkill.skill_id, JobRequiredSkill.importance
+        ).filter(JobRequiredSkill.job_id.in_(chunk)):
+            required[job_id].append((skill_id, importance))
+    return required
+
+
+def load_candidate_skill_ids(candidate_ids):
+    """Map candidate id -> set of skill ids for many candidates"""
+    skills = {candidate_id: set() for candidate_id in candidate_ids}
+    for chunk in _chunks(candidate_ids):
+        for candidate_id, skill_id in db.session.query(
+            CandidateSkill.candidate_id, CandidateSkill.skill_id
+        ).filter(CandidateSkill.candidate_id.in_(chunk)):
+            skills[candidate_id].add(skill_id)
+    return skills
+
+
+# --- BATCH SCORING ---
+
+def calculate_job_match_breakdowns(candidate_id, job_ids):
+    """Score one candidate against many jobs, returning {job_id: breakdown}.
+
+    Inputs are loaded with a fixed number of queries per chunk of jobs
+    instead of four queries per pair. Unknown jobs are left out.
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    candidate = load_candidate_rows([candidate_id]).get(candidate_id)
+    if not candidate or not job_ids:
+        return {}
+
+    candidate_skill_ids = load_candidate_skill_ids([candidate_id])[candidate_id]
+    jobs = load_job_rows(job_ids)
+    required_skills = load_required_skills(list(jobs))
+
+    return {
+        job_id: score_breakdown(candidate, job, required_skills[job_id], candidate_skill_ids)
+        for job_id, job in jobs.items()
+    }
+
+
+def calculate_candidate_match_breakdowns(job_id, candidate_ids):
+    """Score many candidates against one job, returning {candidate_id: breakdown}"""
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    job = load_job_rows([job_id]).get(job_id)
+    if not job or not candidate_ids:
+        return {}
+
+    required_skills = load_required_skills([job_id])[job_id]
+    candidates = load_candidate_rows(candidate_ids)
+    candidate_skills = load_candidate_skill_ids(list(candidates))
+
+    return {
+        candidate_id: score_breakdown(candidate, job, required_skills, candidate_skills[candidate_id])
+        for candidate_id, candidate in candidates.items()
+    }
+
+
+def calculate_job_match_scores(candidate_id, job_ids):
+    """Batch version of calculate_job_match_score: {job_id: score}"""
+    return {
+        job_id: breakdown['total']
+        for job_id, breakdown in calculate_job_match_breakdowns(candidate_id, job_ids).items()
+    }
+
+
+def calculate_candidate_match_scores(job_id, candidate_ids):
+    """Batch version of calculate_job_match_score: {candidate_id: score}"""
+    return {
+        candidate_id: breakdown['total']
+        for candidate_id, breakdown in calculate_candidate_match_breakdowns(job_id, candidate_ids).items()
+    }
+
+
+def changed_match_inputs(session):
+    """Candidate and job ids whose match score inputs change in this flush"""
+    candidate_ids, job_ids = set(), set()
+
+    for skill, state in changed_instances(session, CandidateSkill):
+        candidate_ids.update((skill.candidate_id, previous_value(skill, 'candidate_id')))
+    for skill, state in changed_instances(session, JobRequiredSkill):
+        job_ids.update((skill.job_id, previous_value(skill, 'job_id')))
+
+    for profile, state in changed_instances(session, CandidateProfile):
+        if state == 'deleted' or (state == 'dirty' and attributes_changed(profile, *CANDIDATE_MATCH_FIELDS)):
+            candidate_ids.add(profile.id)
+    for job, state in changed_instances(session, JobPosting):
+        if state == 'deleted' or (state == 'dirty' and attributes_changed(job, *JOB_MATCH_FIELDS)):
+            job_ids.add(job.id)
 
-    return min(score, max_score)
+    candidate_ids.discard(None)
+    job_ids.discard(None)
+    return candidate_ids, job_ids
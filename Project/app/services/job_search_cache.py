@@ -0,0 +1,132 @@
+import hashlib
+import json
+import time
+from collections import namedtuple
+from flask import current_app
+from models import JobPosting, JobRequiredSkill, Company
+from services.cache import LRUCache, SingleFlight
+from services.cache_versions import (
+    bump_cache_version, current_cache_version, acquire_cache_lease, release_cache_lease,
+    read_shared_cache_entry, write_shared_cache_entry
+)
+from services.model_hooks import on_flush, changed_instances
+
+# One page of /jobs results: ids in display order, cursors, total and facet counts
+JobSearchPage = namedtuple('JobSearchPage', 'job_ids next_cursor prev_cursor total facets')
+
+_result_cache = None
+_flights = SingleFlight()
+
+# Seconds between checks for the page of a worker holding the lease
+LEASE_POLL_INTERVAL = 0.05
+
+
+def _get_result_cache():
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = LRUCache(
+            'job_search_results',
+            maxsize=current_app.config.get('JOB_SEARCH_CACHE_SIZE', 2000),
+            ttl=current_app.config.get('JOB_SEARCH_CACHE_TTL', 600)
+        )
+    return _result_cache
+
+
+def search_cache_key(search, location, job_types, experience_level, salary_min, skill_id, sort, cursor):
+    """Normalized key of a /jobs request, so equivalent filter combinations share an entry"""
+    def normalized(text):
+        # Every search path matches case-insensitively and ignores extra whitespace
+        return ' '.join((text or '').lower().split())
+
+    search = normalized(search)
+    if sort not in ('relevance', 'salary_high', 'salary_low') or (sort == 'relevance' and not search):
+        sort = 'newest'
+    return (
+        search, normalized(location), tuple(sorted(set(job_types))), experience_level or '',
+        salary_min or 0, skill_id or 0, sort, cursor or ''
+    )
+
+
+def _shared_name(key):
+    return 'jobs:' + hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _dump_page(page):
+    facets = dict(page.facets, salary=list(page.facets['salary'].items()))
+    return json.dumps(page._replace(facets=facets)._asdict())
+
+
+def _load_page(value):
+    page = JobSearchPage(**json.loads(value))
+    # JSON turns the salary buckets' keys into strings and pairs into lists
+    facets = dict(page.facets, salary=dict(page.facets['salary']),
+                  skills=[tuple(pair) for pair in page.facets['skills']])
+    return page._replace(facets=facets)
+
+
+def _fetch_page(key, version, compute, stale):
+    """Page for key at version from the shared store, computed by at most one worker at a time.
+
+    Without the lease a worker serves its stale page if it has one, or
+    waits up to JOB_SEARCH_LEASE_WAIT seconds for the holder's page before
+    computing it itself.
+    """
+    config = current_app.config
+    name = _shared_name(key)
+    deadline = time.monotonic() + config.get('JOB_SEARCH_LEASE_WAIT', 2)
+    while True:
+        value = read_shared_cache_entry(name, version)
+        if value is not None:
+            return _load_page(value)
+        holder = acquire_cache_lease(name, config.get('JOB_SEARCH_LEASE_SECONDS', 30))
+        if holder is not None:
+            break
+        if stale is not None:
+            return stale
+        if time.monotonic() >= deadline:
+            return compute()
+        time.sleep(LEASE_POLL_INTERVAL)
+    try:
+        # The previous holder may have stored the page since it was last read
+        value = read_shared_cache_entry(name, version)
+        if value is not None:
+            return _load_page(value)
+        page = compute()
+        write_shared_cache_entry(name, version, _dump_page(page), config.get('JOB_SEARCH_CACHE_TTL', 600))
+        return page
+    finally:
+        release_cache_lease(name, holder)
+
+
+def cached_search_page(key, compute):
+    """JobSearchPage for key, calling compute() only when no current entry exists.
+
+    Entries are tagged with the shared 'jobs' version, which every job,
+    required skill or company write bumps. Concurrent misses on a key run
+    compute() once per worker, and across workers only the holder of the
+    key's cache lease computes it; the page it computes is shared through
+    cache_entries. Meanwhile a worker holding an entry from an older
+    version keeps serving it, and one with no entry waits briefly for the
+    holder's page.
+    """
+    cache = _get_result_cache()
+    version = current_cache_version('jobs')
+    entry = cache.get(key)
+    if entry is not None and (entry[0] == version or _flights.in_flight(key)):
+        return entry[1]
+
+    def fetch_and_store():
+        page = _fetch_page(key, version, compute, entry[1] if entry is not None else None)
+        if entry is None or page is not entry[1]:
+            cache.set(key, (version, page))
+        return page
+
+    return _flights.do(key, fetch_and_store)
+
+
+@on_flush
+def _bump_jobs_version(session):
+    for model in (JobPosting, JobRequiredSkill, Company):
+        if any(True for _ in changed_instances(session, model)):
+            bump_cache_version(session, 'jobs')
+            return
@@ -0,0 +1,317 @@
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from flask import current_app
+from extensions import db
+from models import JobPosting, Company
+from services.cache_versions import current_cache_version, changed_only_here
+from services.model_hooks import on_flush, on_commit, queue_after_commit
+from services.job_search_service import SEARCH_FIELDS, MAX_SEARCH_TERMS, jobs_changed_for_search
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on',
+    'or', 'our', 'the', 'this', 'to', 'we', 'will', 'with', 'you', 'your',
+))
+
+# Term frequency weight of a word in each part of a job
+FIELD_WEIGHTS = {'title': 3, 'company': 2, 'body': 1}
+
+# BM25 term saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Most vocabulary words a query word expands to as a prefix
+MAX_PREFIX_EXPANSIONS = 50
+
+# Sort keys also held by the index; edits to these refresh a job too
+SORT_FIELDS = ('created_at', 'salary_min', 'salary_max')
+
+# Rows per round trip when streaming jobs into the index
+BUILD_BATCH_SIZE = 2000
+
+_MISSING = -1.0  # sort key of a NULL salary or date
+
+
+def tokenize(text):
+    """Lower-cased words of text without stopwords"""
+    return [word for word in TOKEN_PATTERN.findall((text or '').lower()) if word not in STOPWORDS]
+
+
+def _sort_key(value):
+    if value is None:
+        return _MISSING
+    return value.timestamp() if hasattr(value, 'timestamp') else float(value)
+
+
+class InvertedIndex:
+    """BM25 index over job documents kept in flat arrays.
+
+    Every document gets a dense number; its job id, weighted length and
+    sort keys live in arrays indexed by that number. Each word maps to a
+    pair of arrays of document numbers and weighted term frequencies.
+    Removing a job only tombstones its number; ``compact`` renumbers the
+    live documents once tombstones pile up.
+    """
+
+    def __init__(self):
+        self.postings = {}  # word -> (array of docnos, array of weighted tfs)
+        self.doc_of_job = {}  # live job id -> docno
+        self.job_ids = array('q')
+        self.lengths = array('I')
+        self.created = array('d')
+        self.salary_min = array('d')
+        self.salary_max = array('d')
+        self.alive = bytearray()
+        self.live_count = 0
+        self.total_length = 0
+        self._vocabulary = None  # sorted words, rebuilt after new words appear
+
+    @property
+    def dead_count(self):
+        return len(self.alive) - self.live_count
+
+    def add(self, job_id, title, body, company_name, created_at, salary_min, salary_max):
+        """Index (or re-index) one job"""
+        self.remove(job_id)
+        frequencies = Counter()
+        for field, text in (('title', title), ('body', body), ('company', company_name)):
+            for word in tokenize(text):
+                frequencies[word] += FIELD_WEIGHTS[field]
+
+        docno = len(self.job_ids)
+        self.doc_of_job[job_id] = docno
+        self.job_ids.append(job_id)
+        length = sum(frequencies.values())
+        self.lengths.append(length)
+        self.created.append(_sort_key(created_at))
+        self.salary_min.append(_sort_key(salary_min))
+        self.salary_max.append(_sort_key(salary_max))
+        self.alive.append(1)
+        self.live_count += 1
+        self.total_length += length
+
+        for word, frequency in frequencies.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = (array('I'), array('I'))
+                self._vocabulary = None
+            posting[0].append(docno)
+            posting[1].append(frequency)
+
+    def remove(self, job_id):
+        """Tombstone a job's document, if indexed"""
+        docno = self.doc_of_job.pop(job_id, None)
+        if docno is None:
+            return
+        self.alive[docno] = 0
+        self.live_count -= 1
+        self.total_length -= self.lengths[docno]
+
+    def compact(self):
+        """Drop tombstoned documents from every array, renumbering the live ones"""
+        renumbered = array('q', [-1]) * len(self.alive)
+        next_docno = 0
+        for docno, live in enumerate(self.alive):
+            if live:
+                renumbered[docno] = next_docno
+                next_docno += 1
+
+        def keep(values):
+            return array(values.typecode, (value for docno, value in enumerate(values) if self.alive[docno]))
+
+        postings = {}
+        for word, (docnos, frequencies) in self.postings.items():
+            kept = [(renumbered[docno], frequency) for docno, frequency in zip(docnos, frequencies) if self.alive[docno]]
+            if kept:
+                postings[word] = (array('I', (docno for docno, _ in kept)), array('I', (frequency for _, frequency in kept)))
+
+        self.job_ids, self.lengths = keep(self.job_ids), keep(self.lengths)
+        self.created, self.salary_min, self.salary_max = keep(self.created), keep(self.salary_min), keep(self.salary_max)
+        self.doc_of_job = {job_id: docno for docno, job_id in enumerate(self.job_ids)}
+        self.alive = bytearray(b'\x01') * len(self.job_ids)
+        self.postings = postings
+        self._vocabulary = None
+
+    def expand(self, term):
+        """Indexed words starting with term, capped at MAX_PREFIX_EXPANSIONS"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        vocabulary = self._vocabulary
+        words = []
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term) and len(words) < MAX_PREFIX_EXPANSIONS:
+            words.append(vocabulary[position])
+            position += 1
+        return words
+
+    def _term_scores(self, words, average_length):
+        """BM25 contribution of one query term per live document containing any of words"""
+        scores = {}
+        alive, lengths = self.alive, self.lengths
+        for word in words:
+            docnos, frequencies = self.postings[word]
+            document_frequency = sum(1 for docno in docnos if alive[docno])
+            if not document_frequency:
+                continue
+            idf = math.log(1 + (self.live_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for docno, frequency in zip(docnos, frequencies):
+                if alive[docno]:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docno] / average_length)
+                    scores[docno] = scores.get(docno, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, terms):
+        """{docno: score} of live documents matching every term (terms match as prefixes)"""
+        if not self.live_count:
+            return {}
+        average_length = self.total_length / self.live_count or 1
+        expansions = [self.expand(term) for term in terms]
+        if not all(expansions):
+            return {}
+
+        matched = None
+        # Cheapest terms first, so later ones only add to an already small set
+        for words in sorted(expansions, key=lambda words: sum(len(self.postings[word][0]) for word in words)):
+            scores = self._term_scores(words, average_length)
+            if matched is None:
+                matched = scores
+            else:
+                matched = {docno: score + scores[docno] for docno, score in matched.items() if docno in scores}
+            if not matched:
+                return {}
+        return matched
+
+    def ordered_job_ids(self, scores, sort):
+        """Job ids of the scored documents in browse_jobs order for sort"""
+        created = self.created
+        if sort == 'relevance':
+            key = lambda docno: (-scores[docno], -created[docno])
+        elif sort == 'salary_high':
+            key = lambda docno: (self.salary_max[docno] == _MISSING, -self.salary_max[docno], -created[docno])
+        elif sort == 'salary_low':
+            key = lambda docno: (self.salary_min[docno] == _MISSING, self.salary_min[docno], -created[docno])
+        else:  # newest
+            key = lambda docno: -created[docno]
+        return [self.job_ids[docno] for docno in sorted(scores, key=key)]
+
+
+def _document_query():
+    return db.session.query(
+        JobPosting.id, JobPosting.title, JobPosting.description, JobPosting.requirements,
+        Company.company_name, JobPosting.created_at, JobPosting.salary_min, JobPosting.salary_max
+    ).join(Company, JobPosting.company_id == Company.id).filter(JobPosting.is_active == True)
+
+
+def _add_row(index, row):
+    index.add(row.id, row.title, f'{row.description or ""} {row.requirements or ""}', row.company_name,
+              row.created_at, row.salary_min, row.salary_max)
+
+
+class JobSearchEngine:
+    """Per-worker BM25 keyword search over active jobs.
+
+    Documents are the job title, description, requirements and company
+    name. The index is built lazily from a streamed query, patched for jobs
+    this worker changed (refreshed on the next search, after the write
+    committed) and fully rebuilt once another worker bumps the shared
+    'jobs' cache version, as well as every ``JOB_SEARCH_ENGINE_TTL`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._version = None
+        self._stale_jobs = set()
+        self._index = InvertedIndex()
+
+    def rebuild(self, version=None):
+        """Reload the whole index from the database"""
+        # Read before loading, and jobs queued meanwhile stay queued, so
+        # the index is never older than the version kept
+        if version is None:
+            version = current_cache_version('jobs')
+        with self._lock:
+            self._stale_jobs.clear()
+        index = InvertedIndex()
+        for row in _document_query().yield_per(BUILD_BATCH_SIZE):
+            _add_row(index, row)
+
+        with self._lock:
+            self._index = index
+            self._built_at = time.monotonic()
+            self._version = version
+
+    def mark_stale(self, job_ids):
+        """Queue jobs to be re-read from the database before the next search"""
+        with self._lock:
+            self._stale_jobs.update(job_ids)
+
+    def _refresh_jobs(self, job_ids):
+        rows = _document_query().filter(JobPosting.id.in_(job_ids)).all()
+        with self._lock:
+            index = self._index
+            for job_id in job_ids:
+                index.remove(job_id)
+            for row in rows:
+                _add_row(index, row)
+            if index.dead_count > max(1000, index.live_count // 4):
+                index.compact()
+
+    def _ensure_current(self):
+        ttl = current_app.config.get('JOB_SEARCH_ENGINE_TTL', 300)
+        version = current_cache_version('jobs')
+        if (self._built_at is None or time.monotonic() - self._built_at > ttl
+                or not changed_only_here('jobs', self._version, version)):
+            self.rebuild(version)
+            return
+
+        # Every change since the last build came from this worker and is queued as a stale job
+        with self._lock:
+            stale_jobs, self._stale_jobs = self._stale_jobs, set()
+            self._version = version
+        if stale_jobs:
+            self._refresh_jobs(stale_jobs)
+
+    def search(self, search, sort='newest'):
+        """Ids of active jobs matching every word of search, in browse_jobs order for sort.
+
+        Words match as prefixes and relevance is BM25 with title and company
+        words weighted above the body. Returns None when nothing searchable
+        is left in search.
+        """
+        terms = list(dict.fromkeys(tokenize(search)))[:MAX_SEARCH_TERMS]
+        if not terms:
+            return None
+        self._ensure_current()
+        with self._lock:
+            index = self._index
+            return index.ordered_job_ids(index.search(terms), sort)
+
+
+job_search_engine = JobSearchEngine()
+
+
+@on_flush
+def _queue_engine_changes(session):
+    queue_after_commit(session, 'job_search_engine', jobs_changed_for_search(session, SEARCH_FIELDS + SORT_FIELDS))
+
+
+@on_commit('job_search_engine')
+def _mark_engine_stale(job_ids):
+    job_search_engine.mark_stale(job_ids)
+
+
+def jobs_with_companies(job_ids):
+    """(JobPosting, Company) rows for active job ids, in the order given"""
+    if not job_ids:
+        return []
+    rows = {job.id: (job, company) for job, company in db.session.query(JobPosting, Company).join(
+        Company, JobPosting.company_id == Company.id
+    ).filter(JobPosting.id.in_(job_ids), JobPosting.is_active == True)}
+    return [rows[job_id] for job_id in job_ids if job_id in rows]
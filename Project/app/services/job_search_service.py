@@ -0,0 +1,120 @@
+import re
+from sqlalchemy import select, func, table, column, text, literal_column
+from sqlalchemy.dialects.mysql import match
+from extensions import db
+from models import JobPosting, Company
+from models.search import JOB_SEARCH_TABLES
+from services.model_hooks import on_flush, changed_instances, attributes_changed
+
+# JobPosting columns that feed the search document
+SEARCH_FIELDS = ('title', 'description', 'requirements', 'company_id', 'is_active')
+
+# Longest query (in words) sent to the full-text engine
+MAX_SEARCH_TERMS = 8
+
+# bm25 column weights for title, body and company name (SQLite)
+FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+_search_tables = {
+    'mysql': table(JOB_SEARCH_TABLES['mysql'], column('job_id'), column('title'), column('body'), column('company_name')),
+    'sqlite': table(JOB_SEARCH_TABLES['sqlite'], column('rowid'), column('title'), column('body'), column('company_name')),
+}
+
+
+def _key_column(search_table):
+    return search_table.c.job_id if 'job_id' in search_table.c else search_table.c.rowid
+
+
+def _reindex(connection, job_ids=None):
+    """Rewrite search documents for job_ids (every job if None); inactive jobs get none"""
+    search_table = _search_tables.get(connection.dialect.name)
+    if search_table is None:
+        return
+    key_column = _key_column(search_table)
+
+    documents = select(
+        JobPosting.id,
+        JobPosting.title,
+        func.coalesce(JobPosting.description, '') + ' ' + func.coalesce(JobPosting.requirements, ''),
+        Company.company_name
+    ).join(Company, JobPosting.company_id == Company.id).where(JobPosting.is_active == True)
+
+    delete = search_table.delete()
+    if job_ids is not None:
+        job_ids = list(job_ids)
+        delete = delete.where(key_column.in_(job_ids))
+        documents = documents.where(JobPosting.id.in_(job_ids))
+    connection.execute(delete)
+    connection.execute(search_table.insert().from_select(
+        [key_column.name, 'title', 'body', 'company_name'], documents
+    ))
+
+
+def jobs_changed_for_search(session, fields=SEARCH_FIELDS):
+    """Ids of jobs created, deleted or with fields edited in a flush, plus jobs of renamed companies"""
+    job_ids = {
+        job.id for job, state in changed_instances(session, JobPosting)
+        if state != 'dirty' or attributes_changed(job, *fields)
+    }
+    company_ids = {
+        company.id for company, state in changed_instances(session, Company)
+        if state == 'dirty' and attributes_changed(company, 'company_name')
+    }
+    if company_ids:
+        job_ids.update(job_id for job_id, in session.connection().execute(
+            select(JobPosting.id).where(JobPosting.company_id.in_(company_ids))
+        ))
+    job_ids.discard(None)
+    return job_ids
+
+
+@on_flush
+def _sync_search_documents(session):
+    """Reindex jobs created, edited, deactivated or whose company was renamed in this flush"""
+    if session.connection().dialect.name not in _search_tables:
+        return
+    job_ids = jobs_changed_for_search(session)
+    if job_ids:
+        _reindex(session.connection(), job_ids)
+
+
+def rebuild_search_index():
+    """Rewrite every search document, e.g. after creating the index on an existing database"""
+    _reindex(db.session.connection())
+    db.session.commit()
+
+
+def search_matches(search):
+    """Subquery of (job_id, relevance) for active jobs matching every word of search.
+
+    Higher relevance is better. Words match as prefixes. Returns None when
+    the database has no full-text backend or nothing searchable is left,
+    so callers can fall back to a LIKE scan.
+    """
+    dialect = db.session.get_bind().dialect.name
+    search_table = _search_tables.get(dialect)
+    if search_table is None:
+        return None
+
+    terms = re.findall(r'\w+', search.lower())[:MAX_SEARCH_TERMS]
+    if dialect == 'mysql':
+        # InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default)
+        terms = [term for term in terms if len(term) >= 3]
+    if not terms:
+        return None
+
+    if dialect == 'sqlite':
+        fts_table = literal_column(JOB_SEARCH_TABLES['sqlite'])
+        query = select(
+            search_table.c.rowid.label('job_id'),
+            (-func.bm25(fts_table, *FTS_WEIGHTS)).label('relevance')
+        ).where(text(f"{JOB_SEARCH_TABLES['sqlite']} MATCH :search_terms").bindparams(
+            search_terms=' '.join(f'"{term}"*' for term in terms)
+        ))
+    else:
+        relevance = match(
+            search_table.c.title, search_table.c.body, search_table.c.company_name,
+            against=' '.join(f'+{term}*' for term in terms)
+        ).in_boolean_mode()
+        query = select(search_table.c.job_id, relevance.label('relevance')).where(relevance)
+    return query.subquery('search_matches')
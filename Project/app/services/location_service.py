@@ -0,0 +1,178 @@
+import re
+from collections import namedtuple
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Location, CandidateProfile, JobPosting, Company
+from services.cache import LRUCache
+from services.model_hooks import on_before_flush, changed_instances, attributes_changed
+
+Place = namedtuple('Place', 'city region country is_remote')
+
+# Models whose free-text ``location`` is resolved into ``location_id`` on save
+LOCATED_MODELS = (CandidateProfile, JobPosting, Company)
+
+REMOTE_PATTERN = re.compile(r'\b(remote|anywhere|work from home|wfh)\b')
+
+COUNTRY_ALIASES = {
+    'us': 'united states', 'usa': 'united states', 'america': 'united states',
+    'united states of america': 'united states',
+    'uk': 'united kingdom', 'gb': 'united kingdom', 'great britain': 'united kingdom', 'england': 'united kingdom',
+    'bd': 'bangladesh', 'uae': 'united arab emirates', 'ksa': 'saudi arabia',
+}
+
+COUNTRIES = {
+    'united states', 'united kingdom', 'bangladesh', 'india', 'pakistan', 'sri lanka', 'nepal', 'canada',
+    'australia', 'new zealand', 'germany', 'france', 'netherlands', 'ireland', 'spain', 'italy', 'sweden',
+    'norway', 'denmark', 'finland', 'poland', 'switzerland', 'austria', 'belgium', 'portugal', 'japan',
+    'china', 'singapore', 'malaysia', 'indonesia', 'philippines', 'vietnam', 'thailand', 'south korea',
+    'united arab emirates', 'saudi arabia', 'qatar', 'egypt', 'nigeria', 'kenya', 'south africa', 'brazil',
+    'mexico', 'argentina',
+}
+
+# Location id -> Place; rows are immutable, so entries never go stale
+_places = LRUCache('locations', maxsize=50000)
+
+
+def _clean(part):
+    part = re.sub(r'[^\w\s-]', ' ', part.lower().replace('.', ''))
+    return re.sub(r'\s+', ' ', part).strip(' -')
+
+
+def _country(part):
+    part = COUNTRY_ALIASES.get(part, part)
+    return part if part in COUNTRIES else None
+
+
+def parse_location(text):
+    """Split free text like 'Dhaka, Bangladesh' or 'Remote (US)' into a Place.
+
+    Returns None when nothing usable is left. A single part is read as a
+    country when it names one, otherwise as a city; with more parts the
+    first is the city, the last the country (or region if it names no
+    country) and the second the region.
+    """
+    text = (text or '').lower()
+    is_remote = bool(REMOTE_PATTERN.search(text))
+    text = REMOTE_PATTERN.sub(' ', text)
+    parts = [part for part in (_clean(part) for part in re.split(r'[,;/()|]', text)) if part]
+
+    city = region = country = None
+    if len(parts) == 1:
+        country = _country(parts[0])
+        if not country and not is_remote:
+            city = parts[0]
+    elif len(parts) == 2:
+        city = parts[0]
+        country = _country(parts[1])
+        if not country:
+            region = parts[1]
+    elif parts:
+        city, region = parts[0], parts[1]
+        country = _country(parts[-1]) or parts[-1]
+
+    if not (city or region or country or is_remote):
+        return None
+    return Place(city, region, country, is_remote)
+
+
+def place_slug(place):
+    return '|'.join(part or '' for part in place[:3]) + ('|remote' if place.is_remote else '')
+
+
+def places_match(first, second):
+    """True when two places are the same or one lies within the other.
+
+    Parts known on both sides must agree and at least one must be shared,
+    so 'Dhaka' matches 'Dhaka, Bangladesh' and 'Bangladesh' matches both.
+    Remote places only match other remote places.
+    """
+    if first.is_remote != second.is_remote:
+        return False
+    shared = 0
+    for mine, theirs in zip(first[:3], second[:3]):
+        if mine and theirs:
+            if mine != theirs:
+                return False
+            shared += 1
+    return shared > 0 or first.is_remote
+
+
+def resolve_location_id(text, session=None):
+    """Id of the canonical location for free text, creating it if needed (None if unparseable)"""
+    place = parse_location(text)
+    if place is None:
+        return None
+    session = session or db.session
+    slug = place_slug(place)
+
+    with session.no_autoflush:
+        location_id = session.query(Location.id).filter(Location.slug == slug).scalar()
+        if location_id is None:
+            table = Location.__table__
+            connection = session.connection()
+            try:
+                with connection.begin_nested():
+                    location_id = connection.execute(table.insert().values(
+                        slug=slug, city=place.city, region=place.region,
+                        country=place.country, is_remote=place.is_remote
+                    )).inserted_primary_key[0]
+            except IntegrityError:
+                # Created concurrently by another request
+                location_id = session.query(Location.id).filter(Location.slug == slug).scalar()
+    return location_id
+
+
+@on_before_flush
+def _resolve_changed_locations(session):
+    for model in LOCATED_MODELS:
+        for instance, state in list(changed_instances(session, model)):
+            if state == 'new' or (state == 'dirty' and attributes_changed(instance, 'location')):
+                instance.location_id = resolve_location_id(instance.location, session)
+
+
+def prefetch_places(location_ids):
+    """Load places for the given ids into the per-worker cache in one query"""
+    missing = [location_id for location_id in set(location_ids) if location_id and _places.get(location_id) is None]
+    if not missing:
+        return
+    for row in db.session.query(
+        Location.id, Location.city, Location.region, Location.country, Location.is_remote
+    ).filter(Location.id.in_(missing)):
+        _places.set(row.id, Place(row.city, row.region, row.country, bool(row.is_remote)))
+
+
+def get_place(location_id):
+    """Place for a location id (None for a missing id)"""
+    if not location_id:
+        return None
+    place = _places.get(location_id)
+    if place is None:
+        prefetch_places([location_id])
+        place = _places.get(location_id)
+    return place
+
+
+def location_ids_matching(text):
+    """Subquery of location ids matching a search term, for indexed ``location_id IN`` filters.
+
+    A bare term matches a city, region or country of that name; longer
+    terms match every place lying within the parsed one.
+    """
+    place = parse_location(text)
+    if place is None:
+        return None
+
+    query = db.session.query(Location.id)
+    if place.is_remote:
+        query = query.filter(Location.is_remote == True)
+
+    if place.city and not (place.region or place.country):
+        query = query.filter(or_(
+            Location.city == place.city, Location.region == place.city, Location.country == place.city
+        ))
+    else:
+        for column, value in ((Location.city, place.city), (Location.region, place.region), (Location.country, place.country)):
+            if value:
+                query = query.filter(column == value)
+    return query
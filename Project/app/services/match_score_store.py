@@ -0,0 +1,282 @@
+import threading
+from collections import defaultdict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from extensions import db
+from models import CandidateJobScore, MatchInputVersion
+from services.cache import LRUCache
+from services.counters import increment_counter
+from services.model_hooks import on_flush, on_commit, queue_after_commit, pending_keys
+from services.job_matching_service import (
+    BATCH_CHUNK_SIZE, calculate_job_match_breakdowns, calculate_candidate_match_breakdowns,
+    changed_match_inputs
+)
+
+score_table = CandidateJobScore.__table__
+version_table = MatchInputVersion.__table__
+
+# Per-worker version stamps, part of every score cache key. Bumping a
+# candidate's or job's version orphans its cached scores, which then age out
+# of the LRU.
+_versions_lock = threading.Lock()
+_candidate_versions = defaultdict(int)
+_job_versions = defaultdict(int)
+_score_cache = None
+
+
+def _bump_versions(candidate_ids, job_ids):
+    with _versions_lock:
+        for candidate_id in candidate_ids:
+            _candidate_versions[candidate_id] += 1
+        for job_id in job_ids:
+            _job_versions[job_id] += 1
+
+
+def _get_score_cache():
+    global _score_cache
+    if _score_cache is None:
+        _score_cache = LRUCache(
+            'match_scores',
+            maxsize=current_app.config.get('MATCH_SCORE_CACHE_SIZE', 10000),
+            ttl=current_app.config.get('MATCH_SCORE_CACHE_TTL', 300)
+        )
+    return _score_cache
+
+
+@on_flush
+def invalidate_changed_scores(session):
+    """Drop stored and cached scores whose inputs changed; they are recomputed on next read"""
+    candidate_ids, job_ids = changed_match_inputs(session)
+    if not candidate_ids and not job_ids:
+        return
+
+    # Bump now so this transaction never reads a stale cached score, and again
+    # after commit in case another thread cached the old score meanwhile
+    _bump_versions(candidate_ids, job_ids)
+    queue_after_commit(session, 'match_score_cache', {('candidate', candidate_id) for candidate_id in candidate_ids})
+    queue_after_commit(session, 'match_score_cache', {('job', job_id) for job_id in job_ids})
+
+    connection = session.connection()
+    # Sorted, candidates before jobs, the order _store locks them in
+    for candidate_id in sorted(candidate_ids):
+        increment_counter(connection, version_table, {'kind': 'candidate', 'entity_id': candidate_id}, 'version', 1)
+    for job_id in sorted(job_ids):
+        increment_counter(connection, version_table, {'kind': 'job', 'entity_id': job_id}, 'version', 1)
+    if candidate_ids:
+        connection.execute(score_table.delete().where(score_table.c.candidate_id.in_(candidate_ids)))
+    if job_ids:
+        connection.execute(score_table.delete().where(score_table.c.job_id.in_(job_ids)))
+
+
+@on_commit('match_score_cache')
+def _bump_committed_versions(keys):
+    _bump_versions(
+        [key_id for kind, key_id in keys if kind == 'candidate'],
+        [key_id for kind, key_id in keys if kind == 'job']
+    )
+
+
+def _load_stored(pairs):
+    """Stored breakdowns for the given pairs, keyed by (candidate_id, job_id)"""
+    candidate_ids = sorted({candidate_id for candidate_id, _ in pairs})
+    job_ids = sorted({job_id for _, job_id in pairs})
+
+    # Chunk the longer id list and send the shorter one whole
+    if len(candidate_ids) >= len(job_ids):
+        chunk_column, chunk_ids = score_table.c.candidate_id, candidate_ids
+        fixed_column, fixed_ids = score_table.c.job_id, job_ids
+    else:
+        chunk_column, chunk_ids = score_table.c.job_id, job_ids
+        fixed_column, fixed_ids = score_table.c.candidate_id, candidate_ids
+
+    stored = {}
+    for start in range(0, len(chunk_ids), BATCH_CHUNK_SIZE):
+        rows = db.session.execute(
+            score_table.select().where(
+                chunk_column.in_(chunk_ids[start:start + BATCH_CHUNK_SIZE]),
+                fixed_column.in_(fixed_ids)
+            )
+        )
+        for row in rows:
+            key = (row.candidate_id, row.job_id)
+            if key in pairs:
+                stored[key] = {
+                    'experience': row.experience_score,
+                    'skills': row.skills_score,
+                    'location': row.location_score,
+                    'salary': row.salary_score,
+                    'total': row.total_score,
+                }
+    return stored
+
+
+def _compute_missing(pairs):
+    """Batch-score pairs, grouping by whichever side gives fewer batches"""
+    by_candidate = defaultdict(list)
+    by_job = defaultdict(list)
+    for candidate_id, job_id in pairs:
+        by_candidate[candidate_id].append(job_id)
+        by_job[job_id].append(candidate_id)
+
+    computed = {}
+    if len(by_candidate) <= len(by_job):
+        for candidate_id, job_ids in by_candidate.items():
+            for job_id, breakdown in calculate_job_match_breakdowns(candidate_id, job_ids).items():
+                computed[(candidate_id, job_id)] = breakdown
+    else:
+        for job_id, candidate_ids in by_job.items():
+            for candidate_id, breakdown in calculate_candidate_match_breakdowns(job_id, candidate_ids).items():
+                computed[(candidate_id, job_id)] = breakdown
+    return computed
+
+
+def _read_versions(connection, pairs, lock=False):
+    """({candidate_id: version}, {job_id: version}) of the pairs' match inputs (0 if never changed)"""
+    versions = []
+    for kind, ids in (('candidate', {candidate_id for candidate_id, _ in pairs}), ('job', {job_id for _, job_id in pairs})):
+        ids = sorted(ids)
+        found = {}
+        for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+            query = select(version_table.c.entity_id, version_table.c.version).where(
+                version_table.c.kind == kind, version_table.c.entity_id.in_(ids[start:start + BATCH_CHUNK_SIZE])
+            )
+            if lock:
+                query = query.with_for_update()
+            found.update(connection.execute(query).all())
+        versions.append(found)
+    return tuple(versions)
+
+
+def _insert_scores(connection, rows):
+    try:
+        with connection.begin_nested():
+            connection.execute(score_table.insert(), rows)
+        return
+    except IntegrityError:
+        pass
+    # Another request stored some of these pairs first, or a candidate or
+    # job was deleted; keep every row that still fits
+    for row in rows:
+        try:
+            with connection.begin_nested():
+                connection.execute(score_table.insert(), row)
+        except IntegrityError:
+            pass
+
+
+def _store(breakdowns, versions):
+    """Store computed breakdowns whose inputs are still at the versions they were computed from.
+
+    Writes and commits on a separate connection, leaving the caller's
+    transaction alone. The versions are re-read with a locking read before
+    inserting: a change committed since the scores were computed shows up
+    there and its pairs are skipped, and one committing later waits for this
+    insert and then deletes the rows itself.
+    """
+    candidate_versions, job_versions = versions
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as connection:
+            current_candidates, current_jobs = _read_versions(connection, breakdowns, lock=True)
+            rows = [{
+                'candidate_id': candidate_id,
+                'job_id': job_id,
+                'experience_score': breakdown['experience'],
+                'skills_score': breakdown['skills'],
+                'location_score': breakdown['location'],
+                'salary_score': breakdown['salary'],
+                'total_score': breakdown['total'],
+                'computed_at': now,
+            } for (candidate_id, job_id), breakdown in breakdowns.items()
+                if current_candidates.get(candidate_id, 0) == candidate_versions.get(candidate_id, 0)
+                and current_jobs.get(job_id, 0) == job_versions.get(job_id, 0)]
+            if rows:
+                _insert_scores(connection, rows)
+    except OperationalError:
+        # Storing only saves later reads the work; give up on a lock timeout
+        current_app.logger.warning('Match scores not stored for %d pairs', len(breakdowns), exc_info=True)
+
+
+def get_match_breakdowns(pairs):
+    """Score breakdowns for (candidate_id, job_id) pairs.
+
+    Stored rows are read back as-is; pairs without a row are batch-scored
+    and stored in a separate transaction, unless this session has uncommitted
+    changes to the candidate or job (those scores are returned but not kept).
+    Pairs whose candidate or job no longer exists are left out of the result.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    breakdowns = _load_stored(pairs)
+    missing = pairs - breakdowns.keys()
+    if missing:
+        # Read before computing, so a change committed meanwhile is caught by _store
+        versions = _read_versions(db.session, missing)
+        computed = _compute_missing(missing)
+        if computed:
+            changed_here = pending_keys(db.session, 'match_score_cache')
+            storable = {
+                (candidate_id, job_id): breakdown for (candidate_id, job_id), breakdown in computed.items()
+                if ('candidate', candidate_id) not in changed_here and ('job', job_id) not in changed_here
+            }
+            if storable:
+                _store(storable, versions)
+            breakdowns.update(computed)
+    return breakdowns
+
+
+def ensure_scores_stored(query, candidate_column, job_column):
+    """Store scores for every pair a query returns that has no stored row yet.
+
+    Afterwards the query can be outer-joined to CandidateJobScore to sort,
+    filter and paginate by match score in SQL. The rows are committed on
+    a separate connection, so when any were stored the session's read
+    transaction is rolled back for the next query to see them; call it
+    from read paths only. Only the missing pairs are fetched, so repeat
+    calls cost a single anti-join.
+    """
+    missing = query.with_entities(candidate_column, job_column).outerjoin(
+        CandidateJobScore,
+        and_(CandidateJobScore.candidate_id == candidate_column, CandidateJobScore.job_id == job_column)
+    ).filter(CandidateJobScore.id == None).all()
+    if missing:
+        get_match_breakdowns((candidate_id, job_id) for candidate_id, job_id in missing)
+        # An open repeatable-read transaction would not see the new rows
+        db.session.rollback()
+
+
+def get_pair_match_scores(pairs):
+    """Stored match scores for (candidate_id, job_id) pairs: {pair: score}"""
+    return {pair: breakdown['total'] for pair, breakdown in get_match_breakdowns(pairs).items()}
+
+
+def get_match_scores(candidate_id, job_ids):
+    """Stored match scores for one candidate: {job_id: score}"""
+    scores = get_pair_match_scores((candidate_id, job_id) for job_id in job_ids)
+    return {job_id: score for (_, job_id), score in scores.items()}
+
+
+def get_candidate_match_scores(job_id, candidate_ids):
+    """Stored match scores for one job: {candidate_id: score}"""
+    scores = get_pair_match_scores((candidate_id, job_id) for candidate_id in candidate_ids)
+    return {candidate_id: score for (candidate_id, _), score in scores.items()}
+
+
+def get_match_score(candidate_id, job_id):
+    """Match score for one pair (0 if either side is missing).
+
+    Served from the per-worker LRU when neither side changed since it was
+    cached, otherwise read from (or computed into) the stored scores. Only
+    this worker's writes are seen at once: after another worker edits the
+    candidate or job, a cached score is served for up to
+    ``MATCH_SCORE_CACHE_TTL`` seconds.
+    """
+    with _versions_lock:
+        key = (candidate_id, _candidate_versions.get(candidate_id, 0), job_id, _job_versions.get(job_id, 0))
+    return _get_score_cache().get_or_set(
+        key, lambda: get_pair_match_scores([(candidate_id, job_id)]).get((candidate_id, job_id), 0)
+    )
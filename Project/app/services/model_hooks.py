@@ -0,0 +1,131 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# Services that keep derived data (stored scores, indexes, rollups) in step
+# with the models register callbacks here rather than attaching their own
+# session listeners.
+_before_flush_callbacks = []
+_flush_callbacks = []
+_commit_callbacks = {}
+_last_commit_callbacks = set()
+_PENDING_KEY = 'model_hooks_pending'
+
+
+def on_before_flush(callback):
+    """Register callback(session) to run before every flush.
+
+    Unlike ``on_flush`` callbacks, these can still set attributes on the
+    instances being flushed, e.g. to fill derived columns.
+    """
+    _before_flush_callbacks.append(callback)
+    return callback
+
+
+def on_flush(callback):
+    """Register callback(session) to run after every flush.
+
+    The callback runs inside the flushing transaction, so anything it writes
+    through ``session.connection()`` commits or rolls back with the change
+    that triggered it. ``session.new``, ``dirty`` and ``deleted`` still show
+    the pre-flush state at that point.
+    """
+    _flush_callbacks.append(callback)
+    return callback
+
+
+def on_commit(name, last=False):
+    """Register callback(keys) to receive everything queued under ``name``.
+
+    Keys are queued during a flush with ``queue_after_commit`` and delivered
+    once the outermost transaction commits; a rollback discards them. This
+    is what in-process caches and indexes use, since they must never react
+    to a write that did not happen. Callbacks registered with ``last`` run
+    after all others of the same commit.
+    """
+    def register(callback):
+        _commit_callbacks[name] = callback
+        if last:
+            _last_commit_callbacks.add(name)
+        return callback
+    return register
+
+
+def queue_after_commit(session, name, keys):
+    """Queue keys for the ``on_commit`` callback registered under name"""
+    keys = {key for key in keys if key is not None}
+    if keys:
+        session.info.setdefault(_PENDING_KEY, {}).setdefault(name, set()).update(keys)
+
+
+def pending_keys(session, name):
+    """Keys queued under name by flushes of the session's still uncommitted transaction"""
+    return session.info.get(_PENDING_KEY, {}).get(name, set())
+
+
+@event.listens_for(Session, 'before_flush')
+def _run_before_flush_callbacks(session, flush_context, instances):
+    for callback in _before_flush_callbacks:
+        callback(session)
+
+
+@event.listens_for(Session, 'after_flush')
+def _run_flush_callbacks(session, flush_context):
+    for callback in _flush_callbacks:
+        callback(session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_commit_callbacks(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for name, keys in sorted(pending.items(), key=lambda item: item[0] in _last_commit_callbacks):
+        _commit_callbacks[name](keys)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    # A rolled back savepoint leaves earlier flushes of the outer
+    # transaction in place, so only an outermost rollback clears the queue
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def changed_instances(session, model):
+    """(instance, state) pairs of ``model`` touched by the current flush.
+
+    state is one of 'new', 'dirty' or 'deleted'.
+    """
+    for state, instances in (('new', session.new), ('dirty', session.dirty), ('deleted', session.deleted)):
+        for instance in instances:
+            if isinstance(instance, model):
+                yield instance, state
+
+
+def attributes_changed(instance, *names):
+    """True if any of the named column attributes changed in this flush"""
+    attrs = inspect(instance).attrs
+    return any(attrs[name].history.has_changes() for name in names)
+
+
+def track_previous_values(*attributes):
+    """Load the old value of these attributes whenever they are set.
+
+    Setting an expired or unloaded attribute normally records no old value,
+    so ``previous_value`` would return the new one; callbacks that need
+    the old value of an attribute (e.g. to move a count) register it here.
+    """
+    for attribute in attributes:
+        event.listen(attribute, 'set', _keep_value, active_history=True, retval=True)
+
+
+def _keep_value(target, value, oldvalue, initiator):
+    return value
+
+
+def previous_value(instance, name):
+    """Value an attribute had before this flush (current value if unchanged)"""
+    history = inspect(instance).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(instance, name)
@@ -0,0 +1,95 @@
+from collections import Counter
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from models import Notification, NotificationCounter
+from services.cache import LRUCache
+from services.counters import increment_counter
+from services.model_hooks import (
+    on_flush, on_commit, queue_after_commit, changed_instances, attributes_changed, previous_value,
+    track_previous_values
+)
+
+counter_table = NotificationCounter.__table__
+
+track_previous_values(Notification.user_id, Notification.is_read)
+
+_count_cache = None
+
+
+def _get_count_cache():
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = LRUCache(
+            'unread_notification_counts',
+            maxsize=current_app.config.get('NOTIFICATION_COUNT_CACHE_SIZE', 10000),
+            ttl=current_app.config.get('NOTIFICATION_COUNT_CACHE_TTL', 30)
+        )
+    return _count_cache
+
+
+def unread_notification_count(user_id):
+    """Unread notifications of a user, from this worker's cache or the counter row.
+
+    Writes made through this worker drop the cached count when they
+    commit; other workers' writes show up within
+    ``NOTIFICATION_COUNT_CACHE_TTL`` seconds.
+    """
+    return _get_count_cache().get_or_set(user_id, lambda: db.session.query(NotificationCounter.unread).filter(
+        NotificationCounter.user_id == user_id
+    ).scalar() or 0)
+
+
+def adjust_unread_counts(session, deltas):
+    """Apply {user_id: change} to the unread counters in the session's transaction.
+
+    For writes that bypass the ORM (multi-row inserts, bulk updates);
+    ORM writes to Notification are counted by the flush hook.
+    """
+    connection = session.connection()
+    # Sorted, so concurrent transactions lock shared rows in the same order
+    for user_id, delta in sorted(deltas.items()):
+        if delta:
+            increment_counter(connection, counter_table, {'user_id': user_id}, 'unread', delta)
+    queue_after_commit(session, 'notification_counts', set(deltas))
+
+
+def mark_all_read(user_id):
+    """Mark every notification of a user read and zero the counter, in the current transaction"""
+    Notification.query.filter_by(user_id=user_id, is_read=False).update({'is_read': True})
+    db.session.execute(counter_table.update().where(counter_table.c.user_id == user_id).values(unread=0))
+    queue_after_commit(db.session, 'notification_counts', {user_id})
+
+
+def rebuild_notification_counts():
+    """Recount every user's unread notifications and commit"""
+    db.session.execute(counter_table.delete())
+    db.session.execute(counter_table.insert().from_select(
+        ['user_id', 'unread'],
+        db.session.query(Notification.user_id, func.count()).filter(Notification.is_read == False).group_by(
+            Notification.user_id
+        )
+    ))
+    db.session.commit()
+
+
+@on_flush
+def _count_notification_changes(session):
+    deltas = Counter()
+    for notification, state in changed_instances(session, Notification):
+        if state == 'dirty' and not attributes_changed(notification, 'is_read', 'user_id'):
+            continue
+        if state != 'new' and not previous_value(notification, 'is_read'):
+            deltas[previous_value(notification, 'user_id')] -= 1
+        if state != 'deleted' and not notification.is_read:
+            deltas[notification.user_id] += 1
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        adjust_unread_counts(session, deltas)
+
+
+@on_commit('notification_counts')
+def _drop_cached_counts(user_ids):
+    cache = _get_count_cache()
+    for user_id in user_ids:
+        cache.discard(user_id)
@@ -0,0 +1,157 @@
+import base64
+import binascii
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from flask import request, url_for
+from sqlalchemy import and_, or_, func
+from extensions import db
+
+
+class KeysetPage:
+    """One page of a listing, navigated with opaque cursors instead of page numbers.
+
+    ``total`` is only filled in when the listing asked for a count; it
+    stops at the count limit, in which case ``total_capped`` is set.
+    """
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None, total_capped=False):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.has_next = next_cursor is not None
+        self.has_prev = prev_cursor is not None
+        self.total = total
+        self.total_capped = total_capped
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'n': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'n' in value:
+            return Decimal(value['n'])
+        raise ValueError('unknown cursor value')
+    return value
+
+
+def encode_cursor(direction, values):
+    """Opaque, URL-safe cursor for the row whose sort key is values"""
+    payload = json.dumps([direction, [_encode_value(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, key_length=None):
+    """(direction, values) of a cursor, or None when it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError, binascii.Error):
+        return None
+    if direction not in ('after', 'before') or (key_length is not None and len(values) != key_length):
+        return None
+    return direction, values
+
+
+def _beyond(order_by, values, forward):
+    """Filter for rows past the key values in the listing order (before them if not forward)"""
+    clauses = []
+    for position, (expression, descending) in enumerate(order_by):
+        later = expression < values[position] if descending == forward else expression > values[position]
+        equal_prefix = [order_by[earlier][0] == values[earlier] for earlier in range(position)]
+        clauses.append(and_(*equal_prefix, later))
+    return or_(*clauses)
+
+
+def _capped_count(query, count_limit):
+    counted = db.session.query(func.count()).select_from(
+        query.order_by(None).limit(count_limit + 1).subquery()
+    ).scalar()
+    return min(counted, count_limit), counted > count_limit
+
+
+def keyset_paginate(query, order_by, cursor=None, per_page=20, count_limit=None):
+    """Fetch the page of query after (or before) a cursor without OFFSET or COUNT(*).
+
+    ``order_by`` lists (expression, descending) pairs whose last entry is
+    unique, e.g. ``[(Notification.created_at, True), (Notification.id, True)]``;
+    the expressions must not be NULL. Each page is one indexed range scan
+    reading per_page + 1 rows. Pass ``count_limit`` to also count matching
+    rows up to that many.
+    """
+    decoded = decode_cursor(cursor, len(order_by))
+    forward = decoded is None or decoded[0] == 'after'
+
+    width = len(query.column_descriptions)
+    keyed = query.add_columns(*(expression for expression, _ in order_by))
+    if decoded is not None:
+        keyed = keyed.filter(_beyond(order_by, decoded[1], forward))
+    keyed = keyed.order_by(None).order_by(*(
+        expression.desc() if descending == forward else expression.asc() for expression, descending in order_by
+    ))
+
+    rows = keyed.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+    if forward:
+        has_next, has_prev = more, decoded is not None
+    else:
+        has_next, has_prev = True, more  # we came back from a later page
+    next_cursor = encode_cursor('after', list(rows[-1][width:])) if rows and has_next else None
+    prev_cursor = encode_cursor('before', list(rows[0][width:])) if rows and has_prev else None
+
+    total, total_capped = _capped_count(query, count_limit) if count_limit is not None else (None, False)
+    return KeysetPage(items, per_page, next_cursor, prev_cursor, total, total_capped)
+
+
+def paginate_ids(ids, cursor=None, per_page=20, load=None):
+    """KeysetPage over an already ordered in-memory list of ids.
+
+    The cursor holds a position in the list; ``load`` maps the page's ids
+    to the items shown, so only that page is read from the database.
+    """
+    decoded = decode_cursor(cursor, 1)
+    start = 0
+    if decoded is not None and isinstance(decoded[1][0], int):
+        direction, (position,) = decoded
+        start = position if direction == 'after' else position - per_page
+    start = min(max(start, 0), len(ids))
+
+    page_ids = ids[start:start + per_page]
+    items = load(page_ids) if load else page_ids
+    next_cursor = encode_cursor('after', [start + per_page]) if start + per_page < len(ids) else None
+    prev_cursor = encode_cursor('before', [start]) if start > 0 else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor, len(ids))
+
+
+def cursor_url(cursor):
+    """URL of the current listing at another cursor, keeping its other query arguments"""
+    args = request.args.to_dict(flat=False)
+    args.pop('page', None)
+    args['cursor'] = cursor
+    return url_for(request.endpoint, **request.view_args, **args)
@@ -0,0 +1,121 @@
+from sqlalchemy import func, case, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import PlatformStats, User, JobPosting, JobApplication, Skill, Company, InterviewerApplication
+from services.model_hooks import (
+    on_flush, changed_instances, attributes_changed, previous_value, track_previous_values
+)
+
+STATS_ROW_ID = 1
+
+# users.user_type -> counter column
+USER_TYPE_COUNTERS = {'candidate': 'candidates', 'employer': 'employers', 'interviewer': 'interviewers'}
+
+_stats_table = PlatformStats.__table__
+
+# Updates to these move a row from one counter to another
+track_previous_values(User.user_type, JobPosting.is_active, InterviewerApplication.status)
+
+
+def _recount():
+    """Every counter, counted from the source tables"""
+    counts = dict.fromkeys(
+        ('users', 'jobs', 'active_jobs', 'applications', 'skills', 'companies', 'pending_interviewer_apps'), 0
+    )
+    counts.update(dict.fromkeys(USER_TYPE_COUNTERS.values(), 0))
+    for user_type, count in db.session.query(User.user_type, func.count(User.id)).group_by(User.user_type):
+        counts['users'] += count
+        if user_type in USER_TYPE_COUNTERS:
+            counts[USER_TYPE_COUNTERS[user_type]] = count
+
+    jobs, active_jobs = db.session.query(
+        func.count(JobPosting.id), func.sum(case((JobPosting.is_active == True, 1), else_=0))
+    ).one()
+    counts['jobs'], counts['active_jobs'] = jobs, active_jobs or 0
+    counts['applications'] = db.session.query(func.count(JobApplication.id)).scalar()
+    counts['skills'] = db.session.query(func.count(Skill.id)).scalar()
+    counts['companies'] = db.session.query(func.count(Company.id)).scalar()
+    counts['pending_interviewer_apps'] = db.session.query(func.count(InterviewerApplication.id)).filter(
+        InterviewerApplication.status == 'pending'
+    ).scalar()
+    return counts
+
+
+def rebuild_platform_stats():
+    """Recount the stats row from the source tables and commit it"""
+    counts = _recount()
+    connection = db.session.connection()
+    stored = update(_stats_table).where(_stats_table.c.id == STATS_ROW_ID).values(**counts)
+    if not connection.execute(stored).rowcount:
+        try:
+            with connection.begin_nested():
+                connection.execute(_stats_table.insert().values(id=STATS_ROW_ID, **counts))
+        except IntegrityError:
+            # Created concurrently by another request
+            connection.execute(stored)
+    db.session.commit()
+
+
+def platform_stats():
+    """The PlatformStats row, counted from scratch the first time it is read"""
+    stats = db.session.get(PlatformStats, STATS_ROW_ID)
+    if stats is None:
+        rebuild_platform_stats()
+        stats = db.session.get(PlatformStats, STATS_ROW_ID)
+    return stats
+
+
+def _user_counters(user_type):
+    return ('users', USER_TYPE_COUNTERS.get(user_type))
+
+
+def _stats_deltas(session):
+    """{counter column: change} for the rows touched by the current flush"""
+    deltas = {}
+
+    def add(columns, change):
+        for column in columns:
+            if column:
+                deltas[column] = deltas.get(column, 0) + change
+
+    for user, state in changed_instances(session, User):
+        if state == 'new':
+            add(_user_counters(user.user_type), 1)
+        elif state == 'deleted':
+            add(_user_counters(previous_value(user, 'user_type')), -1)
+        elif attributes_changed(user, 'user_type'):
+            add((USER_TYPE_COUNTERS.get(previous_value(user, 'user_type')),), -1)
+            add((USER_TYPE_COUNTERS.get(user.user_type),), 1)
+
+    for job, state in changed_instances(session, JobPosting):
+        if state == 'new':
+            add(('jobs', 'active_jobs' if job.is_active else None), 1)
+        elif state == 'deleted':
+            add(('jobs', 'active_jobs' if previous_value(job, 'is_active') else None), -1)
+        elif attributes_changed(job, 'is_active'):
+            add(('active_jobs',), (1 if job.is_active else 0) - (1 if previous_value(job, 'is_active') else 0))
+
+    for model, column in ((JobApplication, 'applications'), (Skill, 'skills'), (Company, 'companies')):
+        for _, state in changed_instances(session, model):
+            if state != 'dirty':
+                add((column,), 1 if state == 'new' else -1)
+
+    for application, state in changed_instances(session, InterviewerApplication):
+        was_pending = state != 'new' and previous_value(application, 'status') == 'pending'
+        is_pending = state != 'deleted' and application.status == 'pending'
+        add(('pending_interviewer_apps',), int(is_pending) - int(was_pending))
+
+    return {column: change for column, change in deltas.items() if change}
+
+
+@on_flush
+def _apply_stats_deltas(session):
+    # Rows removed with bulk query.delete() or raw SQL bypass this; the
+    # rebuild command puts the counters right again
+    deltas = _stats_deltas(session)
+    if deltas:
+        session.connection().execute(
+            update(_stats_table).where(_stats_table.c.id == STATS_ROW_ID).values(**{
+                column: _stats_table.c[column] + change for column, change in deltas.items()
+            })
+        )
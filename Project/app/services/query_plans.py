@@ -0,0 +1,80 @@
+from datetime import datetime
+from sqlalchemy import create_engine, select, func
+from extensions import db
+from models import (
+    Notification, JobPosting, JobApplication, JobRequiredSkill, CandidateSkill, CandidateProfile,
+    Company, InterviewParticipant, ActivityLog, ApplicationStatusHistory, InterviewerEarning,
+    InterviewerProfile, User
+)
+
+_SOME_TIME = datetime(2024, 1, 1)
+
+
+def hot_queries():
+    """(name, statement) of the listings and lookups that must stay on an index"""
+    return [
+        ('notification feed', select(Notification.id).where(Notification.user_id == 1).order_by(
+            Notification.created_at.desc(), Notification.id.desc()).limit(21)),
+        ('notification feed page 2', select(Notification.id).where(
+            Notification.user_id == 1, Notification.created_at < _SOME_TIME
+        ).order_by(Notification.created_at.desc(), Notification.id.desc()).limit(21)),
+        ('unread notifications', select(func.count()).select_from(Notification).where(
+            Notification.user_id == 1, Notification.is_read == False)),
+        ('newest jobs', select(JobPosting.id).where(JobPosting.is_active == True).order_by(
+            JobPosting.created_at.desc(), JobPosting.id.desc()).limit(13)),
+        ('company jobs', select(JobPosting.id).where(JobPosting.company_id == 1)),
+        ('candidate applications', select(JobApplication.id).where(JobApplication.candidate_id == 1).order_by(
+            JobApplication.applied_at.desc())),
+        ('job applications', select(JobApplication.id).where(JobApplication.job_id == 1).order_by(
+            JobApplication.applied_at.desc())),
+        ('jobs requiring skill', select(JobRequiredSkill.job_id).where(JobRequiredSkill.skill_id == 1)),
+        ('job required skills', select(JobRequiredSkill.skill_id).where(JobRequiredSkill.job_id == 1)),
+        ('candidate skills', select(CandidateSkill.skill_id).where(CandidateSkill.candidate_id == 1)),
+        ('candidates with skill', select(CandidateSkill.candidate_id).where(CandidateSkill.skill_id == 1)),
+        ('candidate profile of user', select(CandidateProfile.id).where(CandidateProfile.user_id == 1)),
+        ('company of user', select(Company.id).where(Company.user_id == 1)),
+        ('room participant', select(InterviewParticipant.id).where(
+            InterviewParticipant.room_id == 1, InterviewParticipant.user_id == 1)),
+        ('user interviews', select(InterviewParticipant.room_id).where(InterviewParticipant.user_id == 1)),
+        ('activity log', select(ActivityLog.id).order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc()).limit(51)),
+        ('application history', select(ApplicationStatusHistory.id).where(
+            ApplicationStatusHistory.application_id == 1).order_by(ApplicationStatusHistory.changed_at)),
+        ('interviewer earnings', select(InterviewerEarning.id).where(InterviewerEarning.interviewer_id == 1).order_by(
+            InterviewerEarning.created_at.desc(), InterviewerEarning.id.desc()).limit(21)),
+        ('newest interviewers', select(InterviewerProfile.id).order_by(
+            InterviewerProfile.created_at.desc(), InterviewerProfile.id.desc()).limit(21)),
+        ('newest users', select(User.id).order_by(User.created_at.desc(), User.id.desc()).limit(21)),
+        ('users joined today', select(func.count()).select_from(User).where(User.created_at >= _SOME_TIME)),
+        ('applications today', select(func.count()).select_from(JobApplication).where(
+            JobApplication.applied_at >= _SOME_TIME)),
+    ]
+
+
+def _problems(plan_rows):
+    """Plan steps that read a whole table or sort rows an index should have ordered"""
+    problems = []
+    for detail in plan_rows:
+        if detail.startswith('SCAN ') and ' INDEX ' not in detail:
+            problems.append(detail)
+        elif detail.startswith('USE TEMP B-TREE'):
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(engine=None):
+    """{query name: (plan, problems)} from SQLite's EXPLAIN QUERY PLAN.
+
+    Without an engine the schema is created in an in-memory SQLite
+    database, so the check only depends on the indexes the models declare.
+    """
+    if engine is None:
+        engine = create_engine('sqlite://')
+        db.metadata.create_all(engine)
+
+    results = {}
+    with engine.connect() as connection:
+        for name, statement in hot_queries():
+            compiled = statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True})
+            plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}')]
+            results[name] = (plan, _problems(plan))
+    return results
@@ -0,0 +1,79 @@
+import heapq
+from extensions import db
+from models import JobApplication, JobPosting, Company
+from services.job_matching_service import load_candidate_rows, load_job_rows, match_score_upper_bound
+from services.match_score_store import get_match_scores
+from services.skill_index import skill_index, prefilter_jobs_for_candidate
+
+# Jobs whose exact score is fetched together while walking the bound order
+EVALUATION_BATCH_SIZE = 50
+
+
+def top_job_matches(candidate_id, k=10, min_score=30, exclude_job_ids=()):
+    """Best k (job_id, score) pairs scoring above min_score, best first.
+
+    Every prefiltered job gets a cheap upper bound from its columns and
+    skill overlap counts. Jobs are then scored exactly in bound order while
+    a k-sized heap keeps the best so far, and evaluation stops as soon as
+    the next bound cannot beat the k-th best score. Ties go to the lower
+    job id.
+    """
+    candidate = load_candidate_rows([candidate_id]).get(candidate_id)
+    if not candidate or k <= 0:
+        return []
+
+    job_ids = prefilter_jobs_for_candidate(candidate_id, min_score) - set(exclude_job_ids)
+    overlap = skill_index.job_ids_for_skills(skill_index.matchable_skills(candidate_id))
+    skill_counts = skill_index.job_skill_counts(job_ids)
+
+    bounds = sorted(
+        ((match_score_upper_bound(candidate, job, overlap.get(job_id, 0), skill_counts.get(job_id)), job_id)
+         for job_id, job in load_job_rows(job_ids).items()),
+        key=lambda bound: (-bound[0], bound[1])
+    )
+
+    best = []  # min-heap of (score, -job_id): the worst kept match sits on top
+    position = 0
+    while position < len(bounds):
+        next_bound = bounds[position][0]
+        if next_bound <= min_score or (len(best) == k and next_bound < best[0][0]):
+            break
+
+        batch = [job_id for _, job_id in bounds[position:position + EVALUATION_BATCH_SIZE]]
+        position += EVALUATION_BATCH_SIZE
+        for job_id, score in get_match_scores(candidate_id, batch).items():
+            if score <= min_score:
+                continue
+            entry = (score, -job_id)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+    return [(-negative_job_id, score) for score, negative_job_id in sorted(best, reverse=True)]
+
+
+def job_recommendations(candidate_id, applied_job_ids=None):
+    """Top 10 jobs for a candidate as dicts of job, company and match_score, best first.
+
+    Jobs the candidate applied to are skipped; pass ``applied_job_ids`` when
+    the caller already loaded them.
+    """
+    if applied_job_ids is None:
+        applied_job_ids = {job_id for job_id, in db.session.query(JobApplication.job_id).filter_by(
+            candidate_id=candidate_id
+        )}
+
+    match_scores = dict(top_job_matches(candidate_id, k=10, min_score=30, exclude_job_ids=applied_job_ids))
+    if not match_scores:
+        return []
+
+    job_matches = [{
+        'job': job,
+        'company': company,
+        'match_score': match_scores[job.id]
+    } for job, company in db.session.query(JobPosting, Company).join(
+        Company, JobPosting.company_id == Company.id
+    ).filter(JobPosting.id.in_(match_scores))]
+    job_matches.sort(key=lambda match: (-match['match_score'], match['job'].id))
+    return job_matches
@@ -0,0 +1,55 @@
+from collections import namedtuple
+from extensions import db
+from models import Skill
+from services.cache_versions import VersionedCache, bump_cache_version
+from services.model_hooks import on_flush, changed_instances
+
+SkillEntry = namedtuple('SkillEntry', 'id skill_name category description')
+
+
+class SkillCatalogue:
+    """Immutable snapshot of the skills table.
+
+    ``by_name`` is ordered like ``order_by(Skill.skill_name)`` and
+    ``by_category`` like ``order_by(Skill.category, Skill.skill_name)``;
+    ``categories`` maps each category to its skills by name.
+    """
+
+    def __init__(self, entries):
+        self.by_name = sorted(entries, key=lambda skill: skill.skill_name.lower())
+        self.by_category = sorted(self.by_name, key=lambda skill: (skill.category is not None, (skill.category or '').lower()))
+        self.by_id = {skill.id: skill for skill in entries}
+        self.categories = {}
+        for skill in self.by_category:
+            self.categories.setdefault(skill.category, []).append(skill)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, skill_id):
+        """Skill with this id (None if unknown or not an id)"""
+        try:
+            return self.by_id.get(int(skill_id))
+        except (TypeError, ValueError):
+            return None
+
+
+def _load_catalogue():
+    return SkillCatalogue([SkillEntry(*row) for row in db.session.query(
+        Skill.id, Skill.skill_name, Skill.category, Skill.description
+    )])
+
+
+_catalogue = VersionedCache('skills', _load_catalogue)
+
+
+def get_skill_catalogue():
+    """Current SkillCatalogue, shared by every request of this worker"""
+    return _catalogue.get()
+
+
+@on_flush
+def _bump_catalogue_version(session):
+    # Covers admin_skills add and bulk import as well as any other writer
+    if any(True for _ in changed_instances(session, Skill)):
+        bump_cache_version(session, 'skills')
@@ -0,0 +1,266 @@
+import threading
+import time
+from collections import defaultdict, Counter
+from flask import current_app
+from sqlalchemy import or_
+from extensions import db
+from models import CandidateProfile, JobPosting, JobRequiredSkill, CandidateSkill
+from services.model_hooks import on_flush, on_commit, queue_after_commit, changed_instances, attributes_changed, previous_value
+from services.job_matching_service import EXPERIENCE_TIER_FACTORS, experience_tier_needed
+from services.skill_similarity import skill_similarity
+
+
+class SkillIndex:
+    """Per-worker inverted index from skill id to active job ids and candidate ids.
+
+    The index is built lazily, patched for ids that this worker changed
+    (refreshed on the next lookup, after the write committed) and fully
+    rebuilt every ``SKILL_INDEX_TTL`` seconds to pick up writes from other
+    workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._stale_jobs = set()
+        self._stale_candidates = set()
+        self._jobs_by_skill = defaultdict(set)
+        self._skills_by_job = {}  # active jobs only
+        self._candidates_by_skill = defaultdict(set)
+        self._skills_by_candidate = {}
+
+    # --- maintenance ---
+
+    def rebuild(self):
+        """Reload the whole index from the database"""
+        jobs_by_skill = defaultdict(set)
+        skills_by_job = {job_id: set() for job_id, in db.session.query(JobPosting.id).filter(JobPosting.is_active == True)}
+        for job_id, skill_id in db.session.query(JobRequiredSkill.job_id, JobRequiredSkill.skill_id).join(
+            JobPosting, JobRequiredSkill.job_id == JobPosting.id
+        ).filter(JobPosting.is_active == True):
+            skills_by_job[job_id].add(skill_id)
+            jobs_by_skill[skill_id].add(job_id)
+
+        candidates_by_skill = defaultdict(set)
+        skills_by_candidate = defaultdict(set)
+        for candidate_id, skill_id in db.session.query(CandidateSkill.candidate_id, CandidateSkill.skill_id):
+            skills_by_candidate[candidate_id].add(skill_id)
+            candidates_by_skill[skill_id].add(candidate_id)
+
+        with self._lock:
+            self._jobs_by_skill = jobs_by_skill
+            self._skills_by_job = skills_by_job
+            self._candidates_by_skill = candidates_by_skill
+            self._skills_by_candidate = dict(skills_by_candidate)
+            self._stale_jobs.clear()
+            self._stale_candidates.clear()
+            self._built_at = time.monotonic()
+
+    def mark_stale(self, job_ids=(), candidate_ids=()):
+        """Queue ids to be re-read from the database before the next lookup"""
+        with self._lock:
+            self._stale_jobs.update(job_ids)
+            self._stale_candidates.update(candidate_ids)
+
+    def _refresh_jobs(self, job_ids):
+        active = {job_id for job_id, in db.session.query(JobPosting.id).filter(
+            JobPosting.id.in_(job_ids), JobPosting.is_active == True
+        )}
+        skills = defaultdict(set)
+        if active:
+            for job_id, skill_id in db.session.query(JobRequiredSkill.job_id, JobRequiredSkill.skill_id).filter(
+                JobRequiredSkill.job_id.in_(active)
+            ):
+                skills[job_id].add(skill_id)
+
+        with self._lock:
+            for job_id in job_ids:
+                for skill_id in self._skills_by_job.pop(job_id, ()):
+                    self._jobs_by_skill[skill_id].discard(job_id)
+            for job_id in active:
+                self._skills_by_job[job_id] = skills[job_id]
+                for skill_id in skills[job_id]:
+                    self._jobs_by_skill[skill_id].add(job_id)
+
+    def _refresh_candidates(self, candidate_ids):
+        skills = defaultdict(set)
+        for candidate_id, skill_id in db.session.query(CandidateSkill.candidate_id, CandidateSkill.skill_id).filter(
+            CandidateSkill.candidate_id.in_(candidate_ids)
+        ):
+            skills[candidate_id].add(skill_id)
+
+        with self._lock:
+            for candidate_id in candidate_ids:
+                for skill_id in self._skills_by_candidate.pop(candidate_id, ()):
+                    self._candidates_by_skill[skill_id].discard(candidate_id)
+                if skills[candidate_id]:
+                    self._skills_by_candidate[candidate_id] = skills[candidate_id]
+                    for skill_id in skills[candidate_id]:
+                        self._candidates_by_skill[skill_id].add(candidate_id)
+
+    def _ensure_current(self):
+        ttl = current_app.config.get('SKILL_INDEX_TTL', 300)
+        if self._built_at is None or time.monotonic() - self._built_at > ttl:
+            self.rebuild()
+            return
+
+        with self._lock:
+            stale_jobs, self._stale_jobs = self._stale_jobs, set()
+            stale_candidates, self._stale_candidates = self._stale_candidates, set()
+        if stale_jobs:
+            self._refresh_jobs(stale_jobs)
+        if stale_candidates:
+            self._refresh_candidates(stale_candidates)
+
+    # --- lookups ---
+
+    def active_job_ids(self):
+        """Ids of all active jobs"""
+        self._ensure_current()
+        with self._lock:
+            return set(self._skills_by_job)
+
+    def jobs_without_skills(self):
+        """Ids of active jobs that list no required skills"""
+        self._ensure_current()
+        with self._lock:
+            return {job_id for job_id, skills in self._skills_by_job.items() if not skills}
+
+    def job_skills(self, job_id):
+        """Required skill ids of an active job (empty for inactive jobs)"""
+        self._ensure_current()
+        with self._lock:
+            return set(self._skills_by_job.get(job_id, ()))
+
+    def job_skill_counts(self, job_ids):
+        """Number of required skills per job; jobs not in the index are left out"""
+        self._ensure_current()
+        with self._lock:
+            return {job_id: len(self._skills_by_job[job_id]) for job_id in job_ids if job_id in self._skills_by_job}
+
+    def candidate_skills(self, candidate_id):
+        """Skill ids of a candidate"""
+        self._ensure_current()
+        with self._lock:
+            return set(self._skills_by_candidate.get(candidate_id, ()))
+
+    def job_ids_for_skills(self, skill_ids):
+        """Active jobs requiring at least one of the skills, with the overlap count"""
+        self._ensure_current()
+        overlap = Counter()
+        with self._lock:
+            for skill_id in skill_ids:
+                overlap.update(self._jobs_by_skill.get(skill_id, ()))
+        return overlap
+
+    def candidate_ids_for_skills(self, skill_ids):
+        """Candidates having at least one of the skills, with the overlap count"""
+        return self.weighted_candidate_overlap({skill_id: 1 for skill_id in skill_ids})
+
+    def weighted_candidate_overlap(self, skill_weights):
+        """Sum of skill_weights over each candidate's matching skills.
+
+        Candidates sharing none of the skills are left out.
+        """
+        self._ensure_current()
+        overlap = Counter()
+        with self._lock:
+            for skill_id, weight in skill_weights.items():
+                for candidate_id in self._candidates_by_skill.get(skill_id, ()):
+                    overlap[candidate_id] += weight
+        return overlap
+
+    def weighted_candidate_credit(self, skill_weights, neighbor_credits):
+        """Skill credit of every candidate earning any, in percent of a weight.
+
+        Mirrors skill_points: each required skill adds its weight times 100
+        for candidates having it, or times the best credit among its
+        ``neighbor_credits`` ({skill_id: {similar_skill_id: percent}}) the
+        candidate has.
+        """
+        self._ensure_current()
+        credit = Counter()
+        with self._lock:
+            for skill_id, weight in skill_weights.items():
+                best = {}
+                for similar_skill_id, percent in neighbor_credits.get(skill_id, {}).items():
+                    for candidate_id in self._candidates_by_skill.get(similar_skill_id, ()):
+                        if percent > best.get(candidate_id, 0):
+                            best[candidate_id] = percent
+                for candidate_id in self._candidates_by_skill.get(skill_id, ()):
+                    best[candidate_id] = 100
+                for candidate_id, percent in best.items():
+                    credit[candidate_id] += weight * percent
+        return credit
+
+    def matchable_skills(self, candidate_id):
+        """Skills a candidate earns full or partial credit for"""
+        skill_ids = self.candidate_skills(candidate_id)
+        return skill_ids | skill_similarity.related_skills(skill_ids)
+
+
+skill_index = SkillIndex()
+
+
+@on_flush
+def _queue_index_changes(session):
+    job_ids = set()
+    candidate_ids = set()
+    for skill, state in changed_instances(session, CandidateSkill):
+        candidate_ids.update((skill.candidate_id, previous_value(skill, 'candidate_id')))
+    for skill, state in changed_instances(session, JobRequiredSkill):
+        job_ids.update((skill.job_id, previous_value(skill, 'job_id')))
+    for job, state in changed_instances(session, JobPosting):
+        if state != 'dirty' or attributes_changed(job, 'is_active'):
+            job_ids.add(job.id)
+
+    queue_after_commit(session, 'skill_index', {('job', job_id) for job_id in job_ids if job_id is not None})
+    queue_after_commit(session, 'skill_index', {('candidate', candidate_id) for candidate_id in candidate_ids if candidate_id is not None})
+
+
+@on_commit('skill_index')
+def _mark_index_stale(keys):
+    skill_index.mark_stale(
+        job_ids=[key_id for kind, key_id in keys if kind == 'job'],
+        candidate_ids=[key_id for kind, key_id in keys if kind == 'candidate']
+    )
+
+
+# --- CANDIDATE GENERATION ---
+
+def _experience_tier_filter(experience_column, years, tier):
+    """SQL filter on a job's required experience for a candidate to reach tier points.
+
+    Mirrors experience_points: 30 needs years >= required, 20 needs
+    years >= 0.7 * required and 10 needs years >= 0.5 * required.
+    """
+    return or_(experience_column == None, experience_column * EXPERIENCE_TIER_FACTORS[tier] <= years)
+
+
+def prefilter_jobs_for_candidate(candidate_id, min_score):
+    """Active job ids that can still score above min_score for a candidate.
+
+    Jobs requiring a skill the candidate has (or a similar one) and jobs
+    with no required skills are always kept. Other jobs earn no skill points, so
+    they are only kept if experience, location and salary alone can beat
+    min_score, which is checked in SQL against their required experience.
+    """
+    candidate = db.session.query(
+        CandidateProfile.experience_years, CandidateProfile.location_id, CandidateProfile.salary_expectation
+    ).filter(CandidateProfile.id == candidate_id).first()
+    if not candidate:
+        return set()
+
+    job_ids = set(skill_index.job_ids_for_skills(skill_index.matchable_skills(candidate_id)))
+    job_ids |= skill_index.jobs_without_skills()
+
+    other_points = (10 if candidate.location_id else 0) + (10 if candidate.salary_expectation else 0)
+    tier = experience_tier_needed(min_score + 1 - other_points)
+    if tier is None:
+        return job_ids
+
+    query = db.session.query(JobPosting.id).filter(JobPosting.is_active == True)
+    if tier:
+        query = query.filter(_experience_tier_filter(JobPosting.experience_required, candidate.experience_years or 0, tier))
+    job_ids.update(job_id for job_id, in query)
+    return job_ids
@@ -0,0 +1,342 @@
+import math
+import threading
+import time
+from collections import defaultdict, Counter
+from flask import current_app
+from sqlalchemy import select, func, or_, union_all, bindparam
+from extensions import db
+from models import (
+    CandidateSkill, JobRequiredSkill, SkillCooccurrence, SkillCooccurrenceDelta, SkillSimilarity,
+    CandidateJobScore
+)
+from services.model_hooks import on_flush, changed_instances, previous_value
+
+# Neighbours kept per skill, and the weakest link worth keeping
+SIMILARITY_NEIGHBORS = 10
+MIN_SIMILARITY = 0.2
+# Pairs seen together fewer times than this are treated as noise
+MIN_COOCCURRENCE = 3
+
+BUILD_CHUNK_SIZE = 500
+
+cooccurrence_table = SkillCooccurrence.__table__
+delta_table = SkillCooccurrenceDelta.__table__
+similarity_table = SkillSimilarity.__table__
+
+
+class SkillSimilarityMatrix:
+    """Per-worker copy of the sparse skill similarity matrix.
+
+    Holds, for every skill, the credit (in percent of its weight) that each
+    similar skill earns towards it: similarity times ``SKILL_PARTIAL_CREDIT``.
+    Loaded once and reloaded every ``SKILL_SIMILARITY_TTL`` seconds, which
+    is how workers pick up the nightly build.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._credits = {}  # skill id -> {similar skill id: credit percent}
+        self._credited_by = {}  # similar skill id -> skill ids it earns credit towards
+
+    def load(self):
+        partial_credit = current_app.config.get('SKILL_PARTIAL_CREDIT', 0.5)
+        credits = defaultdict(dict)
+        credited_by = defaultdict(set)
+        for skill_id, similar_skill_id, similarity in db.session.query(
+            SkillSimilarity.skill_id, SkillSimilarity.similar_skill_id, SkillSimilarity.similarity
+        ):
+            credit = int(similarity * partial_credit * 100)
+            if credit > 0:
+                credits[skill_id][similar_skill_id] = min(credit, 100)
+                credited_by[similar_skill_id].add(skill_id)
+
+        with self._lock:
+            previous, first_load = self._credits, self._loaded_at is None
+            self._credits = dict(credits)
+            self._credited_by = dict(credited_by)
+            self._loaded_at = time.monotonic()
+
+        # Scores this worker stored with the old neighbours are stale now. Every
+        # worker does this on reload, so once all have reloaded no score
+        # computed from an old matrix survives.
+        if not first_load:
+            changed = {skill_id for skill_id in set(previous) | set(credits) if previous.get(skill_id) != credits.get(skill_id)}
+            if changed:
+                with db.engine.begin() as connection:
+                    drop_scores_for_skills(connection, changed)
+
+    def _ensure_loaded(self):
+        ttl = current_app.config.get('SKILL_SIMILARITY_TTL', 600)
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > ttl:
+            self.load()
+
+    def credit(self, skill_id, candidate_skill_ids):
+        """Percent of a required skill's weight earned by a set of candidate skills"""
+        if skill_id in candidate_skill_ids:
+            return 100
+        self._ensure_loaded()
+        with self._lock:
+            similar = self._credits.get(skill_id)
+        if not similar:
+            return 0
+        return max((credit for similar_skill_id, credit in similar.items() if similar_skill_id in candidate_skill_ids), default=0)
+
+    def neighbor_credits(self, skill_ids):
+        """{skill_id: {similar_skill_id: credit percent}} for the given skills"""
+        self._ensure_loaded()
+        with self._lock:
+            return {skill_id: dict(self._credits[skill_id]) for skill_id in skill_ids if skill_id in self._credits}
+
+    def related_skills(self, skill_ids):
+        """Skills that the given skills earn partial credit towards"""
+        self._ensure_loaded()
+        related = set()
+        with self._lock:
+            for skill_id in skill_ids:
+                related.update(self._credited_by.get(skill_id, ()))
+        return related
+
+
+skill_similarity = SkillSimilarityMatrix()
+
+
+def drop_scores_for_skills(connection, skill_ids):
+    """Delete stored scores of jobs requiring any of the skills"""
+    score_table = CandidateJobScore.__table__
+    skill_ids = sorted(skill_ids)
+    for start in range(0, len(skill_ids), BUILD_CHUNK_SIZE):
+        connection.execute(score_table.delete().where(score_table.c.job_id.in_(
+            select(JobRequiredSkill.job_id).where(JobRequiredSkill.skill_id.in_(skill_ids[start:start + BUILD_CHUNK_SIZE]))
+        )))
+
+
+# --- CO-OCCURRENCE DELTAS ---
+
+def _pairs(skill_ids, touching):
+    """Unordered skill pairs (diagonal included) of one document involving a skill in touching"""
+    return {
+        (min(skill_id, other), max(skill_id, other))
+        for skill_id in skill_ids & touching
+        for other in skill_ids
+    }
+
+
+@on_flush
+def _log_cooccurrence_changes(session):
+    """Queue count changes for candidates and jobs whose skill lists changed in this flush"""
+    # (kind, owner id) -> rows per skill id added by this flush (negative if removed)
+    changes = defaultdict(Counter)
+    for model, kind, owner in ((CandidateSkill, 'candidate', 'candidate_id'), (JobRequiredSkill, 'job', 'job_id')):
+        for skill, state in changed_instances(session, model):
+            old = None if state == 'new' else (previous_value(skill, owner), previous_value(skill, 'skill_id'))
+            new = None if state == 'deleted' else (getattr(skill, owner), skill.skill_id)
+            if old == new:
+                continue
+            if old and None not in old:
+                changes[(kind, old[0])][old[1]] -= 1
+            if new and None not in new:
+                changes[(kind, new[0])][new[1]] += 1
+    if not changes:
+        return
+
+    # Owners can list a skill more than once, so rows are counted per skill
+    connection = session.connection()
+    current = defaultdict(Counter)
+    for model, kind, owner_column in (
+        (CandidateSkill, 'candidate', CandidateSkill.candidate_id),
+        (JobRequiredSkill, 'job', JobRequiredSkill.job_id)
+    ):
+        owner_ids = [owner_id for change_kind, owner_id in changes if change_kind == kind]
+        if owner_ids:
+            for owner_id, skill_id in connection.execute(
+                select(owner_column, model.skill_id).where(owner_column.in_(owner_ids))
+            ):
+                current[(kind, owner_id)][skill_id] += 1
+
+    deltas = Counter()
+    for key, changed_rows in changes.items():
+        rows_after = current[key]
+        after = set(rows_after)
+        before = {
+            skill_id for skill_id in set(rows_after) | set(changed_rows)
+            if rows_after[skill_id] - changed_rows[skill_id] > 0
+        }
+        touching = after ^ before
+        if not touching:
+            continue
+        new_pairs, old_pairs = _pairs(after, touching), _pairs(before, touching)
+        deltas.update(new_pairs - old_pairs)
+        deltas.subtract(old_pairs - new_pairs)
+
+    rows = [
+        {'skill_id': skill_id, 'other_skill_id': other_skill_id, 'delta': delta}
+        for (skill_id, other_skill_id), delta in deltas.items() if delta
+    ]
+    if rows:
+        connection.execute(delta_table.insert(), rows)
+
+
+# --- BUILD ---
+
+def _document_pairs(table, owner_column):
+    first, second = table.alias(), table.alias()
+    return select(
+        first.c.skill_id.label('skill_id'),
+        second.c.skill_id.label('other_skill_id'),
+        func.count(func.distinct(first.c[owner_column])).label('count')
+    ).where(
+        first.c[owner_column] == second.c[owner_column],
+        first.c.skill_id <= second.c.skill_id
+    ).group_by(first.c.skill_id, second.c.skill_id)
+
+
+def rebuild_cooccurrences():
+    """Recount every pair from scratch in SQL, replacing counts and pending deltas"""
+    max_delta_id = db.session.query(func.max(SkillCooccurrenceDelta.id)).scalar()
+    if max_delta_id is not None:
+        db.session.execute(delta_table.delete().where(delta_table.c.id <= max_delta_id))
+    db.session.execute(cooccurrence_table.delete())
+
+    pairs = union_all(
+        _document_pairs(CandidateSkill.__table__, 'candidate_id'),
+        _document_pairs(JobRequiredSkill.__table__, 'job_id')
+    ).subquery()
+    db.session.execute(cooccurrence_table.insert().from_select(
+        ['skill_id', 'other_skill_id', 'count'],
+        select(pairs.c.skill_id, pairs.c.other_skill_id, func.sum(pairs.c.count)).group_by(
+            pairs.c.skill_id, pairs.c.other_skill_id
+        )
+    ))
+
+
+def apply_cooccurrence_deltas():
+    """Fold pending deltas into the counts; returns the skill ids whose counts changed"""
+    max_delta_id = db.session.query(func.max(SkillCooccurrenceDelta.id)).scalar()
+    if max_delta_id is None:
+        return set()
+
+    deltas = {
+        (skill_id, other_skill_id): delta
+        for skill_id, other_skill_id, delta in db.session.query(
+            SkillCooccurrenceDelta.skill_id, SkillCooccurrenceDelta.other_skill_id, func.sum(SkillCooccurrenceDelta.delta)
+        ).filter(SkillCooccurrenceDelta.id <= max_delta_id).group_by(
+            SkillCooccurrenceDelta.skill_id, SkillCooccurrenceDelta.other_skill_id
+        ) if delta
+    }
+    db.session.execute(delta_table.delete().where(delta_table.c.id <= max_delta_id))
+
+    skill_ids = sorted({skill_id for skill_id, _ in deltas})
+    existing = {}
+    for start in range(0, len(skill_ids), BUILD_CHUNK_SIZE):
+        for skill_id, other_skill_id, count in db.session.query(
+            SkillCooccurrence.skill_id, SkillCooccurrence.other_skill_id, SkillCooccurrence.count
+        ).filter(SkillCooccurrence.skill_id.in_(skill_ids[start:start + BUILD_CHUNK_SIZE])):
+            if (skill_id, other_skill_id) in deltas:
+                existing[(skill_id, other_skill_id)] = count
+
+    inserts, updates, deletes = [], [], []
+    for (skill_id, other_skill_id), delta in deltas.items():
+        count = existing.get((skill_id, other_skill_id), 0) + delta
+        row = {'b_skill_id': skill_id, 'b_other_skill_id': other_skill_id, 'b_count': count}
+        if count <= 0:
+            if (skill_id, other_skill_id) in existing:
+                deletes.append(row)
+        elif (skill_id, other_skill_id) in existing:
+            updates.append(row)
+        else:
+            inserts.append({'skill_id': skill_id, 'other_skill_id': other_skill_id, 'count': count})
+
+    matches_pair = (
+        (cooccurrence_table.c.skill_id == bindparam('b_skill_id'))
+        & (cooccurrence_table.c.other_skill_id == bindparam('b_other_skill_id'))
+    )
+    if updates:
+        db.session.execute(cooccurrence_table.update().where(matches_pair).values(count=bindparam('b_count')), updates)
+    if deletes:
+        db.session.execute(cooccurrence_table.delete().where(matches_pair), deletes)
+    if inserts:
+        db.session.execute(cooccurrence_table.insert(), inserts)
+
+    return {skill_id for pair in deltas for skill_id in pair}
+
+
+def rebuild_similarities(skill_ids=None):
+    """Recompute neighbour lists for skill_ids (all skills if None).
+
+    Similarity is the cosine of co-occurrence: together / sqrt(a * b).
+    Since every neighbour of a changed skill sees a new similarity to it,
+    their lists are refreshed too. Returns the skill ids refreshed.
+    """
+    frequency = {
+        skill_id: count for skill_id, count in db.session.query(
+            SkillCooccurrence.skill_id, SkillCooccurrence.count
+        ).filter(SkillCooccurrence.skill_id == SkillCooccurrence.other_skill_id)
+    }
+
+    if skill_ids is None:
+        targets = set(frequency)
+        db.session.execute(similarity_table.delete())
+    else:
+        targets = set(skill_ids)
+        changed = sorted(skill_ids)
+        for start in range(0, len(changed), BUILD_CHUNK_SIZE):
+            chunk = changed[start:start + BUILD_CHUNK_SIZE]
+            for skill_id, other_skill_id in db.session.query(
+                SkillCooccurrence.skill_id, SkillCooccurrence.other_skill_id
+            ).filter(or_(SkillCooccurrence.skill_id.in_(chunk), SkillCooccurrence.other_skill_id.in_(chunk))):
+                targets.update((skill_id, other_skill_id))
+
+    ordered = sorted(targets)
+    for start in range(0, len(ordered), BUILD_CHUNK_SIZE):
+        chunk = ordered[start:start + BUILD_CHUNK_SIZE]
+        chunk_set = set(chunk)
+        neighbors = defaultdict(list)
+        for skill_id, other_skill_id, count in db.session.query(
+            SkillCooccurrence.skill_id, SkillCooccurrence.other_skill_id, SkillCooccurrence.count
+        ).filter(
+            or_(SkillCooccurrence.skill_id.in_(chunk), SkillCooccurrence.other_skill_id.in_(chunk)),
+            SkillCooccurrence.skill_id != SkillCooccurrence.other_skill_id,
+            SkillCooccurrence.count >= MIN_COOCCURRENCE
+        ):
+            if not frequency.get(skill_id) or not frequency.get(other_skill_id):
+                continue
+            similarity = count / math.sqrt(frequency[skill_id] * frequency[other_skill_id])
+            if similarity < MIN_SIMILARITY:
+                continue
+            if skill_id in chunk_set:
+                neighbors[skill_id].append((similarity, other_skill_id))
+            if other_skill_id in chunk_set:
+                neighbors[other_skill_id].append((similarity, skill_id))
+
+        if skill_ids is not None:
+            db.session.execute(similarity_table.delete().where(similarity_table.c.skill_id.in_(chunk)))
+        rows = [
+            {'skill_id': skill_id, 'similar_skill_id': similar_skill_id, 'similarity': round(min(similarity, 1.0), 4)}
+            for skill_id, scored in neighbors.items()
+            for similarity, similar_skill_id in sorted(scored, key=lambda item: (-item[0], item[1]))[:SIMILARITY_NEIGHBORS]
+        ]
+        if rows:
+            db.session.execute(similarity_table.insert(), rows)
+
+        # Stored scores of jobs requiring these skills used the old neighbours
+        drop_scores_for_skills(db.session, chunk)
+
+    return targets
+
+
+def build_skill_similarity(full=False):
+    """Nightly build: update co-occurrence counts and the neighbour lists they affect.
+
+    The incremental build only folds in the deltas logged since the last
+    run and refreshes the skills they touch; ``full`` recounts everything
+    in SQL. Returns the number of skills refreshed.
+    """
+    if full:
+        rebuild_cooccurrences()
+        refreshed = rebuild_similarities()
+    else:
+        changed = apply_cooccurrence_deltas()
+        refreshed = rebuild_similarities(changed) if changed else set()
+    db.session.commit()
+    return len(refreshed)
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from flask import g, request, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements that differ only in literals or IN (...) list length share a shape
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s|:\w+|__\[POSTCOMPILE_\w+\])(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+_THIS_FILE = os.path.abspath(__file__)
+
+# Longest statement text written to the log line
+LOGGED_STATEMENT_LENGTH = 300
+
+
+def statement_shape(statement):
+    """Statement with whitespace collapsed and literals and parameter lists replaced by ?"""
+    shape = _SPACE.sub(' ', statement).strip()
+    shape = _STRING.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    return _IN_LIST.sub('(?)', shape)
+
+
+def _logged(shape):
+    return shape if len(shape) <= LOGGED_STATEMENT_LENGTH else shape[:LOGGED_STATEMENT_LENGTH] + '...'
+
+
+class RequestSQLStats:
+    """Queries one request ran: count, time and where each statement shape came from"""
+
+    def __init__(self, root_path):
+        self.root_path = root_path
+        self.count = 0
+        self.total = 0.0
+        self.statements = []
+        self.shapes = Counter()
+        self.call_sites = {}
+
+    def call_site(self):
+        """file:line of the innermost application frame outside this module"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if (filename.startswith(self.root_path) and filename != _THIS_FILE
+                    and 'site-packages' not in filename):
+                return f'{os.path.relpath(filename, self.root_path)}:{frame.f_lineno}'
+            frame = frame.f_back
+        return None
+
+    def record(self, statement, duration, call_site):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.total += duration
+        self.statements.append((duration, shape, call_site))
+        self.shapes[shape] += 1
+        self.call_sites.setdefault(shape, Counter())[call_site] += 1
+
+    def slowest(self, limit):
+        return sorted(self.statements, key=lambda item: item[0], reverse=True)[:limit]
+
+    def repeated(self, threshold):
+        """(shape, times, most frequent call site) of statements run at least threshold times"""
+        return [
+            (shape, times, self.call_sites[shape].most_common(1)[0][0])
+            for shape, times in self.shapes.most_common() if times >= threshold
+        ]
+
+
+def _stats():
+    if not has_app_context():
+        return None
+    return g.get('sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _stats()
+    if stats is not None:
+        conn.info.setdefault('sql_stats_started', []).append((time.perf_counter(), stats.call_site()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _stats()
+    started = conn.info.get('sql_stats_started')
+    if stats is not None and started:
+        start, call_site = started.pop()
+        stats.record(statement, time.perf_counter() - start, call_site)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    started = connection.info.get('sql_stats_started') if connection is not None else None
+    if started:
+        started.pop()
+
+
+def _start_request():
+    rate = current_app.config.get('SQL_INSTRUMENTATION_SAMPLE_RATE', 0)
+    if rate and random.random() < rate:
+        g.sql_stats = RequestSQLStats(current_app.root_path + os.sep)
+
+
+def _finish_request(response):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+
+    config = current_app.config
+    total_ms = round(stats.total * 1000, 2)
+    repeated = stats.repeated(config.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    if config.get('SQL_INSTRUMENTATION_HEADERS', False):
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = str(total_ms)
+        response.headers.add('Server-Timing', f'db;dur={total_ms};desc="{stats.count} queries"')
+
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'queries': stats.count,
+        'db_ms': total_ms,
+        'slowest': [
+            {'ms': round(duration * 1000, 2), 'statement': _logged(shape), 'call_site': call_site}
+            for duration, shape, call_site in stats.slowest(config.get('SQL_SLOWEST_STATEMENTS', 3))
+        ],
+        'repeated': [
+            {'times': times, 'statement': _logged(shape), 'call_site': call_site}
+            for shape, times, call_site in repeated
+        ],
+    }
+    # Requests with an N+1 pattern are logged as warnings so they show up
+    # without turning on info logging
+    current_app.logger.log(logging.WARNING if repeated else logging.INFO, 'sql %s', json.dumps(record, default=str))
+    return response
+
+
+def init_sql_instrumentation(app):
+    """Count queries, DB time and repeated statements of a sample of requests.
+
+    SQL_INSTRUMENTATION_SAMPLE_RATE is the share of requests measured (0
+    turns it off). Each measured request gets a structured 'sql' log line
+    with the slowest statements and every statement shape run at least
+    SQL_N_PLUS_ONE_THRESHOLD times, with the call site it was run from; with
+    SQL_INSTRUMENTATION_HEADERS the count and time go in response headers too.
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,152 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from extensions import db
+from models import User, JobApplication, DailyRollup, HourlyRollup
+from services.counters import increment_counter
+from services.model_hooks import on_flush, changed_instances, attributes_changed, previous_value, track_previous_values
+
+daily_table = DailyRollup.__table__
+hourly_table = HourlyRollup.__table__
+
+# metric -> (model, timestamp column, dimension column or None)
+METRICS = {
+    'signups': (User, 'created_at', 'user_type'),
+    'applications': (JobApplication, 'applied_at', None),
+}
+
+# Rows per round trip when backfilling from history
+BACKFILL_CHUNK_SIZE = 5000
+
+for _model, _time_field, _dimension_field in METRICS.values():
+    track_previous_values(*(getattr(_model, name) for name in (_time_field, _dimension_field) if name))
+
+
+def _hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _midnight(day):
+    return datetime(day.year, day.month, day.day)
+
+
+def _event(instance, time_field, dimension_field, read):
+    """(timestamp, dimension) of an instance, read with read(instance, name)"""
+    return read(instance, time_field), (read(instance, dimension_field) or '') if dimension_field else ''
+
+
+def _metric_changes(session):
+    """Counter of (metric, timestamp, dimension) -> change for the current flush"""
+    changes = Counter()
+    for metric, (model, time_field, dimension_field) in METRICS.items():
+        fields = [name for name in (time_field, dimension_field) if name]
+        for instance, state in changed_instances(session, model):
+            current = _event(instance, time_field, dimension_field, getattr)
+            previous = _event(instance, time_field, dimension_field, previous_value)
+            if state == 'new':
+                changes[(metric,) + current] += 1
+            elif state == 'deleted':
+                changes[(metric,) + previous] -= 1
+            elif attributes_changed(instance, *fields):
+                changes[(metric,) + previous] -= 1
+                changes[(metric,) + current] += 1
+    return changes
+
+
+def _apply(connection, changes):
+    """Add (metric, timestamp, dimension) -> change counts to the daily and hourly rollups"""
+    by_day, by_hour = defaultdict(int), defaultdict(int)
+    for (metric, moment, dimension), delta in changes.items():
+        if moment is not None and delta:
+            by_day[(metric, moment.date(), dimension)] += delta
+            by_hour[(metric, _hour(moment), dimension)] += delta
+
+    # Sorted, so concurrent transactions lock shared rows in the same order
+    for (metric, day, dimension), delta in sorted(by_day.items()):
+        if delta:
+            increment_counter(connection, daily_table, {'metric': metric, 'day': day, 'dimension': dimension}, 'count', delta)
+    for (metric, hour, dimension), delta in sorted(by_hour.items()):
+        if delta:
+            increment_counter(connection, hourly_table, {'metric': metric, 'hour': hour, 'dimension': dimension}, 'count', delta)
+
+
+@on_flush
+def _update_time_series(session):
+    changes = _metric_changes(session)
+    if changes:
+        _apply(session.connection(), changes)
+
+
+def backfill_time_series(chunk_size=BACKFILL_CHUNK_SIZE, progress=None):
+    """Rebuild the rollups of every metric from history, committing one chunk of rows at a time.
+
+    Rows are read in primary key order up to the highest id present at the
+    start; rows inserted later are counted by the flush hook. Calls
+    progress(metric, rows counted so far) after each chunk.
+    """
+    for metric, (model, time_field, dimension_field) in METRICS.items():
+        db.session.execute(daily_table.delete().where(daily_table.c.metric == metric))
+        db.session.execute(hourly_table.delete().where(hourly_table.c.metric == metric))
+        last_id = db.session.query(func.max(model.id)).scalar() or 0
+        db.session.commit()
+
+        columns = [model.id, getattr(model, time_field)]
+        if dimension_field:
+            columns.append(getattr(model, dimension_field))
+        after_id, counted = 0, 0
+        while after_id < last_id:
+            rows = db.session.query(*columns).filter(model.id > after_id, model.id <= last_id).order_by(
+                model.id).limit(chunk_size).all()
+            if not rows:
+                break
+            changes = Counter((metric, row[1], (row[2] or '') if dimension_field else '') for row in rows)
+            _apply(db.session.connection(), changes)
+            db.session.commit()
+            after_id, counted = rows[-1][0], counted + len(rows)
+            if progress:
+                progress(metric, counted)
+
+
+def daily_series(metric, start_day, end_day, by_dimension=False):
+    """(date, [dimension,] count) rows of a metric for each day from start_day to end_day inclusive"""
+    day = DailyRollup.day.label('date')
+    filters = (DailyRollup.metric == metric, DailyRollup.day >= start_day, DailyRollup.day <= end_day,
+               DailyRollup.count != 0)
+    if by_dimension:
+        return db.session.query(day, DailyRollup.dimension, DailyRollup.count.label('count')).filter(*filters).order_by(
+            DailyRollup.day, DailyRollup.dimension).all()
+    return db.session.query(day, func.sum(DailyRollup.count).label('count')).filter(*filters).group_by(
+        DailyRollup.day).order_by(DailyRollup.day).all()
+
+
+def hourly_series(metric, start, end, by_dimension=False):
+    """(hour, [dimension,] count) rows of a metric for the hours overlapping start up to end"""
+    hour = HourlyRollup.hour.label('hour')
+    filters = (HourlyRollup.metric == metric, HourlyRollup.hour >= _hour(start), HourlyRollup.hour < end,
+               HourlyRollup.count != 0)
+    if by_dimension:
+        return db.session.query(hour, HourlyRollup.dimension, HourlyRollup.count.label('count')).filter(*filters).order_by(
+            HourlyRollup.hour, HourlyRollup.dimension).all()
+    return db.session.query(hour, func.sum(HourlyRollup.count).label('count')).filter(*filters).group_by(
+        HourlyRollup.hour).order_by(HourlyRollup.hour).all()
+
+
+def total_between(metric, start, end):
+    """Events of a metric from start up to end, to the hour.
+
+    Whole days in the range are read from the daily rollup and the ragged
+    ends from the hourly one.
+    """
+    first_day = start.date() if start == _midnight(start.date()) else start.date() + timedelta(days=1)
+    end_day = end.date()
+    if first_day >= end_day:
+        return sum(count for _, count in hourly_series(metric, start, end))
+
+    total = db.session.query(func.coalesce(func.sum(DailyRollup.count), 0)).filter(
+        DailyRollup.metric == metric, DailyRollup.day >= first_day, DailyRollup.day < end_day
+    ).scalar()
+    if start < _midnight(first_day):
+        total += sum(count for _, count in hourly_series(metric, start, _midnight(first_day)))
+    if _midnight(end_day) < end:
+        total += sum(count for _, count in hourly_series(metric, _midnight(end_day), end))
+    return total
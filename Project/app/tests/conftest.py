@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App on a file database, so each worker thread gets its own connection"""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "test.db"}',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        import models  # noqa: F401
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,60 @@
+import threading
+import time
+from services import job_search_cache
+from services.cache import LRUCache, SingleFlight
+from services.job_search_cache import JobSearchPage, cached_search_page, search_cache_key
+
+
+class _Worker(threading.local):
+    cache = None
+    flights = None
+
+
+class _WorkerFlights:
+    """SingleFlight of whichever worker the calling thread plays"""
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def do(self, key, function):
+        return self.worker.flights.do(key, function)
+
+    def in_flight(self, key):
+        return self.worker.flights.in_flight(key)
+
+
+def test_two_workers_compute_a_missing_page_once(app, monkeypatch):
+    worker = _Worker()
+    monkeypatch.setattr(job_search_cache, '_get_result_cache', lambda: worker.cache)
+    monkeypatch.setattr(job_search_cache, '_flights', _WorkerFlights(worker))
+
+    key = search_cache_key('python', '', [], '', None, None, 'newest', None)
+    page = JobSearchPage([3, 2, 1], 'next', None, 3, {
+        'total': 3, 'job_type': {'full-time': 3}, 'experience': {'entry': 1},
+        'salary': {50000: 2}, 'skills': [(7, 3)],
+    })
+    calls = []
+    started = threading.Barrier(2)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.3)
+        return page
+
+    def run_worker():
+        # A separate per-worker cache and single-flight, as in another process
+        worker.cache = LRUCache('job_search_results', maxsize=10, ttl=600)
+        worker.flights = SingleFlight()
+        with app.app_context():
+            started.wait()
+            results.append(cached_search_page(key, compute))
+
+    threads = [threading.Thread(target=run_worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [page, page]